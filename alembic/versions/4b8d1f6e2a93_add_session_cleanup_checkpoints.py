@@ -0,0 +1,36 @@
+"""Add session cleanup checkpoints
+
+Revision ID: 4b8d1f6e2a93
+Revises: 9e3f5a7b2c41
+Create Date: 2026-10-17 21:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import UUID
+
+from alembic import op
+
+revision: str = "4b8d1f6e2a93"
+down_revision: Union[str, None] = "9e3f5a7b2c41"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Очистка идёт по возрастанию (updated_at, id): пачка — диапазонное чтение индекса от курсора
+    op.create_index("idx_sessions_updated_at", "sessions", ["updated_at", "id"])
+    op.create_table(
+        "session_cleanup_checkpoints",
+        sa.Column("name", sa.String(length=55), primary_key=True),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.Column("session_id", UUID(as_uuid=True), nullable=False),
+        sa.Column("saved_at", sa.DateTime(), nullable=False, server_default=sa.func.now()),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("session_cleanup_checkpoints")
+    op.drop_index("idx_sessions_updated_at", table_name="sessions")
@@ -0,0 +1,38 @@
+"""Add permission bit index
+
+Revision ID: 5b1e7a9c3d20
+Revises: 92d67c288b2a
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = "5b1e7a9c3d20"
+down_revision: Union[str, None] = "92d67c288b2a"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE SEQUENCE permissions_bit_index_seq MINVALUE 0 START 0;")
+    op.execute("ALTER TABLE permissions ADD COLUMN bit_index INTEGER;")
+    op.execute(
+        """
+        UPDATE permissions SET bit_index = numbered.bit_index
+        FROM (SELECT slug, row_number() OVER (ORDER BY slug) - 1 AS bit_index FROM permissions) AS numbered
+        WHERE permissions.slug = numbered.slug;
+    """
+    )
+    op.execute("SELECT setval('permissions_bit_index_seq', COALESCE(MAX(bit_index) + 1, 0), false) FROM permissions;")
+    op.execute("ALTER TABLE permissions ALTER COLUMN bit_index SET DEFAULT nextval('permissions_bit_index_seq');")
+    op.execute("ALTER TABLE permissions ALTER COLUMN bit_index SET NOT NULL;")
+    op.execute("ALTER SEQUENCE permissions_bit_index_seq OWNED BY permissions.bit_index;")
+    op.create_unique_constraint("uq_permissions_bit_index", "permissions", ["bit_index"])
+
+
+def downgrade() -> None:
+    op.drop_constraint("uq_permissions_bit_index", "permissions", type_="unique")
+    op.execute("ALTER TABLE permissions DROP COLUMN bit_index;")
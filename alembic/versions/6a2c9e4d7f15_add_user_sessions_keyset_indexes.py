@@ -0,0 +1,37 @@
+"""Add user sessions keyset indexes
+
+Revision ID: 6a2c9e4d7f15
+Revises: 4b8d1f6e2a93
+Create Date: 2026-10-17 22:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+revision: str = "6a2c9e4d7f15"
+down_revision: Union[str, None] = "4b8d1f6e2a93"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Страница сессий — обратное чтение индекса от ключа курсора; поиск по одному user_id индекс тоже покрывает
+    op.create_index("idx_sessions_user_id_created_at", "sessions", ["user_id", "created_at", "id"])
+    # Активных сессий на порядки меньше, чем закрытых: фильтр active=true читает только их
+    op.create_index(
+        "idx_sessions_user_id_active",
+        "sessions",
+        ["user_id", "created_at", "id"],
+        postgresql_where=sa.text("is_active"),
+    )
+    op.drop_index("idx_sessions_user_id", table_name="sessions")
+
+
+def downgrade() -> None:
+    op.create_index("idx_sessions_user_id", "sessions", ["user_id"])
+    op.drop_index("idx_sessions_user_id_active", table_name="sessions")
+    op.drop_index("idx_sessions_user_id_created_at", table_name="sessions")
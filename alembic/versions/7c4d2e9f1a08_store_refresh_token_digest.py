@@ -0,0 +1,108 @@
+"""Store refresh token digest
+
+Revision ID: 7c4d2e9f1a08
+Revises: 5b1e7a9c3d20
+Create Date: 2026-10-17 18:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+revision: str = "7c4d2e9f1a08"
+down_revision: Union[str, None] = "5b1e7a9c3d20"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BACKFILL_BATCH_SIZE = 10_000
+DIGEST = "sha256(convert_to({refresh_token}, 'UTF8'))"
+
+
+def fill_digest_on_write() -> None:
+    """Пока работает код, пишущий только `refresh_token`, триггер заполняет дайджест новых и изменённых строк."""
+    op.execute(
+        f"""
+        CREATE FUNCTION sessions_fill_refresh_token_digest() RETURNS trigger LANGUAGE plpgsql AS $$
+        BEGIN
+            NEW.refresh_token_digest := {DIGEST.format(refresh_token="NEW.refresh_token")};
+            RETURN NEW;
+        END
+        $$;
+        """
+    )
+    op.execute(
+        "CREATE TRIGGER sessions_fill_refresh_token_digest BEFORE INSERT OR UPDATE OF refresh_token ON sessions "
+        "FOR EACH ROW EXECUTE FUNCTION sessions_fill_refresh_token_digest();"
+    )
+
+
+def backfill_digest() -> None:
+    """
+    Заполняет дайджест существующих строк пачками по первичному ключу, каждая пачка — отдельная транзакция.
+
+    Курсор по (id, device_type) не перечитывает уже пройденную часть таблицы, в отличие от выборки
+    `WHERE refresh_token_digest IS NULL`, которая с каждой пачкой просматривает всё больше заполненных строк.
+    """
+    backfilled = DIGEST.format(refresh_token="sessions.refresh_token")
+    connection = op.get_bind()
+    last = None
+    with op.get_context().autocommit_block():
+        while True:
+            after = "WHERE (id, device_type) > (:id, :device_type)" if last else ""
+            result = connection.execute(
+                sa.text(
+                    f"""
+                    WITH batch AS (
+                        SELECT id, device_type FROM sessions {after} ORDER BY id, device_type LIMIT :batch_size
+                    ), filled AS (
+                        UPDATE sessions SET refresh_token_digest = {backfilled}
+                        FROM batch
+                        WHERE sessions.id = batch.id AND sessions.device_type = batch.device_type
+                            AND sessions.refresh_token_digest IS NULL
+                    )
+                    SELECT id, device_type FROM batch ORDER BY id DESC, device_type DESC LIMIT 1;
+                """
+                ),
+                {"batch_size": BACKFILL_BATCH_SIZE, **(last or {})},
+            )
+            row = result.mappings().one_or_none()
+            if row is None:
+                break
+            last = dict(row)
+
+
+def upgrade() -> None:
+    op.execute("ALTER TABLE sessions ADD COLUMN refresh_token_digest BYTEA;")
+    # Триггер создаётся до заполнения: строки, вставленные во время него, не останутся с NULL
+    fill_digest_on_write()
+    backfill_digest()
+
+    # Проверенный CHECK позволяет SET NOT NULL не сканировать таблицу под ACCESS EXCLUSIVE
+    op.execute(
+        "ALTER TABLE sessions ADD CONSTRAINT sessions_refresh_token_digest_not_null "
+        "CHECK (refresh_token_digest IS NOT NULL) NOT VALID;"
+    )
+    op.execute("ALTER TABLE sessions VALIDATE CONSTRAINT sessions_refresh_token_digest_not_null;")
+    op.execute("ALTER TABLE sessions ALTER COLUMN refresh_token_digest SET NOT NULL;")
+    op.execute("ALTER TABLE sessions DROP CONSTRAINT sessions_refresh_token_digest_not_null;")
+    op.create_index(
+        "idx_sessions_refresh_token_digest", "sessions", ["refresh_token_digest", "device_type"], unique=True
+    )
+    op.drop_index("idx_sessions_refresh_token", table_name="sessions")
+    op.execute("DROP TRIGGER sessions_fill_refresh_token_digest ON sessions;")
+    op.execute("DROP FUNCTION sessions_fill_refresh_token_digest();")
+    op.execute("ALTER TABLE sessions DROP COLUMN refresh_token;")
+
+
+def downgrade() -> None:
+    # Исходные токены из дайджеста не восстановить: столбец заполняется hex-строкой дайджеста,
+    # поэтому после отката все сессии придётся открыть заново.
+    op.execute("ALTER TABLE sessions ADD COLUMN refresh_token VARCHAR(1055);")
+    op.execute("UPDATE sessions SET refresh_token = encode(refresh_token_digest, 'hex'), is_active = FALSE;")
+    op.execute("ALTER TABLE sessions ALTER COLUMN refresh_token SET NOT NULL;")
+    op.create_index("idx_sessions_refresh_token", "sessions", ["refresh_token", "device_type"], unique=True)
+    op.drop_index("idx_sessions_refresh_token_digest", table_name="sessions")
+    op.execute("ALTER TABLE sessions DROP COLUMN refresh_token_digest;")
@@ -0,0 +1,210 @@
+"""Subpartition sessions by month
+
+Revision ID: 9e3f5a7b2c41
+Revises: 7c4d2e9f1a08
+Create Date: 2026-10-17 20:00:00.000000
+
+"""
+
+from datetime import date, datetime
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+revision: str = "9e3f5a7b2c41"
+down_revision: Union[str, None] = "7c4d2e9f1a08"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+DEVICE_PARTITIONS = {
+    "sessions_desktop": "FOR VALUES IN ('desktop')",
+    "sessions_smart": "FOR VALUES IN ('smart')",
+    "sessions_mobile": "FOR VALUES IN ('mobile')",
+    "sessions_other": "DEFAULT",
+}
+INDEXES = ("idx_sessions_jti", "idx_sessions_refresh_token_digest", "idx_sessions_user_id")
+# Сколько месяцев вперёд создаётся при миграции; дальше их создаёт `make maintain-session-partitions`
+MONTHS_AHEAD = 3
+COPY_BATCH_SIZE = 10_000
+
+SESSIONS_COLUMNS = """
+    id UUID NOT NULL,
+    user_id UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    user_agent VARCHAR(255) NOT NULL,
+    jti UUID NOT NULL,
+    refresh_token_digest BYTEA NOT NULL,
+    user_ip VARCHAR(255),
+    is_active BOOLEAN NOT NULL DEFAULT TRUE,
+    device_type VARCHAR(55) NOT NULL,
+    created_at TIMESTAMP NOT NULL DEFAULT now(),
+    updated_at TIMESTAMP NOT NULL DEFAULT now()
+"""
+COLUMNS = (
+    "id",
+    "user_id",
+    "user_agent",
+    "jti",
+    "refresh_token_digest",
+    "user_ip",
+    "is_active",
+    "device_type",
+    "created_at",
+    "updated_at",
+)
+COLUMN_NAMES = ", ".join(COLUMNS)
+
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def create_sessions_new(primary_key: tuple[str, ...], months: list[date] | None) -> list[str]:
+    """
+    Создаёт пустую `sessions_new` с новой схемой рядом с рабочей `sessions`.
+    :param primary_key: Столбцы первичного ключа (в уникальные индексы входят те же столбцы партиционирования).
+    :param months: Месяцы RANGE-подпартиций или None, если партиции типов устройств не разбиваются по месяцам.
+    :return: Имена созданных партиций (с суффиксом `_new`).
+    """
+    partition_key = primary_key[1:]
+    op.execute(
+        f"CREATE TABLE sessions_new ({SESSIONS_COLUMNS}, PRIMARY KEY ({', '.join(primary_key)})) "
+        "PARTITION BY LIST (device_type);"
+    )
+    # Ключ партиционирования входит во все уникальные индексы партиционированной таблицы
+    op.create_index("idx_sessions_new_jti", "sessions_new", ["jti", *partition_key], unique=True)
+    op.create_index(
+        "idx_sessions_new_refresh_token_digest", "sessions_new", ["refresh_token_digest", *partition_key], unique=True
+    )
+    op.create_index("idx_sessions_new_user_id", "sessions_new", ["user_id"])
+
+    partitions = []
+    for partition, bound in DEVICE_PARTITIONS.items():
+        subpartitioned = " PARTITION BY RANGE (created_at)" if months is not None else ""
+        op.execute(f"CREATE TABLE {partition}_new PARTITION OF sessions_new {bound}{subpartitioned};")
+        partitions.append(f"{partition}_new")
+        if months is None:
+            continue
+        # Страховка на случай, если задача обслуживания не успела создать партицию месяца
+        op.execute(f"CREATE TABLE {partition}_new_default PARTITION OF {partition}_new DEFAULT;")
+        partitions.append(f"{partition}_new_default")
+        for month in months:
+            op.execute(
+                f"CREATE TABLE {partition}_new_{month:%Y_%m} PARTITION OF {partition}_new "
+                f"FOR VALUES FROM ('{month.isoformat()}') TO ('{add_months(month, 1).isoformat()}');"
+            )
+            partitions.append(f"{partition}_new_{month:%Y_%m}")
+    return partitions
+
+
+def mirror_writes(primary_key: tuple[str, ...]) -> None:
+    """Триггер повторяет в `sessions_new` все изменения `sessions`, пока работающий код пишет в старую таблицу."""
+    values = ", ".join(f"NEW.{column}" for column in COLUMNS)
+    updates = ", ".join(f"{column} = EXCLUDED.{column}" for column in COLUMNS if column not in primary_key)
+    match = " AND ".join(f"{column} = OLD.{column}" for column in primary_key)
+    op.execute(
+        f"""
+        CREATE FUNCTION sessions_mirror() RETURNS trigger LANGUAGE plpgsql AS $$
+        BEGIN
+            IF TG_OP = 'DELETE' THEN
+                DELETE FROM sessions_new WHERE {match};
+                RETURN OLD;
+            END IF;
+            INSERT INTO sessions_new ({COLUMN_NAMES}) VALUES ({values})
+            ON CONFLICT ({', '.join(primary_key)}) DO UPDATE SET {updates};
+            RETURN NEW;
+        END
+        $$;
+        """
+    )
+    op.execute(
+        "CREATE TRIGGER sessions_mirror AFTER INSERT OR UPDATE OR DELETE ON sessions "
+        "FOR EACH ROW EXECUTE FUNCTION sessions_mirror();"
+    )
+
+
+def copy_sessions(primary_key: tuple[str, ...]) -> None:
+    """
+    Копирует `sessions` в `sessions_new` пачками по её первичному ключу, каждая пачка — отдельная транзакция.
+
+    Строки, уже записанные триггером, не перезаписываются: в них более новая версия. Сессия, удалённая
+    во время копирования её пачки, может вернуться в `sessions_new` — её уберёт очистка истекших сессий.
+    """
+    key = ", ".join(primary_key)
+    connection = op.get_bind()
+    last = None
+    with op.get_context().autocommit_block():
+        while True:
+            after = f"WHERE ({key}) > ({', '.join(f':{column}' for column in primary_key)})" if last else ""
+            result = connection.execute(
+                sa.text(
+                    f"""
+                    WITH batch AS (
+                        SELECT {COLUMN_NAMES} FROM sessions {after} ORDER BY {key} LIMIT :batch_size
+                    ), copied AS (
+                        INSERT INTO sessions_new ({COLUMN_NAMES}) SELECT {COLUMN_NAMES} FROM batch
+                        ON CONFLICT DO NOTHING
+                    )
+                    SELECT {key} FROM batch ORDER BY {', '.join(f'{column} DESC' for column in primary_key)} LIMIT 1;
+                """
+                ),
+                {"batch_size": COPY_BATCH_SIZE, **(last or {})},
+            )
+            row = result.mappings().one_or_none()
+            if row is None:
+                break
+            last = dict(row)
+
+
+def swap_sessions(old_partitions: list[str], new_partitions: list[str]) -> None:
+    """
+    Подменяет `sessions` на `sessions_new` одними переименованиями и удаляет старую таблицу.
+
+    ACCESS EXCLUSIVE на `sessions` держится только на время переименований (после завершения уже начатых
+    транзакций), а не на время копирования.
+    """
+    op.execute("LOCK TABLE sessions IN ACCESS EXCLUSIVE MODE;")
+    op.execute("DROP TRIGGER sessions_mirror ON sessions;")
+    op.execute("DROP FUNCTION sessions_mirror();")
+
+    op.execute("ALTER TABLE sessions RENAME TO sessions_old;")
+    op.execute("ALTER TABLE sessions_old RENAME CONSTRAINT sessions_pkey TO sessions_old_pkey;")
+    for index in INDEXES:
+        op.execute(f"ALTER INDEX {index} RENAME TO {index.replace('idx_sessions', 'idx_sessions_old')};")
+    for partition in old_partitions:
+        op.execute(f"ALTER TABLE {partition} RENAME TO {partition}_old;")
+
+    op.execute("ALTER TABLE sessions_new RENAME TO sessions;")
+    op.execute("ALTER TABLE sessions RENAME CONSTRAINT sessions_new_pkey TO sessions_pkey;")
+    for index in INDEXES:
+        op.execute(f"ALTER INDEX {index.replace('idx_sessions', 'idx_sessions_new')} RENAME TO {index};")
+    for partition in new_partitions:
+        op.execute(f"ALTER TABLE {partition} RENAME TO {partition.replace('_new', '', 1)};")
+
+    op.execute("DROP TABLE sessions_old;")
+    op.execute("ALTER TABLE sessions RENAME CONSTRAINT sessions_new_user_id_fkey TO sessions_user_id_fkey;")
+
+
+def rebuild_sessions(old_primary_key: tuple[str, ...], primary_key: tuple[str, ...], months: list[date] | None) -> None:
+    # Рабочая таблица остаётся доступной всё время копирования: новая строится рядом и подменяется в конце
+    new_partitions = create_sessions_new(primary_key, months)
+    mirror_writes(primary_key)
+    # autocommit_block фиксирует созданную таблицу и триггер до начала копирования
+    copy_sessions(old_primary_key)
+    swap_sessions(list(DEVICE_PARTITIONS), new_partitions)
+
+
+def upgrade() -> None:
+    oldest = op.get_bind().execute(sa.text("SELECT min(created_at) FROM sessions")).scalar() or datetime.now()
+    months = []
+    month = date(oldest.year, oldest.month, 1)
+    while month <= add_months(date.today().replace(day=1), MONTHS_AHEAD):
+        months.append(month)
+        month = add_months(month, 1)
+    rebuild_sessions(("id", "device_type"), ("id", "device_type", "created_at"), months)
+
+
+def downgrade() -> None:
+    rebuild_sessions(("id", "device_type", "created_at"), ("id", "device_type"), None)
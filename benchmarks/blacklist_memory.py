@@ -0,0 +1,72 @@
+"""
+Память Redis на миллион отозванных токенов для прежней и текущей раскладки ключей черного списка.
+
+Прежняя раскладка: ключ — jti в текстовой записи UUID (36 байт), значение — id пользователя.
+Текущая: ключ `bl:` + 16 байт UUID без значения (`blacklist_key`). У обеих ключей есть срок жизни.
+Ключи создаются и затем удаляются — используйте отдельную БД Redis:
+    python -m benchmarks.blacklist_memory --redis-url redis://127.0.0.1:6379/15 --tokens 1000000
+"""
+
+import argparse
+import asyncio
+import uuid
+from collections.abc import Callable
+
+from redis.asyncio import Redis
+
+from src.infrastructure.repositories.blacklist import blacklist_key
+
+TTL = 30 * 60
+BATCH_SIZE = 10_000
+
+Layout = Callable[[str, str], tuple[bytes | str, bytes | str]]
+
+LAYOUTS: dict[str, Layout] = {
+    "uuid-text": lambda jti, user_id: (jti, user_id),
+    "binary": lambda jti, user_id: (blacklist_key(jti), b""),
+}
+
+
+async def used_memory(redis: Redis) -> int:
+    return (await redis.info("memory"))["used_memory"]
+
+
+async def measure(redis: Redis, layout: Layout, tokens: int) -> tuple[float, int]:
+    """
+    Заполняет Redis ключами в заданной раскладке.
+    :return: Прирост used_memory на миллион ключей (МиБ) и MEMORY USAGE одного ключа (байт).
+    """
+    user_id = str(uuid.uuid4())
+    keys = []
+    before = await used_memory(redis)
+    for start in range(0, tokens, BATCH_SIZE):
+        async with redis.pipeline(transaction=False) as pipe:
+            for _ in range(min(BATCH_SIZE, tokens - start)):
+                key, value = layout(str(uuid.uuid4()), user_id)
+                keys.append(key)
+                pipe.set(key, value, ex=TTL)
+            await pipe.execute()
+    delta = await used_memory(redis) - before
+    per_key = await redis.memory_usage(keys[0])
+    for start in range(0, tokens, BATCH_SIZE):
+        await redis.delete(*keys[start : start + BATCH_SIZE])
+    return delta / tokens * 1_000_000 / 2**20, per_key
+
+
+async def main(redis_url: str, tokens: int) -> None:
+    redis = Redis.from_url(redis_url)
+    print(f"{'layout':>10}{'MiB / 1M tokens':>17}{'MEMORY USAGE, B':>17}")
+    try:
+        for name, layout in LAYOUTS.items():
+            per_million, per_key = await measure(redis, layout, tokens)
+            print(f"{name:>10}{per_million:>17.1f}{per_key:>17}")
+    finally:
+        await redis.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--redis-url", required=True, help="Redis, в котором создаются и удаляются ключи")
+    parser.add_argument("--tokens", type=int, default=1_000_000)
+    args = parser.parse_args()
+    asyncio.run(main(args.redis_url, args.tokens))
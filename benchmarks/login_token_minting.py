@@ -0,0 +1,58 @@
+"""
+Пропускная способность выпуска пары токенов при входе и обновлении сессии.
+
+"before": новый JWTService на каждый запрос и отдельные `generate_access_token`/`generate_refresh_token`;
+"after": общий для процесса сервис и `mint_token_pair`.
+
+    python -m benchmarks.login_token_minting --algorithm EdDSA --requests 5000
+
+Проверка пароля в замер не входит: её стоимость задаётся политикой хеширования
+(см. `make calibrate-hashing`), а здесь измеряется только работа с токенами.
+"""
+
+import argparse
+import time
+import uuid
+
+from benchmarks.token_decode_cache import make_key_set
+from benchmarks.token_size import PROFILES, make_admin
+from src.services.jwt import JWTService
+from src.services.jwt_keys import KeySet
+
+
+def before(key_set: KeySet, options: dict, user, requests: int) -> float:
+    started = time.perf_counter()
+    for _ in range(requests):
+        service = JWTService(key_set=key_set, **options)
+        jti = str(uuid.uuid4())
+        service.generate_access_token(user, jti=jti)
+        service.generate_refresh_token(user, jti=jti)
+    return requests / (time.perf_counter() - started)
+
+
+def after(key_set: KeySet, options: dict, user, requests: int) -> float:
+    service = JWTService(key_set=key_set, **options)
+    started = time.perf_counter()
+    for _ in range(requests):
+        service.mint_token_pair(user)
+    return requests / (time.perf_counter() - started)
+
+
+def main(algorithm: str, requests: int) -> None:
+    key_set = make_key_set(algorithm)
+    user = make_admin()
+    print(f"algorithm: {algorithm}, requests: {requests}")
+    print(f"{'profile':<16}{'before, pairs/s':>17}{'after, pairs/s':>16}")
+    for name, options in PROFILES.items():
+        print(
+            f"{name:<16}{before(key_set, options, user, requests):>17.0f}"
+            f"{after(key_set, options, user, requests):>16.0f}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--algorithm", choices=["HS256", "RS256", "EdDSA"], default="RS256")
+    parser.add_argument("--requests", type=int, default=5_000)
+    args = parser.parse_args()
+    main(args.algorithm, args.requests)
@@ -0,0 +1,76 @@
+"""
+Замер задержки `GET /api/v1/me/` при параллельной нагрузке на `POST /api/v1/auth/login/`.
+
+Запуск против поднятого сервиса:
+    python -m benchmarks.me_latency_under_login_load --base-url http://127.0.0.1:8001 --login-workers 32
+
+Скрипт регистрирует тестового пользователя, получает access-токен и в течение
+`--duration` секунд опрашивает профиль, пока `--login-workers` корутин без остановки логинятся.
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+import uuid
+
+from httpx import AsyncClient
+
+HEADERS = {"User-Agent": "benchmark", "X-Request-Id": "benchmark"}
+
+
+def percentile(samples: list[float], percent: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(percent / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def login_loop(client: AsyncClient, credentials: dict[str, str], deadline: float, counter: list[int]) -> None:
+    while time.perf_counter() < deadline:
+        await client.post("/api/v1/auth/login/", json=credentials, headers=HEADERS)
+        counter[0] += 1
+
+
+async def me_loop(client: AsyncClient, access_token: str, deadline: float) -> list[float]:
+    headers = {**HEADERS, "Authorization": f"Bearer {access_token}"}
+    latencies = []
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        await client.get("/api/v1/me/", headers=headers)
+        latencies.append((time.perf_counter() - started) * 1000)
+    return latencies
+
+
+async def main(base_url: str, login_workers: int, duration: float) -> None:
+    credentials = {"email": f"bench-{uuid.uuid4().hex[:8]}@example.com", "password": "benchmark-password"}
+    async with AsyncClient(base_url=base_url, timeout=30) as client:
+        await client.post(
+            "/api/v1/auth/register/",
+            json={**credentials, "confirm_password": credentials["password"]},
+            headers=HEADERS,
+        )
+        response = await client.post("/api/v1/auth/login/", json=credentials, headers=HEADERS)
+        access_token = response.json()["access_token"]
+
+        deadline = time.perf_counter() + duration
+        logins = [0]
+        results = await asyncio.gather(
+            me_loop(client, access_token, deadline),
+            *(login_loop(client, credentials, deadline, logins) for _ in range(login_workers)),
+        )
+
+    latencies = results[0]
+    print(f"login workers: {login_workers}, logins/s: {logins[0] / duration:.1f}")
+    print(f"/me requests: {len(latencies)}")
+    print(f"p50: {statistics.median(latencies):.2f} ms")
+    print(f"p95: {percentile(latencies, 95):.2f} ms")
+    print(f"p99: {percentile(latencies, 99):.2f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://127.0.0.1:8001")
+    parser.add_argument("--login-workers", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=30.0)
+    args = parser.parse_args()
+    asyncio.run(main(args.base_url, args.login_workers, args.duration))
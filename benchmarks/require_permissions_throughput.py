@@ -0,0 +1,88 @@
+"""
+Пропускная способность маршрута с `require_permissions` при проверке отзыва в Redis напрямую
+и через клиентский кеш с CLIENT TRACKING (Redis 6+).
+
+Локальный кеш и фильтр отзыва отключены, чтобы каждая проверка доходила до репозитория черного списка.
+Запросы идут в приложение через ASGI без сети, Redis — настоящий:
+    python -m benchmarks.require_permissions_throughput --redis-url redis://127.0.0.1:6379/15 --requests 20000
+"""
+
+import argparse
+import asyncio
+import logging
+import time
+
+from fastapi import Depends, FastAPI
+from httpx import ASGITransport, AsyncClient
+from redis.asyncio import Redis
+
+from benchmarks.token_size import make_admin
+from src.api.v1.dependencies import require_permissions
+from src.infrastructure.repositories.blacklist import (
+    BLACKLIST_KEY_PREFIX,
+    USER_EPOCH_KEY_PREFIX,
+    RedisBlacklistRepository,
+)
+from src.services.blacklist import BlacklistService, get_blacklist_service
+from src.services.jwt import get_jwt_service
+from src.services.redis_tracking import TrackedReadCache
+
+# httpx пишет каждый запрос на уровне INFO, что само по себе ограничивает пропускную способность.
+logging.getLogger("httpx").setLevel(logging.WARNING)
+
+
+def make_app(repository: RedisBlacklistRepository) -> FastAPI:
+    app = FastAPI()
+    app.dependency_overrides[get_blacklist_service] = lambda: BlacklistService(repository)
+
+    @app.get("/protected", dependencies=[Depends(require_permissions())])
+    async def protected():
+        return {"ok": True}
+
+    return app
+
+
+async def measure(app: FastAPI, tokens: list[str], requests: int, concurrency: int) -> float:
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://benchmark") as client:
+
+        async def worker(offset: int) -> None:
+            for index in range(offset, requests, concurrency):
+                headers = {"Authorization": f"Bearer {tokens[index % len(tokens)]}", "X-Request-Id": "benchmark"}
+                response = await client.get("/protected", headers=headers)
+                response.raise_for_status()
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(offset) for offset in range(concurrency)))
+        return requests / (time.perf_counter() - started)
+
+
+async def main(redis_url: str, requests: int, concurrency: int, users: int) -> None:
+    jwt_service = get_jwt_service()
+    tokens = [jwt_service.mint_token_pair(make_admin()).access_token for _ in range(users)]
+    redis = Redis.from_url(redis_url)
+    cache = TrackedReadCache(
+        max_entries=100_000, prefixes=[BLACKLIST_KEY_PREFIX, USER_EPOCH_KEY_PREFIX], ping_interval=5
+    )
+    tracking = asyncio.create_task(cache.run(redis.connection_pool))
+    try:
+        while not cache.ready:
+            await asyncio.sleep(0.01)
+        print(f"requests: {requests}, concurrency: {concurrency}, tokens: {users}")
+        print(f"{'mode':<10}{'rps':>10}")
+        for name, tracked_read_cache in (("redis", None), ("tracking", cache)):
+            app = make_app(RedisBlacklistRepository(redis=redis, tracked_read_cache=tracked_read_cache))
+            print(f"{name:<10}{await measure(app, tokens, requests, concurrency):>10.0f}")
+    finally:
+        tracking.cancel()
+        await redis.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--redis-url", required=True)
+    parser.add_argument("--requests", type=int, default=20_000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--tokens", type=int, default=1_000, help="Число разных access-токенов в запросах")
+    args = parser.parse_args()
+    asyncio.run(main(args.redis_url, args.requests, args.concurrency, args.tokens))
@@ -0,0 +1,90 @@
+"""
+Сравнение проверки отзыва токена через фильтр Блума и прямым GET в Redis.
+
+Только фильтр (память, время сборки, стоимость проверки и доля ложноположительных ответов):
+    python -m benchmarks.revocation_filter --sizes 10000 100000 1000000
+
+С Redis дополнительно измеряется `BlacklistService.is_exists` для неотозванных jti с фильтром и без него
+(в базе создаются и затем удаляются N ключей черного списка — используйте отдельную БД Redis):
+    python -m benchmarks.revocation_filter --redis-url redis://127.0.0.1:6379/15
+"""
+
+import argparse
+import asyncio
+import time
+import uuid
+
+from redis.asyncio import Redis
+
+from src.infrastructure.repositories.blacklist import RedisBlacklistRepository, blacklist_key
+from src.services.blacklist import BlacklistService
+from src.services.revocation_filter import RevocationFilter
+
+TTL = 30 * 60
+
+
+def build_filter(jtis: list[str], error_rate: float) -> tuple[RevocationFilter, float]:
+    revocation_filter = RevocationFilter(ttl=TTL, error_rate=error_rate, capacity=len(jtis))
+    started = time.perf_counter()
+    revocation_filter.add(jtis)
+    revocation_filter.ready = True
+    return revocation_filter, time.perf_counter() - started
+
+
+async def measure_is_exists(service: BlacklistService, probes: list[str]) -> float:
+    started = time.perf_counter()
+    for jti in probes:
+        await service.is_exists(jti)
+    return (time.perf_counter() - started) / len(probes) * 1_000_000
+
+
+async def fill_redis(redis: Redis, jtis: list[str], batch_size: int = 10_000) -> None:
+    for start in range(0, len(jtis), batch_size):
+        async with redis.pipeline(transaction=False) as pipe:
+            for jti in jtis[start : start + batch_size]:
+                pipe.set(blacklist_key(jti), b"", ex=TTL)
+            await pipe.execute()
+
+
+async def main(sizes: list[int], lookups: int, error_rate: float, redis_url: str | None) -> None:
+    redis = Redis.from_url(redis_url) if redis_url else None
+    header = f"{'revoked':>9}{'memory, KiB':>13}{'build, s':>10}{'filter, us':>12}{'fp rate':>9}"
+    print(header + (f"{'GET, us':>10}{'filter+GET, us':>16}" if redis else ""))
+    for size in sizes:
+        jtis = [str(uuid.uuid4()) for _ in range(size)]
+        probes = [str(uuid.uuid4()) for _ in range(lookups)]
+        revocation_filter, build_seconds = build_filter(jtis, error_rate)
+
+        started = time.perf_counter()
+        false_positives = sum(bool(revocation_filter.might_contain(jti)) for jti in probes)
+        filter_us = (time.perf_counter() - started) / lookups * 1_000_000
+
+        row = (
+            f"{size:>9}{revocation_filter.memory_bytes / 1024:>13.0f}{build_seconds:>10.2f}"
+            f"{filter_us:>12.1f}{false_positives / lookups:>9.4f}"
+        )
+        if redis is not None:
+            await fill_redis(redis, jtis)
+            try:
+                repository = RedisBlacklistRepository(redis=redis)
+                plain = await measure_is_exists(BlacklistService(repository), probes)
+                with_filter = await measure_is_exists(
+                    BlacklistService(repository, revocation_filter=revocation_filter), probes
+                )
+            finally:
+                for start in range(0, size, 10_000):
+                    await redis.delete(*map(blacklist_key, jtis[start : start + 10_000]))
+            row += f"{plain:>10.1f}{with_filter:>16.1f}"
+        print(row)
+    if redis is not None:
+        await redis.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--lookups", type=int, default=10_000)
+    parser.add_argument("--error-rate", type=float, default=0.001)
+    parser.add_argument("--redis-url", help="Redis для сравнения с прямым GET (ключи создаются и удаляются)")
+    args = parser.parse_args()
+    asyncio.run(main(args.sizes, args.lookups, args.error_rate, args.redis_url))
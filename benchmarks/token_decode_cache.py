@@ -0,0 +1,70 @@
+"""
+Микробенчмарк стоимости `JWTService.decode_token` на запрос с кешем проверенных токенов и без него.
+
+    python -m benchmarks.token_decode_cache --algorithm EdDSA --requests 20000 --tokens 100
+
+`--tokens` задаёт число различных токенов, которые клиенты предъявляют по кругу.
+"""
+
+import argparse
+import time
+import uuid
+
+from cryptography.hazmat.primitives.asymmetric import ed25519, rsa
+
+from src.domain.entities import User
+from src.services.jwt import JWTService
+from src.services.jwt_keys import KeySet
+from src.services.token_cache import TokenCache
+
+
+def make_key_set(algorithm: str) -> KeySet:
+    if algorithm == "HS256":
+        return KeySet.symmetric("benchmark-secret-key-benchmark-secret-key")
+    if algorithm == "EdDSA":
+        private_key = ed25519.Ed25519PrivateKey.generate()
+    else:
+        private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    return KeySet(
+        algorithm=algorithm,
+        signing_key=private_key,
+        key_id="benchmark",
+        verification_keys={"benchmark": private_key.public_key()},
+    )
+
+
+def run(service: JWTService, tokens: list[str], requests: int) -> float:
+    started = time.perf_counter()
+    for i in range(requests):
+        service.decode_token(tokens[i % len(tokens)])
+    return (time.perf_counter() - started) / requests * 1_000_000
+
+
+def main(algorithm: str, requests: int, token_count: int) -> None:
+    key_set = make_key_set(algorithm)
+    signer = JWTService(key_set=key_set)
+    tokens = [
+        signer.generate_access_token(User(id=uuid.uuid4(), email="bench@example.com", password="", is_active=True))
+        for _ in range(token_count)
+    ]
+    token_cache = TokenCache(max_size=token_count, ttl=60)
+
+    without_cache = run(JWTService(key_set=key_set), tokens, requests)
+    with_cache = run(JWTService(key_set=key_set, token_cache=token_cache), tokens, requests)
+
+    hit_rate = token_cache.hits / (token_cache.hits + token_cache.misses)
+    print(f"algorithm: {algorithm}, requests: {requests}, distinct tokens: {token_count}")
+    print(f"cache off: {without_cache:.1f} us/request")
+    print(
+        f"cache on:  {with_cache:.1f} us/request (hits: {token_cache.hits}, misses: {token_cache.misses}, "
+        f"hit rate: {hit_rate:.1%})"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--algorithm", choices=["HS256", "RS256", "EdDSA"], default="RS256")
+    parser.add_argument("--requests", type=int, default=20_000)
+    parser.add_argument("--tokens", type=int, default=100)
+    args = parser.parse_args()
+    main(args.algorithm, args.requests, args.tokens)
@@ -1,3 +1,7 @@
+import time
+from dataclasses import replace
+from uuid import uuid4
+
 from fastapi import APIRouter, Depends, Request, Response, status
 
 from src.api.v1.dependencies import (
@@ -5,15 +9,24 @@ from src.api.v1.dependencies import (
     BlacklistDep,
     JWTDep,
     SessionDep,
-    get_current_user,
+    UserRepoDep,
     get_refresh_token,
+    get_refresh_token_data,
     set_refresh_token,
 )
-from src.api.v1.schemas.auth_schemas import LoginForm, LoginResponse, RegisterForm, UserResponse
+from src.api.v1.schemas.auth_schemas import (
+    IntrospectBatchRequest,
+    IntrospectResult,
+    LoginForm,
+    LoginResponse,
+    RegisterForm,
+    UserResponse,
+)
 from src.core.config import settings
-from src.domain.entities import User
-from src.domain.exceptions import PasswordsNotMatch
+from src.domain.entities import Token, TokenPair
+from src.domain.exceptions import PasswordsNotMatch, RefreshTokenReused, SessionHasExpired, UserNotFound
 from src.domain.factories.session import SessionFactory
+from src.services.refresh_single_flight import RefreshSingleFlight, get_refresh_single_flight
 
 auth_router = APIRouter()
 
@@ -36,18 +49,21 @@ async def login(
     session_service: SessionDep,
 ) -> LoginResponse:
     user = await auth_service.login_user(email=login_form.email, password=login_form.password)
-    access_token = jwt_service.generate_access_token(user)
-    refresh_token = jwt_service.generate_refresh_token(user)
+    # Тип устройства попадает в refresh-токен, чтобы последующие поиски сессии шли только в её партицию
+    device_type = session_service.get_user_device(user_agent=request.headers["user-agent"])
+    session_id = uuid4()
+    token_pair = jwt_service.mint_token_pair(user, device_type=device_type, session_id=session_id)
     session = SessionFactory.create(
         user_id=user.id,
-        jti=jwt_service.jti,
+        jti=token_pair.jti,
         user_agent=request.headers["user-agent"],
-        refresh_token=refresh_token,
+        refresh_token=token_pair.refresh_token,
         user_ip=request.headers["host"],
+        session_id=session_id,
     )
     await session_service.create_new_session(session=session)
-    set_refresh_token(response=response, refresh_token=refresh_token)
-    return LoginResponse(access_token=access_token, refresh_token=refresh_token)
+    set_refresh_token(response=response, refresh_token=token_pair.refresh_token)
+    return LoginResponse(access_token=token_pair.access_token, refresh_token=token_pair.refresh_token)
 
 
 @auth_router.post("/logout/", status_code=status.HTTP_204_NO_CONTENT)
@@ -55,13 +71,12 @@ async def logout(
     session_service: SessionDep,
     blacklist_service: BlacklistDep,
     refresh_token: str = Depends(get_refresh_token),
+    payload: Token = Depends(get_refresh_token_data),
 ):
-    deactivate_session = await session_service.deactivate_current_session(refresh_token)
-    await blacklist_service.set_one_value(
-        deactivate_session.jti,
-        deactivate_session.user_id,
-        settings.service.access_token_expire,
-    )
+    deactivate_session = await session_service.deactivate_current_session(refresh_token, payload.device_type)
+    # Access-токен выпущен вместе с refresh-токеном сессии, поэтому истекает через access_token_expire после его iat.
+    access_token_exp = int(payload.iat) + settings.service.access_token_expire * 60
+    await blacklist_service.revoke({deactivate_session.jti: access_token_exp})
     return
 
 
@@ -70,15 +85,66 @@ async def refresh(
     response: Response,
     session_service: SessionDep,
     jwt_service: JWTDep,
+    black_list_service: BlacklistDep,
+    user_repository: UserRepoDep,
     refresh_token: str = Depends(get_refresh_token),
-    current_user: User = Depends(get_current_user),
+    payload: Token = Depends(get_refresh_token_data),
+    single_flight: RefreshSingleFlight | None = Depends(get_refresh_single_flight),
 ) -> LoginResponse:
-    new_refresh_token = jwt_service.generate_refresh_token(user=current_user)
-    new_access_token = jwt_service.generate_access_token(user=current_user)
-    new_jti = jwt_service.jti
-    _ = await session_service.update_session_refresh_token(refresh_token, new_refresh_token, new_jti)
-    set_refresh_token(response=response, refresh_token=new_refresh_token)
-    return LoginResponse(access_token=new_access_token, refresh_token=new_refresh_token)
+    async def rotate() -> TokenPair:
+        token = payload
+        created_at = None
+        if token.session_id is None:
+            # Токен выпущен без `sid`: сессия находится заранее, чтобы новая пара сразу несла `sid` и `dvc`
+            session = await session_service.get_current_session(refresh_token, token.device_type)
+            token = replace(token, session_id=str(session.id), device_type=session.device_type)
+            created_at = session.created_at
+        if token.roles is None:
+            # Права зашиты в сам токен (профиль standard): пара выпускается по актуальным правам пользователя
+            user = await user_repository.get_by_id(token.user_uuid)
+            if user is None:
+                raise UserNotFound
+            token_pair = jwt_service.mint_token_pair(user, device_type=token.device_type, session_id=token.session_id)
+        else:
+            # Новая пара подписывается по claim предъявленного токена, поэтому ротация — один запрос к БД
+            token_pair = jwt_service.rotate_token_pair(token)
+        try:
+            rotation = await session_service.update_session_refresh_token(
+                refresh_token,
+                token_pair.refresh_token,
+                token_pair.jti,
+                token.device_type,
+                token.session_id,
+                created_at,
+            )
+        except RefreshTokenReused as error:
+            # Последний access-токен сессии выпущен не позже текущего момента
+            access_token_expire = settings.service.access_token_expire * 60
+            await black_list_service.revoke(
+                {
+                    error.jti: int(time.time()) + access_token_expire,
+                    payload.jti: int(payload.iat) + access_token_expire,
+                }
+            )
+            raise
+        if token.roles is not None and sorted(rotation.roles) != sorted(token.roles):
+            # Роли пользователя изменились с выпуска токена: перевыпускаем пару с ролями из БД
+            # и заменяем только что записанный токен
+            fresh_pair = jwt_service.rotate_token_pair(replace(token, roles=rotation.roles))
+            await session_service.update_session_refresh_token(
+                token_pair.refresh_token,
+                fresh_pair.refresh_token,
+                fresh_pair.jti,
+                rotation.device_type,
+                str(rotation.session_id),
+            )
+            token_pair = fresh_pair
+        return token_pair
+
+    # Параллельные запросы с тем же токеном (несколько вкладок, воркеры клиента) получают одну пару
+    token_pair = await single_flight.run(refresh_token, rotate) if single_flight is not None else await rotate()
+    set_refresh_token(response=response, refresh_token=token_pair.refresh_token)
+    return LoginResponse(access_token=token_pair.access_token, refresh_token=token_pair.refresh_token)
 
 
 @auth_router.post("/logout-others/", status_code=status.HTTP_204_NO_CONTENT)
@@ -86,8 +152,33 @@ async def logout_others(
     session_service: SessionDep,
     black_list_service: BlacklistDep,
     current_refresh_token: str = Depends(get_refresh_token),
+    payload: Token = Depends(get_refresh_token_data),
 ):
-    deactivate_sessions = await session_service.deactivate_all_without_current(current_refresh_token)
-    jti_tokens = {session.jti: session.user_id for session in deactivate_sessions}
-    await black_list_service.set_many_values(jti_tokens, settings.service.access_token_expire)
+    await session_service.deactivate_all_without_current(current_refresh_token, payload.device_type)
+    await black_list_service.revoke_user_tokens(payload.user_uuid, keep_jti=payload.jti)
     return
+
+
+@auth_router.post("/introspect/batch", response_model=list[IntrospectResult], status_code=status.HTTP_200_OK)
+async def introspect_batch(
+    introspect_request: IntrospectBatchRequest,
+    jwt_service: JWTDep,
+    black_list_service: BlacklistDep,
+) -> list[IntrospectResult]:
+    payloads: list[Token | None] = []
+    for token in introspect_request.tokens:
+        try:
+            payloads.append(jwt_service.decode_token(token))
+        except SessionHasExpired:
+            payloads.append(None)
+    valid = [payload for payload in payloads if payload is not None]
+    revoked = iter(await black_list_service.are_tokens_revoked(valid) if valid else [])
+    results = []
+    for payload in payloads:
+        if payload is None or next(revoked):
+            results.append(IntrospectResult(active=False))
+            continue
+        results.append(
+            IntrospectResult(active=True, user_uuid=str(payload.user_uuid), jti=str(payload.jti), exp=int(payload.exp))
+        )
+    return results
@@ -5,6 +5,7 @@ from fastapi import Depends, Request, Response, Security
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 
 from src.core.config import settings
+from src.core.permission_registry import PermissionCheck, PermissionRegistry, get_permission_registry
 from src.domain.entities import Token, User
 from src.domain.exceptions import Forbidden, SessionHasExpired, UserNotFound
 from src.domain.interfaces import (
@@ -31,6 +32,8 @@ BlacklistDep = Annotated[AbstractBlacklistService, Depends(get_blacklist_service
 UserServiceDep = Annotated[AbstractUserService, Depends(get_user_service)]
 YandexOAuthDep = Annotated[AbstractOAuthService, Depends(get_yandex_oauth_service)]
 
+PermissionRegistryDep = Annotated[PermissionRegistry, Depends(get_permission_registry)]
+
 UserRepoDep = Annotated[AbstractUserRepository, Depends(get_user_repository)]
 
 security = HTTPBearer()
@@ -118,24 +121,27 @@ def require_permissions(required_permissions: list[str] | None = None):
     """
     Фабрика зависимостей (dependencies),
     которая возвращает функцию проверки прав на основе access-токена.
+    Требуемые права компилируются в битовую маску один раз при создании зависимости.
     :param required_permissions: Список требуемых прав
     :return: Асинхронная функция check_permission
     """
+    permission_check = PermissionCheck(required_permissions or [])
 
     async def check_permission(
         request: Request,
         jwt_service: JWTDep,
         blacklist_service: BlacklistDep,
+        permission_registry: PermissionRegistryDep,
         credentials: HTTPAuthorizationCredentials = Security(security),
     ):
         logger.debug("Проверяем access-токен и права доступа...")
         access_token = credentials.credentials
         payload: Token = jwt_service.decode_token(access_token)
 
-        if await blacklist_service.is_exists(payload.jti):
+        if await blacklist_service.is_token_revoked(payload):
             raise SessionHasExpired
 
-        if required_permissions and not set(required_permissions).issubset(set(payload.scope)):
+        if not permission_check.is_satisfied(payload, permission_registry):
             raise Forbidden
 
         request.state.user = payload.user_uuid
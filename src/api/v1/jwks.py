@@ -0,0 +1,17 @@
+from fastapi import APIRouter, Response, status
+
+from src.services.jwt_keys import get_key_set
+
+jwks_router = APIRouter()
+
+JWKS_CACHE_MAX_AGE = 300
+
+
+@jwks_router.get("/.well-known/jwks.json", status_code=status.HTTP_200_OK)
+async def jwks(response: Response) -> dict:
+    """
+    Публичные ключи проверки подписи токенов для сервисов-потребителей.
+    Набор ключей собирается один раз на процесс; клиентам разрешено кешировать ответ.
+    """
+    response.headers["Cache-Control"] = f"public, max-age={JWKS_CACHE_MAX_AGE}"
+    return get_key_set().jwks
@@ -1,7 +1,8 @@
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, Query, status
 
-from src.api.v1.dependencies import AuthDep, SessionDep, UserServiceDep, get_access_token_data
-from src.api.v1.schemas.me import ChangePasswordForm, ProfileResponse, Session
+from src.api.v1.dependencies import AuthDep, BlacklistDep, SessionDep, UserServiceDep, get_access_token_data
+from src.api.v1.schemas.me import ChangePasswordForm, ProfileResponse, SessionPage
+from src.core.config import settings
 from src.domain.entities import Token
 
 me_router = APIRouter()
@@ -13,16 +14,26 @@ async def my_profile(user_service: UserServiceDep, payload: Token = Depends(get_
     return user_data
 
 
-@me_router.get("/{uuid}/sessions/", response_model=list[Session], status_code=status.HTTP_200_OK)
-async def my_sessions(session_service: SessionDep, payload: Token = Depends(get_access_token_data)):
-    sessions = await session_service.get_current_user_sessions(user_id=payload.user_uuid)
-    return sessions
+@me_router.get("/{uuid}/sessions/", response_model=SessionPage, status_code=status.HTTP_200_OK)
+async def my_sessions(
+    session_service: SessionDep,
+    payload: Token = Depends(get_access_token_data),
+    cursor: str | None = Query(default=None, description="`next_cursor` предыдущей страницы"),
+    limit: int = Query(default=settings.service.sessions_page_size, ge=1, le=settings.service.sessions_page_size_max),
+    active: bool | None = Query(default=None, description="true — только активные, false — только закрытые"),
+):
+    page = await session_service.get_current_user_sessions(
+        user_id=payload.user_uuid, limit=limit, cursor=cursor, active=active
+    )
+    return page
 
 
 @me_router.post("/change-password/", status_code=status.HTTP_200_OK)
 async def change_password(
     change_password_form: ChangePasswordForm,
     auth_service: AuthDep,
+    session_service: SessionDep,
+    blacklist_service: BlacklistDep,
     payload: Token = Depends(get_access_token_data),
 ):
     await auth_service.change_password(
@@ -30,4 +41,6 @@ async def change_password(
         old_password=change_password_form.current_password,
         new_password=change_password_form.new_password,
     )
+    await session_service.deactivate_user_sessions(payload.user_uuid, keep_jti=payload.jti)
+    await blacklist_service.revoke_user_tokens(payload.user_uuid, keep_jti=payload.jti)
     return {"ok": True}
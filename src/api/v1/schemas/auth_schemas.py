@@ -3,6 +3,8 @@ from typing import Annotated
 from fastapi import Form
 from pydantic import BaseModel, ConfigDict, EmailStr, Field
 
+from src.core.config import settings
+
 
 class RegisterForm(BaseModel):
     email: Annotated[EmailStr, Form(...)]
@@ -26,3 +28,14 @@ class LoginResponse(BaseModel):
     refresh_token: str
     access_token: str
     token_type: str = Field(default="jwt")
+
+
+class IntrospectBatchRequest(BaseModel):
+    tokens: list[str] = Field(min_length=1, max_length=settings.service.introspect_batch_limit)
+
+
+class IntrospectResult(BaseModel):
+    active: bool
+    user_uuid: str | None = None
+    jti: str | None = None
+    exp: int | None = None
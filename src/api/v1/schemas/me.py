@@ -13,11 +13,16 @@ class ChangePasswordForm(BaseModel):
 
 class Session(BaseModel):
     user_id: UUID | str
-    device_type: bool
     device_type: str
+    is_active: bool
     created_at: datetime
 
 
+class SessionPage(BaseModel):
+    sessions: list[Session]
+    next_cursor: str | None
+
+
 class ProfileResponse(BaseModel):
     email: EmailStr
     created_at: datetime
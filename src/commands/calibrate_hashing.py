@@ -0,0 +1,69 @@
+"""
+Калибровка параметров хеширования паролей.
+
+Для каждого кандидата замеряет время одного хеширования на одном ядре и выводит
+число хешей в секунду на ядро. По результату подбираются значения переменных
+`HASHING_BCRYPT_ROUNDS` и `HASHING_ARGON2_*`.
+
+    python -m src.commands.calibrate_hashing --bcrypt-rounds 10 11 12 13 --iterations 20
+"""
+
+import argparse
+import itertools
+import time
+
+from src.services.hashing import HashingPolicy
+
+CALIBRATION_PASSWORD = "calibration-password"
+
+
+def measure(policy: HashingPolicy, iterations: int) -> float:
+    """
+    Замеряет среднее время хеширования по политике.
+    :param policy: Проверяемая политика (используется только её основная схема).
+    :param iterations: Количество хеширований.
+    :return: Среднее время одного хеширования в секундах.
+    """
+    context = policy.create_context()
+    context.hash(CALIBRATION_PASSWORD)  # прогрев
+    started = time.perf_counter()
+    for _ in range(iterations):
+        context.hash(CALIBRATION_PASSWORD)
+    return (time.perf_counter() - started) / iterations
+
+
+def candidates(args: argparse.Namespace) -> list[tuple[str, HashingPolicy]]:
+    result = [
+        (f"bcrypt rounds={rounds}", HashingPolicy(schemes=("bcrypt",), bcrypt_rounds=rounds))
+        for rounds in args.bcrypt_rounds
+    ]
+    for time_cost, memory_cost, parallelism in itertools.product(
+        args.argon2_time_cost, args.argon2_memory_cost, args.argon2_parallelism
+    ):
+        policy = HashingPolicy(
+            schemes=("argon2",),
+            argon2_time_cost=time_cost,
+            argon2_memory_cost=memory_cost,
+            argon2_parallelism=parallelism,
+        )
+        result.append((f"argon2 t={time_cost} m={memory_cost}KiB p={parallelism}", policy))
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=10)
+    parser.add_argument("--bcrypt-rounds", type=int, nargs="*", default=[10, 11, 12, 13])
+    parser.add_argument("--argon2-time-cost", type=int, nargs="*", default=[2, 3])
+    parser.add_argument("--argon2-memory-cost", type=int, nargs="*", default=[19456, 65536])
+    parser.add_argument("--argon2-parallelism", type=int, nargs="*", default=[1])
+    args = parser.parse_args()
+
+    print(f"{'candidate':<45} {'ms/hash':>10} {'hashes/s/core':>15}")
+    for name, policy in candidates(args):
+        seconds = measure(policy, args.iterations)
+        print(f"{name:<45} {seconds * 1000:>10.1f} {1 / seconds:>15.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+Обработчик очистки истекших сессий.
+
+Удаляет сессии, не обновлявшиеся `SESSION_CLEANUP_RETENTION_DAYS` дней, пачками с `FOR UPDATE SKIP LOCKED`
+и с ограничением скорости. Курсор прохода хранится в БД: после сбоя очистка продолжается с места остановки.
+Метрики отдаются в формате Prometheus на порту `SESSION_CLEANUP_METRICS_PORT`.
+
+    python -m src.commands.cleanup_sessions            # проходы каждые SESSION_CLEANUP_INTERVAL секунд
+    python -m src.commands.cleanup_sessions --once     # один проход (для cron)
+"""
+
+import argparse
+import asyncio
+from datetime import datetime, timedelta
+
+from opentelemetry import metrics
+from opentelemetry.exporter.prometheus import PrometheusMetricReader
+from opentelemetry.sdk.metrics import MeterProvider
+from prometheus_client import start_http_server
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from src.core.config import settings
+from src.infrastructure.repositories.session_cleanup import SQLAlchemySessionCleanupRepository
+from src.services.session_cleanup import SessionCleanupService
+
+
+async def main(args: argparse.Namespace) -> None:
+    engine = create_async_engine(settings.db.db_url, echo=False)
+    session_maker = async_sessionmaker(bind=engine, expire_on_commit=False, class_=AsyncSession)
+    try:
+        async with session_maker() as session:
+            service = SessionCleanupService(
+                repository=SQLAlchemySessionCleanupRepository(session=session),
+                retention=timedelta(days=settings.service.session_cleanup_retention_days),
+                batch_size=args.batch_size,
+                rows_per_second=args.rows_per_second,
+                max_replication_lag=settings.service.session_cleanup_max_replication_lag,
+                name=args.name,
+            )
+            if args.once:
+                deleted = await service.run_pass(datetime.now())
+                print(f"deleted: {deleted}")
+            else:
+                await service.run_forever(settings.service.session_cleanup_interval)
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--once", action="store_true", help="Выполнить один проход и завершиться")
+    parser.add_argument("--name", default="default", help="Имя курсора (разное у параллельных обработчиков)")
+    parser.add_argument("--batch-size", type=int, default=settings.service.session_cleanup_batch_size)
+    parser.add_argument("--rows-per-second", type=float, default=settings.service.session_cleanup_rows_per_second)
+    args = parser.parse_args()
+    metrics.set_meter_provider(MeterProvider(metric_readers=[PrometheusMetricReader()]))
+    start_http_server(settings.service.session_cleanup_metrics_port)
+    asyncio.run(main(args))
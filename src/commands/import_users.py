@@ -0,0 +1,101 @@
+"""
+Массовый импорт пользователей из NDJSON или CSV.
+
+NDJSON: по одному объекту на строку,
+    {"email": "user@example.com", "password": "secret", "roles": ["user"]}
+    {"email": "old@example.com", "password_hash": "$2b$12$...", "roles": []}
+CSV: заголовок `email,password,password_hash,roles`, роли перечисляются через `;`.
+
+    python -m src.commands.import_users users.ndjson --workers 8 --report import_errors.ndjson
+"""
+
+import argparse
+import asyncio
+import csv
+import json
+import os
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Any
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from src.core.config import settings
+from src.infrastructure.repositories.role import SQLAlchemyRoleRepository
+from src.infrastructure.repositories.user import SQLAlchemyUserRepository
+from src.services.hashing import HashingPolicy, ProcessPoolPasswordHasher
+from src.services.user_import import ImportReport, UserImportService
+
+
+def read_ndjson(path: Path) -> Iterator[tuple[int, dict[str, Any]]]:
+    with path.open(encoding="utf-8") as file:
+        for line, text in enumerate(file, start=1):
+            if not text.strip():
+                continue
+            try:
+                yield line, json.loads(text)
+            except json.JSONDecodeError:
+                yield line, {}
+
+
+def read_csv(path: Path) -> Iterator[tuple[int, dict[str, Any]]]:
+    with path.open(encoding="utf-8", newline="") as file:
+        for line, row in enumerate(csv.DictReader(file), start=2):
+            row["roles"] = [role for role in (row.get("roles") or "").split(";") if role]
+            yield line, row
+
+
+def write_report(report: ImportReport, path: Path) -> None:
+    with path.open("w", encoding="utf-8") as file:
+        for error in report.errors:
+            file.write(json.dumps({"line": error.line, "email": error.email, "error": error.error}) + "\n")
+
+
+async def main(args: argparse.Namespace) -> None:
+    path = Path(args.path)
+    rows = read_csv(path) if path.suffix == ".csv" else read_ndjson(path)
+    policy = HashingPolicy(
+        schemes=tuple(settings.hashing.schemes),
+        bcrypt_rounds=settings.hashing.bcrypt_rounds,
+        argon2_time_cost=settings.hashing.argon2_time_cost,
+        argon2_memory_cost=settings.hashing.argon2_memory_cost,
+        argon2_parallelism=settings.hashing.argon2_parallelism,
+    )
+    password_hasher = ProcessPoolPasswordHasher(
+        max_workers=args.workers,
+        max_in_flight=args.workers,
+        max_queue_size=args.batch_size,
+        timeout=args.hash_timeout,
+        policy=policy,
+    )
+    engine = create_async_engine(settings.db.db_url, echo=False)
+    session_maker = async_sessionmaker(bind=engine, expire_on_commit=False, class_=AsyncSession)
+    try:
+        async with session_maker() as session:
+            service = UserImportService(
+                user_repository=SQLAlchemyUserRepository(session=session),
+                role_repository=SQLAlchemyRoleRepository(session=session),
+                password_hasher=password_hasher,
+                policy=policy,
+                batch_size=args.batch_size,
+            )
+            report = await service.import_rows(rows)
+    finally:
+        password_hasher.shutdown()
+        await engine.dispose()
+
+    print(f"rows: {report.total}, imported: {report.imported}, errors: {len(report.errors)}")
+    print(f"elapsed: {report.seconds:.1f} s, throughput: {report.rows_per_second:.1f} rows/s")
+    if args.report:
+        write_report(report, Path(args.report))
+        print(f"errors report: {args.report}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("path", help="Путь к файлу .ndjson или .csv")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Процессов для хеширования")
+    parser.add_argument("--batch-size", type=int, default=1000, help="Строк в одной пачке записи")
+    parser.add_argument("--hash-timeout", type=float, default=600.0, help="Таймаут хеширования одной строки, с")
+    parser.add_argument("--report", help="Файл NDJSON для отчёта об ошибках по строкам")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,50 @@
+"""
+Обслуживание месячных партиций таблицы `sessions`.
+
+Создаёт партиции на `SESSION_PARTITION_MONTHS_AHEAD` месяцев вперёд и удаляет месяцы, все сессии которых
+истекли (`SESSION_PARTITION_RETENTION_DAYS`). Без `--interval` выполняется один раз (для cron).
+
+    python -m src.commands.maintain_session_partitions --interval 3600
+"""
+
+import argparse
+import asyncio
+from datetime import datetime, timedelta
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from src.core.config import settings
+from src.infrastructure.repositories.session_partitions import SQLAlchemySessionPartitionRepository
+from src.services.session_partitions import SessionPartitionService
+
+
+async def main(args: argparse.Namespace) -> None:
+    engine = create_async_engine(settings.db.db_url, echo=False)
+    session_maker = async_sessionmaker(bind=engine, expire_on_commit=False, class_=AsyncSession)
+    try:
+        while True:
+            async with session_maker() as session:
+                service = SessionPartitionService(
+                    repository=SQLAlchemySessionPartitionRepository(
+                        session=session, lock_timeout=settings.service.session_partition_lock_timeout
+                    ),
+                    months_ahead=settings.service.session_partition_months_ahead,
+                    retention=timedelta(days=settings.service.session_partition_retention_days),
+                )
+                report = await service.maintain(datetime.now())
+                await session.commit()
+            print(
+                f"created: {report.created}, dropped: {report.dropped}, kept: {report.kept}, "
+                f"failed: {report.failed}, moved from default: {report.moved}"
+            )
+            if args.interval is None:
+                break
+            await asyncio.sleep(args.interval)
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--interval", type=float, help="Повторять каждые N секунд вместо однократного запуска")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,54 @@
+import hashlib
+import math
+
+
+class BloomFilter:
+    """
+    Фильтр Блума: вероятностное множество без ложноотрицательных ответов.
+
+    `item in bloom_filter` возвращает False только для элементов, которые точно не добавлялись;
+    True означает «возможно, добавлялся» и требует проверки в основном хранилище.
+    """
+
+    def __init__(self, capacity: int, error_rate: float):
+        """
+        Инициализация фильтра.
+        :param capacity: Ожидаемое количество элементов.
+        :param error_rate: Допустимая доля ложноположительных ответов при заполнении до capacity.
+        """
+        capacity = max(capacity, 1)
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.count = 0
+        self._bits = bytearray((self.size + 7) // 8)
+
+    @classmethod
+    def with_memory_budget(cls, memory_bytes: int, error_rate: float) -> "BloomFilter":
+        """
+        Создаёт фильтр максимальной ёмкости, укладывающийся в заданный объём памяти.
+        :param memory_bytes: Объём памяти под битовый массив в байтах.
+        :param error_rate: Допустимая доля ложноположительных ответов.
+        :return: Экземпляр BloomFilter.
+        """
+        capacity = int(memory_bytes * 8 * math.log(2) ** 2 / -math.log(error_rate))
+        return cls(capacity=capacity, error_rate=error_rate)
+
+    @property
+    def memory_bytes(self) -> int:
+        return len(self._bits)
+
+    def add(self, item: str | bytes) -> None:
+        for position in self._positions(item):
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, item: str | bytes) -> bool:
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+    def _positions(self, item: str | bytes):
+        if isinstance(item, str):
+            item = item.encode()
+        digest = hashlib.blake2b(item, digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:], "little") | 1
+        return ((first + i * second) % self.size for i in range(self.hash_count))
@@ -1,7 +1,8 @@
-import logging
+import logging.config
 from pathlib import Path
+from typing import Literal
 
-from pydantic import Field, SecretStr
+from pydantic import Field, SecretStr, field_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 from src.core.logger import LOGGING
@@ -32,16 +33,72 @@ class ServiceSettings(ModelConfig):
         base_dir (Path): Базовый путь проекта.
         secret_key (SecretStr): Секретный ключ приложения (читается из переменной окружения `SECRET_KEY`).
         jwt_algorithm (str): Алгоритм для JWT токенов (читается из переменной окружения `JWT_ALGORITHM`).
+        jwt_private_key_path (Path | None): Закрытый ключ для асимметричных алгоритмов (RS256, EdDSA и т. д.).
+        jwt_key_id (str): Идентификатор активного ключа, передаётся в заголовке `kid`.
+        jwt_public_keys_dir (Path | None): Каталог с открытыми ключами `<kid>.pem`, принимаемыми при проверке.
+        jwt_permission_format (str): Формат прав в выпускаемых токенах: "mask" или "slugs" (на время выкатки).
+        jwt_token_profile (str): Профиль claim: "standard" (права в самом токене) или "compact" (роли в `rol`,
+            имена claim меняются — включать после перехода потребителей JWKS).
+        permission_registry_refresh_interval (float): Интервал обновления реестра прав и ролей из БД, с.
         debug (bool): Флаг режима отладки (по умолчанию False, читается из переменной `DEBAG`).
+        token_cache_size (int): Максимальное число проверенных токенов в кеше процесса (0 — кеш отключён).
+        token_cache_ttl (float): Максимальное время жизни записи кеша токенов в секундах.
+        email_filter_capacity (int): Ожидаемое число пользователей для фильтра email при регистрации.
+        email_filter_error_rate (float): Допустимая доля ложноположительных ответов фильтра email.
+        introspect_batch_limit (int): Наибольшее число токенов в одном запросе пакетной проверки.
+        refresh_single_flight_enabled (bool): Объединять параллельные обновления по одному refresh-токену.
+        refresh_grace_period (float): Сколько секунд повторное обновление старым токеном получает ту же пару.
+        refresh_lock_timeout (float): Время жизни блокировки ротации в Redis и наибольшее ожидание чужой ротации, с.
+        session_partition_months_ahead (int): На сколько месяцев вперёд создаются партиции `sessions`.
+        session_partition_retention_days (int): Через сколько дней без обновления сессия считается истекшей
+            (не меньше времени жизни refresh-токена).
+        session_partition_lock_timeout (float): Сколько секунд DDL партиций ждёт блокировку `sessions`.
+        session_cleanup_retention_days (int): Через сколько дней без обновления сессия удаляется обработчиком очистки.
+        session_cleanup_batch_size (int): Наибольшее число сессий, удаляемых одной транзакцией.
+        session_cleanup_rows_per_second (float): Бюджет удаления сессий, строк в секунду (0 — без ограничения).
+        session_cleanup_max_replication_lag (float): Отставание реплик, с, при котором очистка ждёт (0 — не проверять).
+        session_cleanup_interval (float): Пауза между проходами очистки, с.
+        session_cleanup_metrics_port (int): Порт, на котором обработчик очистки отдаёт метрики Prometheus.
+        sessions_page_size (int): Размер страницы списка сессий по умолчанию.
+        sessions_page_size_max (int): Наибольший размер страницы списка сессий (параметр `limit`).
     """
 
     base_dir: Path = Path(__file__).parent.parent.parent
     project_name: str = Field(default="auth service", validation_alias="PROJECT_NAME")
     secret_key: SecretStr = Field(..., validation_alias="SECRET_KEY")
     jwt_algorithm: str = Field(..., validation_alias="JWT_ALGORITHM")
+    jwt_private_key_path: Path | None = Field(default=None, validation_alias="JWT_PRIVATE_KEY_PATH")
+    jwt_key_id: str = Field(default="primary", validation_alias="JWT_KEY_ID")
+    jwt_public_keys_dir: Path | None = Field(default=None, validation_alias="JWT_PUBLIC_KEYS_DIR")
+    jwt_permission_format: Literal["mask", "slugs"] = Field(default="mask", validation_alias="JWT_PERMISSION_FORMAT")
+    jwt_token_profile: Literal["compact", "standard"] = Field(default="standard", validation_alias="JWT_TOKEN_PROFILE")
+    permission_registry_refresh_interval: float = Field(
+        default=60.0, validation_alias="PERMISSION_REGISTRY_REFRESH_INTERVAL"
+    )
     debug: bool = Field(default=False, validation_alias="DEBAG")
     refresh_token_expire: int = Field(default=60, validation_alias="REFRESH_TOKEN_EXPIRE")
     access_token_expire: int = Field(default=30, validation_alias="ACCESS_TOKEN_EXPIRE")
+    token_cache_size: int = Field(default=10_000, validation_alias="TOKEN_CACHE_SIZE")
+    token_cache_ttl: float = Field(default=60.0, validation_alias="TOKEN_CACHE_TTL")
+    email_filter_capacity: int = Field(default=1_000_000, validation_alias="EMAIL_FILTER_CAPACITY")
+    email_filter_error_rate: float = Field(default=0.01, validation_alias="EMAIL_FILTER_ERROR_RATE")
+    introspect_batch_limit: int = Field(default=100, validation_alias="INTROSPECT_BATCH_LIMIT")
+    refresh_single_flight_enabled: bool = Field(default=True, validation_alias="REFRESH_SINGLE_FLIGHT_ENABLED")
+    refresh_grace_period: float = Field(default=10.0, validation_alias="REFRESH_GRACE_PERIOD")
+    refresh_lock_timeout: float = Field(default=5.0, validation_alias="REFRESH_LOCK_TIMEOUT")
+    session_partition_months_ahead: int = Field(default=3, validation_alias="SESSION_PARTITION_MONTHS_AHEAD")
+    session_partition_retention_days: int = Field(default=30, validation_alias="SESSION_PARTITION_RETENTION_DAYS")
+    session_partition_lock_timeout: float = Field(default=5.0, validation_alias="SESSION_PARTITION_LOCK_TIMEOUT")
+    session_cleanup_retention_days: int = Field(default=30, validation_alias="SESSION_CLEANUP_RETENTION_DAYS")
+    session_cleanup_batch_size: int = Field(default=1000, validation_alias="SESSION_CLEANUP_BATCH_SIZE")
+    session_cleanup_rows_per_second: float = Field(default=5000.0, validation_alias="SESSION_CLEANUP_ROWS_PER_SECOND")
+    session_cleanup_max_replication_lag: float = Field(
+        default=10.0, validation_alias="SESSION_CLEANUP_MAX_REPLICATION_LAG"
+    )
+    session_cleanup_interval: float = Field(default=300.0, validation_alias="SESSION_CLEANUP_INTERVAL")
+    session_cleanup_metrics_port: int = Field(default=9464, validation_alias="SESSION_CLEANUP_METRICS_PORT")
+    sessions_page_size: int = Field(default=20, validation_alias="SESSIONS_PAGE_SIZE")
+    sessions_page_size_max: int = Field(default=100, validation_alias="SESSIONS_PAGE_SIZE_MAX")
 
 
 class JaegerSettings(ModelConfig):
@@ -93,10 +150,61 @@ class RedisSettings(ModelConfig):
     Attributes:
         redis_host (str): Хост Redis (читается из переменной `REDIS_HOST`).
         redis_port (str): Порт Redis (читается из переменной `REDIS_PORT`).
+        redis_mode (str): Топология: "standalone", "sentinel" или "cluster".
+        redis_password (SecretStr | None): Пароль Redis.
+        redis_db (int): Номер базы (не используется в режиме Cluster).
+        redis_sentinels (str): Адреса Sentinel через запятую, `host:port,host:port`.
+        redis_sentinel_master (str): Имя отслеживаемого Sentinel мастера.
+        redis_max_connections (int): Размер пула соединений (в режиме Cluster — на каждый узел).
+        redis_pool_timeout (float): Сколько секунд ждать свободного соединения из пула.
+        redis_socket_timeout (float): Таймаут операций с сокетом, с.
+        redis_socket_connect_timeout (float): Таймаут установки соединения, с.
+        redis_socket_keepalive (bool): Включать ли TCP keepalive.
+        redis_health_check_interval (int): Проверка простаивающего соединения PING перед выдачей, с (0 — отключена).
+        redis_protocol (int): Версия протокола: 2 (RESP2) или 3 (RESP3).
+        redis_client_tracking_enabled (bool): Кешировать ли чтения черного списка на клиенте (CLIENT TRACKING).
+        redis_client_tracking_max_entries (int): Наибольшее число ключей в клиентском кеше.
+        revocation_channel (str): Канал pub/sub, в который публикуются отозванные jti.
+        revocation_cache_enabled (bool): Держать ли в процессе локальную копию черного списка.
+        revocation_ping_interval (float): Интервал проверки подписки на канал отзыва, с.
+        revocation_filter_enabled (bool): Отсекать ли проверки неотозванных токенов фильтром Блума.
+        revocation_filter_error_rate (float): Допустимая доля ложноположительных ответов фильтра.
+        revocation_filter_capacity (int): Ожидаемое число отзывов за время жизни access-токена.
+        revocation_filter_memory_budget (int): Память под фильтр в байтах (0 — размер по ёмкости).
+        revocation_mget_chunk_size (int): Наибольшее число ключей в одной команде MGET при пакетной проверке.
+        revocation_legacy_keys_enabled (bool): Проверять также записи черного списка прежнего формата (текстовый jti);
+            отключается, когда таких ключей в Redis не осталось.
     """
 
     redis_host: str = Field(..., validation_alias="REDIS_HOST")
     redis_port: str = Field(..., validation_alias="REDIS_PORT")
+    redis_mode: Literal["standalone", "sentinel", "cluster"] = Field(
+        default="standalone", validation_alias="REDIS_MODE"
+    )
+    redis_password: SecretStr | None = Field(default=None, validation_alias="REDIS_PASSWORD")
+    redis_db: int = Field(default=0, validation_alias="REDIS_DB")
+    redis_sentinels: str = Field(default="", validation_alias="REDIS_SENTINELS")
+    redis_sentinel_master: str = Field(default="mymaster", validation_alias="REDIS_SENTINEL_MASTER")
+    redis_max_connections: int = Field(default=50, validation_alias="REDIS_MAX_CONNECTIONS")
+    redis_pool_timeout: float = Field(default=5.0, validation_alias="REDIS_POOL_TIMEOUT")
+    redis_socket_timeout: float = Field(default=2.0, validation_alias="REDIS_SOCKET_TIMEOUT")
+    redis_socket_connect_timeout: float = Field(default=2.0, validation_alias="REDIS_SOCKET_CONNECT_TIMEOUT")
+    redis_socket_keepalive: bool = Field(default=True, validation_alias="REDIS_SOCKET_KEEPALIVE")
+    redis_health_check_interval: int = Field(default=30, validation_alias="REDIS_HEALTH_CHECK_INTERVAL")
+    redis_protocol: int = Field(default=2, validation_alias="REDIS_PROTOCOL")
+    redis_client_tracking_enabled: bool = Field(default=False, validation_alias="REDIS_CLIENT_TRACKING_ENABLED")
+    redis_client_tracking_max_entries: int = Field(
+        default=100_000, validation_alias="REDIS_CLIENT_TRACKING_MAX_ENTRIES"
+    )
+    revocation_channel: str = Field(default="auth:revocations", validation_alias="REVOCATION_CHANNEL")
+    revocation_cache_enabled: bool = Field(default=True, validation_alias="REVOCATION_CACHE_ENABLED")
+    revocation_ping_interval: float = Field(default=5.0, validation_alias="REVOCATION_PING_INTERVAL")
+    revocation_filter_enabled: bool = Field(default=True, validation_alias="REVOCATION_FILTER_ENABLED")
+    revocation_filter_error_rate: float = Field(default=0.001, validation_alias="REVOCATION_FILTER_ERROR_RATE")
+    revocation_filter_capacity: int = Field(default=100_000, validation_alias="REVOCATION_FILTER_CAPACITY")
+    revocation_filter_memory_budget: int = Field(default=0, validation_alias="REVOCATION_FILTER_MEMORY_BUDGET")
+    revocation_mget_chunk_size: int = Field(default=500, validation_alias="REVOCATION_MGET_CHUNK_SIZE")
+    revocation_legacy_keys_enabled: bool = Field(default=True, validation_alias="REVOCATION_LEGACY_KEYS_ENABLED")
 
     @property
     def redis_url(self) -> str:
@@ -108,6 +216,62 @@ class RedisSettings(ModelConfig):
         """
         return f"redis://{self.redis_host}:{self.redis_port}"
 
+    @field_validator("redis_protocol")
+    @classmethod
+    def check_redis_protocol(cls, value: int) -> int:
+        """
+        Проверяет версию протокола (из окружения она приходит строкой, поэтому поле объявлено как int).
+
+        Returns:
+            int: 2 или 3.
+        """
+        if value not in (2, 3):
+            raise ValueError("REDIS_PROTOCOL должен быть 2 или 3")
+        return value
+
+    @property
+    def sentinel_addresses(self) -> list[tuple[str, int]]:
+        """
+        Разбирает адреса Sentinel из `REDIS_SENTINELS`.
+
+        Returns:
+            list[tuple[str, int]]: Пары (хост, порт).
+        """
+        addresses = []
+        for address in filter(None, (item.strip() for item in self.redis_sentinels.split(","))):
+            host, _, port = address.rpartition(":")
+            addresses.append((host, int(port)))
+        return addresses
+
+
+class HashingSettings(ModelConfig):
+    """
+    Настройки пула процессов для хеширования паролей.
+
+    Attributes:
+        workers (int): Количество процессов в пуле (читается из переменной `HASHING_WORKERS`).
+        max_in_flight (int): Максимальное число операций, одновременно переданных в пул.
+        max_queue_size (int): Максимальное число операций, ожидающих свободного слота.
+        timeout (float): Время ожидания результата одной операции в секундах.
+        retry_after (int): Значение заголовка Retry-After (в секундах) при перегрузке.
+        schemes (list[str]): Схемы хеширования (`bcrypt`, `argon2`); первая используется для новых хешей.
+        bcrypt_rounds (int): Стоимость bcrypt (log2 числа раундов).
+        argon2_time_cost (int): Число итераций схемы `argon2` (вариант argon2id).
+        argon2_memory_cost (int): Объём памяти схемы `argon2` в КиБ.
+        argon2_parallelism (int): Степень параллелизма схемы `argon2`.
+    """
+
+    workers: int = Field(default=2, validation_alias="HASHING_WORKERS")
+    max_in_flight: int = Field(default=4, validation_alias="HASHING_MAX_IN_FLIGHT")
+    max_queue_size: int = Field(default=64, validation_alias="HASHING_MAX_QUEUE_SIZE")
+    timeout: float = Field(default=5.0, validation_alias="HASHING_TIMEOUT")
+    retry_after: int = Field(default=1, validation_alias="HASHING_RETRY_AFTER")
+    schemes: list[str] = Field(default=["bcrypt"], validation_alias="HASHING_SCHEMES")
+    bcrypt_rounds: int = Field(default=12, validation_alias="HASHING_BCRYPT_ROUNDS")
+    argon2_time_cost: int = Field(default=3, validation_alias="HASHING_ARGON2_TIME_COST")
+    argon2_memory_cost: int = Field(default=65536, validation_alias="HASHING_ARGON2_MEMORY_COST")
+    argon2_parallelism: int = Field(default=4, validation_alias="HASHING_ARGON2_PARALLELISM")
+
 
 class OAuthSettings(ModelConfig):
     """Настройки для OAuth аутентификации"""
@@ -126,12 +290,14 @@ class Settings(BaseSettings):
         service (ServiceSettings): Настройки сервиса.
         postgres (DBSettings): Настройки базы данных.
         redis (RedisSettings): Настройки Redis.
+        hashing (HashingSettings): Настройки хеширования паролей.
     """
 
     service: ServiceSettings = ServiceSettings()
     db: DBSettings = DBSettings()
     redis: RedisSettings = RedisSettings()
     jaeger: JaegerSettings = JaegerSettings()
+    hashing: HashingSettings = HashingSettings()
     oauth: OAuthSettings = OAuthSettings()
 
 
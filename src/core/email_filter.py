@@ -0,0 +1,21 @@
+from src.core.bloom import BloomFilter
+from src.domain.repositories import AbstractUserRepository
+
+# Фильтр email зарегистрированных пользователей, заполняется при старте приложения.
+email_filter: BloomFilter | None = None
+
+
+def get_email_filter() -> BloomFilter | None:
+    return email_filter
+
+
+async def fill_email_filter(bloom_filter: BloomFilter, user_repository: AbstractUserRepository) -> BloomFilter:
+    """
+    Заполняет фильтр email всех зарегистрированных пользователей.
+    :param bloom_filter: Пустой фильтр.
+    :param user_repository: Репозиторий пользователей.
+    :return: Заполненный фильтр.
+    """
+    async for email in user_repository.iter_emails(batch_size=10_000):
+        bloom_filter.add(email)
+    return bloom_filter
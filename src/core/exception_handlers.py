@@ -4,12 +4,15 @@ from typing import Any, NoReturn
 
 from fastapi import HTTPException, Request, Response
 
+from src.core.config import settings
 from src.domain.exceptions import (
     Forbidden,
+    InvalidCursor,
     OAuthAccessTokenNotFound,
     OAuthResponseDecodeError,
     OAuthTokenExchangeError,
     OAuthUserInfoError,
+    PasswordHasherIsBusy,
     PasswordsNotMatch,
     SessionHasExpired,
     UserIsExists,
@@ -20,18 +23,19 @@ from src.domain.exceptions import (
 
 
 def create_exception_handler(
-    status_code: int, detail: str
+    status_code: int, detail: str, headers: dict[str, str] | None = None
 ) -> Callable[[Request, Exception], Coroutine[Any, Any, NoReturn]]:
     """
     Фабрика для создания обработчиков исключений.
 
     :param status_code: HTTP-статус, который будет возвращён.
     :param detail: Сообщение об ошибке для клиента.
+    :param headers: Дополнительные заголовки ответа.
     :return: Функция-обработчик исключения.
     """
 
     async def handler(request: Request, exc: Exception) -> NoReturn:
-        raise HTTPException(status_code=status_code, detail=detail)
+        raise HTTPException(status_code=status_code, detail=detail, headers=headers)
 
     return handler
 
@@ -77,6 +81,16 @@ oauth_user_info_error_handler = create_exception_handler(
     detail="Ошибка при получении информации о пользователе от Yandex.",
 )
 
+invalid_cursor_handler = create_exception_handler(
+    status_code=HTTPStatus.BAD_REQUEST, detail="Некорректный курсор страницы"
+)
+
+password_hasher_is_busy_handler = create_exception_handler(
+    status_code=HTTPStatus.SERVICE_UNAVAILABLE,
+    detail="Сервис перегружен, повторите попытку позже.",
+    headers={"Retry-After": str(settings.hashing.retry_after)},
+)
+
 
 exception_handlers: dict[type[Exception], Callable[[Request, Exception], Coroutine[Any, Any, Response]]] = {
     UserIsExists: user_exists_handler,
@@ -90,4 +104,6 @@ exception_handlers: dict[type[Exception], Callable[[Request, Exception], Corouti
     OAuthResponseDecodeError: oauth_decode_error_handler,
     OAuthAccessTokenNotFound: oauth_token_missing_handler,
     OAuthUserInfoError: oauth_user_info_error_handler,
+    PasswordHasherIsBusy: password_hasher_is_busy_handler,
+    InvalidCursor: invalid_cursor_handler,
 }
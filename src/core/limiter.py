@@ -0,0 +1,73 @@
+import asyncio
+import time
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
+from src.core.metrics import meter
+
+in_flight_counter = meter.create_up_down_counter(
+    "limiter.in_flight", description="Количество операций, выполняющихся под ограничителем"
+)
+waiting_counter = meter.create_up_down_counter(
+    "limiter.waiting", description="Количество операций, ожидающих слота в ограничителе"
+)
+rejected_counter = meter.create_counter("limiter.rejected", description="Количество отклонённых операций")
+wait_time_histogram = meter.create_histogram(
+    "limiter.wait_time", unit="ms", description="Время ожидания слота в ограничителе"
+)
+
+
+class LimitExceeded(Exception):
+    pass
+
+
+class ConcurrencyLimiter:
+    """
+    Ограничивает число одновременно выполняемых операций и длину очереди ожидания.
+
+    Если все слоты заняты и очередь заполнена, новая операция сразу отклоняется
+    исключением LimitExceeded, а не встаёт в бесконечную очередь.
+    """
+
+    def __init__(self, name: str, max_concurrency: int, max_waiting: int):
+        """
+        Инициализация ограничителя.
+        :param name: Имя ограничителя (используется как атрибут метрик).
+        :param max_concurrency: Максимальное число одновременно выполняемых операций.
+        :param max_waiting: Максимальное число операций в очереди ожидания.
+        """
+        self._attributes = {"limiter": name}
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._max_waiting = max_waiting
+        self._waiting = 0
+
+    @property
+    def waiting(self) -> int:
+        return self._waiting
+
+    @asynccontextmanager
+    async def acquire(self) -> AsyncIterator[None]:
+        """
+        Занимает слот на время выполнения операции.
+        :raises LimitExceeded: Если слотов нет и очередь ожидания заполнена.
+        """
+        if self._semaphore.locked() and self._waiting >= self._max_waiting:
+            rejected_counter.add(1, self._attributes)
+            raise LimitExceeded
+
+        started = time.perf_counter()
+        self._waiting += 1
+        waiting_counter.add(1, self._attributes)
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self._waiting -= 1
+            waiting_counter.add(-1, self._attributes)
+        wait_time_histogram.record((time.perf_counter() - started) * 1000, self._attributes)
+
+        in_flight_counter.add(1, self._attributes)
+        try:
+            yield
+        finally:
+            in_flight_counter.add(-1, self._attributes)
+            self._semaphore.release()
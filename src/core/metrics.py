@@ -0,0 +1,5 @@
+from opentelemetry import metrics
+
+# Инструменты создаются через глобальный meter и начинают отдавать данные,
+# как только в main.py будет установлен MeterProvider.
+meter = metrics.get_meter("auth_service")
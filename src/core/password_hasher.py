@@ -0,0 +1,7 @@
+from src.services.hashing import ProcessPoolPasswordHasher
+
+password_hasher: ProcessPoolPasswordHasher | None = None
+
+
+def get_password_hasher() -> ProcessPoolPasswordHasher:
+    return password_hasher
@@ -0,0 +1,215 @@
+import asyncio
+import base64
+import logging
+from collections.abc import Callable, Iterable
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from src.domain.entities import Permission, Role, Token
+from src.domain.repositories import AbstractPermissionRepository, AbstractRoleRepository
+
+logger = logging.getLogger(__name__)
+
+
+def encode_permission_mask(mask: int) -> str:
+    """
+    Кодирует битовую маску прав в компактную строку для claim `pmask`.
+    :param mask: Маска, где бит `bit_index` соответствует праву.
+    :return: base64url без выравнивания (little-endian).
+    """
+    raw = mask.to_bytes((mask.bit_length() + 7) // 8, "little")
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def decode_permission_mask(value: str) -> int:
+    """
+    Декодирует claim `pmask` обратно в целое число.
+    :param value: Строка base64url без выравнивания.
+    :return: Битовая маска прав.
+    """
+    return int.from_bytes(base64.urlsafe_b64decode(value + "=" * (-len(value) % 4)), "little")
+
+
+class PermissionRegistry:
+    """
+    Соответствие slug прав и их битов в маске токена, а также маски прав каждой роли.
+
+    Биты выдаются последовательностью БД и никогда не переиспользуются, поэтому маска,
+    выпущенная раньше, остаётся верной и после добавления или удаления прав. Маски ролей
+    позволяют хранить в компактном токене только slug ролей (claim `rol`) и раскрывать их
+    в права на стороне сервиса. Версия реестра увеличивается при каждом изменении;
+    по ней зависимости пересобирают скомпилированные маски.
+    """
+
+    def __init__(self, permissions: Iterable[Permission] = (), roles: Iterable[Role] = ()):
+        self._bits: dict[str, int] = {}
+        self._role_masks: dict[str, int] = {}
+        self.version = 0
+        self.load(permissions, roles)
+
+    def __len__(self) -> int:
+        return len(self._bits)
+
+    def load(self, permissions: Iterable[Permission], roles: Iterable[Role]) -> None:
+        """
+        Полностью заменяет содержимое реестра.
+        :param permissions: Все права.
+        :param roles: Все роли с правами.
+        """
+        bits = {permission.slug: permission.bit_index for permission in permissions if permission.bit_index is not None}
+        role_masks = {role.slug: self._role_mask(role) for role in roles}
+        if bits != self._bits or role_masks != self._role_masks:
+            self._bits, self._role_masks = bits, role_masks
+            self.version += 1
+
+    def register(self, permission: Permission) -> None:
+        """
+        Добавляет право в реестр.
+        :param permission: Право с назначенным `bit_index`.
+        """
+        if permission.bit_index is None or self._bits.get(permission.slug) == permission.bit_index:
+            return
+        self._bits[permission.slug] = permission.bit_index
+        self.version += 1
+
+    def register_role(self, role: Role) -> None:
+        """
+        Добавляет или обновляет маску прав роли.
+        :param role: Роль с загруженными правами.
+        """
+        for permission in role.permissions:
+            self.register(permission)
+        mask = self._role_mask(role)
+        if self._role_masks.get(role.slug) != mask:
+            self._role_masks[role.slug] = mask
+            self.version += 1
+
+    def compile(self, slugs: Iterable[str]) -> int | None:
+        """
+        Собирает маску из набора slug прав.
+        :param slugs: Slug прав.
+        :return: Битовая маска или None, если хотя бы одно право реестру неизвестно.
+        """
+        mask = 0
+        for slug in slugs:
+            bit_index = self._bits.get(slug)
+            if bit_index is None:
+                return None
+            mask |= 1 << bit_index
+        return mask
+
+    def roles_mask(self, role_slugs: Iterable[str]) -> int:
+        """
+        Собирает маску прав по списку ролей; неизвестные роли прав не дают.
+        :param role_slugs: Slug ролей.
+        :return: Битовая маска прав.
+        """
+        mask = 0
+        for slug in role_slugs:
+            mask |= self._role_masks.get(slug, 0)
+        return mask
+
+    def slugs(self, mask: int) -> list[str]:
+        """
+        Раскрывает маску обратно в список slug прав.
+        :param mask: Битовая маска прав.
+        :return: Список slug прав, известных реестру.
+        """
+        return [slug for slug, bit_index in self._bits.items() if mask >> bit_index & 1]
+
+    @staticmethod
+    def _role_mask(role: Role) -> int:
+        mask = 0
+        for permission in role.permissions:
+            if permission.bit_index is not None:
+                mask |= 1 << permission.bit_index
+        return mask
+
+
+class PermissionCheck:
+    """
+    Требование набора прав, скомпилированное в маску.
+
+    Маска собирается один раз и пересобирается только при смене версии реестра; проверка токена
+    с claim `pmask` или `rol` сводится к побитовому И. Токены со списком `scope` (выпущенные до
+    перехода на маски) проверяются по множеству slug.
+    """
+
+    def __init__(self, slugs: Iterable[str]):
+        self._slugs = frozenset(slugs)
+        self._version: int | None = None
+        self._mask: int | None = None
+
+    def is_satisfied(self, token: Token, registry: PermissionRegistry) -> bool:
+        """
+        Проверяет, что токен содержит все требуемые права.
+        :param token: Декодированный токен.
+        :param registry: Реестр прав.
+        :return: True, если права есть.
+        """
+        if not self._slugs:
+            return True
+        if token.pmask is None and token.roles is None:
+            return self._slugs.issubset(token.scope)
+        if self._version != registry.version:
+            self._mask = registry.compile(self._slugs)
+            self._version = registry.version
+            if self._mask is None:
+                logger.warning("Требуемые права отсутствуют в реестре: %s", sorted(self._slugs))
+        if self._mask is None:
+            return False
+        if token.roles is not None:
+            token_mask = registry.roles_mask(token.roles)
+        else:
+            token_mask = decode_permission_mask(token.pmask)
+        return token_mask & self._mask == self._mask
+
+
+# Реестр прав, заполняется при старте приложения и периодически обновляется.
+permission_registry: PermissionRegistry = PermissionRegistry()
+
+
+def get_permission_registry() -> PermissionRegistry:
+    return permission_registry
+
+
+async def refresh_permission_registry(
+    registry: PermissionRegistry,
+    permission_repository: AbstractPermissionRepository,
+    role_repository: AbstractRoleRepository,
+) -> None:
+    """
+    Перечитывает права и роли из БД в реестр.
+    :param registry: Реестр прав.
+    :param permission_repository: Репозиторий прав.
+    :param role_repository: Репозиторий ролей.
+    """
+    registry.load(await permission_repository.get_all_permissions(), await role_repository.get_all_roles())
+    logger.debug("Реестр прав обновлён: %s прав, версия %s", len(registry), registry.version)
+
+
+async def keep_permission_registry_fresh(
+    registry: PermissionRegistry,
+    session_maker: async_sessionmaker[AsyncSession],
+    permission_repository_factory: Callable[[AsyncSession], AbstractPermissionRepository],
+    role_repository_factory: Callable[[AsyncSession], AbstractRoleRepository],
+    interval: float,
+) -> None:
+    """
+    Фоновая задача: обновляет реестр с заданным интервалом, чтобы изменения ролей,
+    сделанные в других процессах, доходили до проверки прав.
+    :param registry: Реестр прав.
+    :param session_maker: Фабрика сессий БД.
+    :param permission_repository_factory: Создаёт репозиторий прав для сессии БД.
+    :param role_repository_factory: Создаёт репозиторий ролей для сессии БД.
+    :param interval: Интервал обновления в секундах.
+    """
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            async with session_maker() as session:
+                await refresh_permission_registry(
+                    registry, permission_repository_factory(session), role_repository_factory(session)
+                )
+        except Exception:
+            logger.exception("Не удалось обновить реестр прав")
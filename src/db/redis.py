@@ -1,6 +1,115 @@
-from redis.asyncio import Redis
+import time
+from typing import Any
 
-redis: Redis | None = None
+from redis.asyncio import BlockingConnectionPool, Redis
+from redis.asyncio.cluster import RedisCluster
+from redis.asyncio.sentinel import Sentinel, SentinelConnectionPool
+
+from src.core.config import RedisSettings
+from src.core.metrics import meter
+
+redis: Redis | RedisCluster | None = None
+# Отдельный клиент для pub/sub: в режиме Cluster подписка идёт через обычное соединение с одним из узлов
+# (PUBLISH в кластере рассылается на все узлы), в остальных режимах это тот же клиент, что и `redis`.
+pubsub_redis: Redis | None = None
+
+pool_checkouts_counter = meter.create_counter("redis.pool.checkouts", description="Выдачи соединений из пула Redis")
+pool_wait_histogram = meter.create_histogram(
+    "redis.pool.wait_time", unit="s", description="Время ожидания свободного соединения в пуле Redis"
+)
+pool_in_use_counter = meter.create_up_down_counter(
+    "redis.pool.in_use", description="Соединения Redis, выданные из пула и ещё не возвращённые"
+)
+
+
+class InstrumentedPoolMixin:
+    """Снимает метрики выдачи соединений: число выдач, время ожидания и занятые соединения."""
+
+    async def get_connection(self, command_name, *keys, **options):
+        started = time.perf_counter()
+        connection = await super().get_connection(command_name, *keys, **options)
+        pool_wait_histogram.record(time.perf_counter() - started)
+        pool_checkouts_counter.add(1)
+        pool_in_use_counter.add(1)
+        return connection
+
+    async def release(self, connection) -> None:
+        await super().release(connection)
+        pool_in_use_counter.add(-1)
+
+
+class InstrumentedBlockingConnectionPool(InstrumentedPoolMixin, BlockingConnectionPool):
+    pass
+
+
+class InstrumentedSentinelConnectionPool(InstrumentedPoolMixin, SentinelConnectionPool):
+    pass
+
+
+def connection_kwargs(config: RedisSettings) -> dict[str, Any]:
+    """
+    Общие параметры соединений для всех топологий.
+    :param config: Настройки Redis.
+    :return: Именованные аргументы клиента redis-py.
+    """
+    return {
+        "password": config.redis_password.get_secret_value() if config.redis_password else None,
+        "socket_timeout": config.redis_socket_timeout,
+        "socket_connect_timeout": config.redis_socket_connect_timeout,
+        "socket_keepalive": config.redis_socket_keepalive,
+        "health_check_interval": config.redis_health_check_interval,
+        "protocol": config.redis_protocol,
+    }
+
+
+def create_redis(config: RedisSettings) -> Redis | RedisCluster:
+    """
+    Создаёт клиент Redis для настроенной топологии: одиночный сервер, Sentinel или Cluster.
+    :param config: Настройки Redis.
+    :return: Клиент Redis или RedisCluster.
+    """
+    kwargs = connection_kwargs(config)
+    if config.redis_mode == "cluster":
+        # У клиента кластера свой набор соединений на каждый узел, метрики пула для него не снимаются.
+        return RedisCluster(
+            host=config.redis_host,
+            port=int(config.redis_port),
+            max_connections=config.redis_max_connections,
+            **kwargs,
+        )
+    if config.redis_mode == "sentinel":
+        sentinel = Sentinel(
+            config.sentinel_addresses,
+            sentinel_kwargs={key: kwargs[key] for key in ("password", "socket_timeout", "socket_connect_timeout")},
+            **kwargs,
+        )
+        return sentinel.master_for(
+            config.redis_sentinel_master,
+            connection_pool_class=InstrumentedSentinelConnectionPool,
+            db=config.redis_db,
+            max_connections=config.redis_max_connections,
+        )
+    pool = InstrumentedBlockingConnectionPool(
+        host=config.redis_host,
+        port=int(config.redis_port),
+        db=config.redis_db,
+        max_connections=config.redis_max_connections,
+        timeout=config.redis_pool_timeout,
+        **kwargs,
+    )
+    return Redis.from_pool(pool)
+
+
+def create_pubsub_redis(client: Redis | RedisCluster, config: RedisSettings) -> Redis:
+    """
+    Возвращает клиент для подписки на каналы.
+    :param client: Основной клиент Redis.
+    :param config: Настройки Redis.
+    :return: Клиент, поддерживающий pub/sub.
+    """
+    if isinstance(client, RedisCluster):
+        return Redis(host=config.redis_host, port=int(config.redis_port), **connection_kwargs(config))
+    return client
 
 
 # Функция понадобится при внедрении зависимостей
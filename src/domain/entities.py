@@ -29,19 +29,91 @@ class User(BaseEntity):
     updated_at: datetime | None = None
 
 
+@dataclass
+class NewUser:
+    email: str
+    password: str
+    roles: list[str] = field(default_factory=list)
+
+
 @dataclass
 class Token:
     user_uuid: str
     iat: str
     exp: str
     jti: str
-    scope: list[str]
+    scope: list[str] = field(default_factory=list)
+    pmask: str | None = None
+    roles: list[str] | None = None
+    # Тип устройства сессии (claim `dvc` refresh-токена) — ключ партиции таблицы sessions
+    device_type: str | None = None
+    # Идентификатор сессии (claim `sid` refresh-токена), общий для всех её ротаций
+    session_id: str | None = None
+
+
+@dataclass
+class RevocationEpoch:
+    """Эпоха отзыва: токены пользователя, выпущенные до `issued_before`, недействительны (кроме `keep_jti`)."""
+
+    issued_before: int
+    keep_jti: str | None = None
+
+    def revokes(self, token: Token) -> bool:
+        return int(token.iat) < self.issued_before and str(token.jti) != self.keep_jti
+
+
+@dataclass
+class SessionPartition:
+    """Месячная партиция таблицы sessions: строки с `starts_at <= created_at < ends_at` одного типа устройства."""
+
+    name: str
+    parent: str
+    starts_at: datetime
+    ends_at: datetime
+
+
+@dataclass
+class SessionCleanupCheckpoint:
+    """Ключ последней удалённой сессии: следующая пачка очистки начинается строго после него."""
+
+    updated_at: datetime
+    session_id: UUID
+
+
+@dataclass
+class SessionCleanupBatch:
+    """Результат одной пачки очистки: число удалённых строк и сохранённый курсор (None — проход завершён)."""
+
+    deleted: int
+    checkpoint: SessionCleanupCheckpoint | None
+
+
+@dataclass
+class SessionRotation:
+    """
+    Результат ротации refresh-токена одним запросом к БД.
+    Если токен уже был заменён, сессия закрывается и в `reused_jti` возвращается её последний jti.
+    """
+
+    session_id: UUID | None = None
+    device_type: str | None = None
+    user_id: UUID | None = None
+    roles: list[str] = field(default_factory=list)
+    reused_jti: str | None = None
+
+
+@dataclass
+class TokenPair:
+    access_token: str
+    refresh_token: str
+    jti: str
 
 
 @dataclass
 class Permission:
     slug: str
     description: str
+    bit_index: int | None = None
 
 
 @dataclass
@@ -58,9 +130,17 @@ class Session(BaseEntity):
     user_id: UUID
     user_agent: str
     jti: UUID
-    refresh_token: str
+    refresh_token_digest: bytes
     user_ip: str | None
     is_active: bool
     device_type: str = "other"
     created_at: datetime | None = None
     updated_at: datetime | None = None
+
+
+@dataclass
+class SessionPage:
+    """Страница сессий пользователя: `next_cursor` передаётся за следующей страницей (None — страница последняя)."""
+
+    sessions: list[Session]
+    next_cursor: str | None
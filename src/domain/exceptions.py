@@ -46,6 +46,26 @@ class SessionHasExpired(Exception):
     pass
 
 
+class RefreshTokenReused(SessionHasExpired):
+    """Предъявлен refresh-токен, уже заменённый при ротации: сессия закрыта."""
+
+    def __init__(self, jti: str):
+        super().__init__(jti)
+        self.jti = jti
+
+
+class InvalidCursor(Exception):
+    """Курсор страницы повреждён или выдан не этим сервисом."""
+
+    pass
+
+
+class PasswordHasherIsBusy(Exception):
+    """Пул хеширования паролей перегружен или не ответил вовремя."""
+
+    pass
+
+
 class OAuthTokenExchangeError(Exception):
     """Ошибка обмена кода на токен."""
 
@@ -1,8 +1,18 @@
+import hashlib
 from uuid import UUID
 
 from src.domain.entities import Session
 
 
+def refresh_token_digest(refresh_token: str) -> bytes:
+    """
+    SHA-256 от refresh-токена: сессия хранится и ищется по нему, а не по строке JWT.
+    :param refresh_token: Refresh-токен в виде строки.
+    :return: Дайджест длиной 32 байта.
+    """
+    return hashlib.sha256(refresh_token.encode()).digest()
+
+
 class SessionFactory:
     @staticmethod
     def create(
@@ -11,13 +21,14 @@ class SessionFactory:
         user_agent: str,
         refresh_token: str,
         user_ip: str | None = None,
+        session_id: UUID | None = None,
     ) -> Session:
         return Session(
-            id=None,
+            id=session_id,
             user_id=user_id,
             jti=jti,
             user_agent=user_agent,
             user_ip=user_ip,
-            refresh_token=refresh_token,
+            refresh_token_digest=refresh_token_digest(refresh_token),
             is_active=True,
         )
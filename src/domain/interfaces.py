@@ -1,8 +1,8 @@
 from abc import ABC, abstractmethod
-from datetime import timedelta
+from datetime import datetime
 from uuid import UUID
 
-from src.domain.entities import Session, Token, User
+from src.domain.entities import Session, SessionPage, SessionRotation, Token, TokenPair, User
 
 
 class AbstractJWTService(ABC):
@@ -14,11 +14,35 @@ class AbstractJWTService(ABC):
     def generate_refresh_token(self, user: User) -> str:
         raise NotImplementedError
 
+    @abstractmethod
+    def mint_token_pair(
+        self, user: User, device_type: str | None = None, session_id: str | UUID | None = None
+    ) -> TokenPair:
+        raise NotImplementedError
+
+    @abstractmethod
+    def rotate_token_pair(self, token: Token) -> TokenPair:
+        raise NotImplementedError
+
     @abstractmethod
     def decode_token(self, jwt_token: str) -> Token:
         raise NotImplementedError
 
 
+class AbstractPasswordHasher(ABC):
+    @abstractmethod
+    async def hash(self, password: str) -> str:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def verify(self, password: str, hashed_password: str) -> bool:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def verify_and_update(self, password: str, hashed_password: str) -> tuple[bool, str | None]:
+        raise NotImplementedError
+
+
 class AbstractAuthService(ABC):
     @abstractmethod
     async def registration_new_user(self, email: str, password: str) -> User:
@@ -39,19 +63,37 @@ class AbstractSessionService(ABC):
         raise NotImplementedError
 
     @abstractmethod
-    async def deactivate_current_session(self, refresh_token: str) -> Session | None:
+    async def get_current_session(self, refresh_token: str, device_type: str | None = None) -> Session:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def deactivate_current_session(self, refresh_token: str, device_type: str | None = None) -> Session | None:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def deactivate_all_without_current(self, refresh_token: str, device_type: str | None = None) -> list[str]:
         raise NotImplementedError
 
     @abstractmethod
-    async def deactivate_all_without_current(self, refresh_token: str) -> list[Session]:
+    async def deactivate_user_sessions(self, user_id: UUID | str, keep_jti: str | None = None) -> list[str]:
         raise NotImplementedError
 
     @abstractmethod
-    async def update_session_refresh_token(self, old_refresh_token: str, new_refresh_token: str) -> Session | None:
+    async def update_session_refresh_token(
+        self,
+        old_refresh_token: str,
+        new_refresh_token: str,
+        new_jti: str,
+        device_type: str | None = None,
+        session_id: str | None = None,
+        created_at: datetime | None = None,
+    ) -> SessionRotation:
         raise NotImplementedError
 
     @abstractmethod
-    async def get_current_user_sessions(self, user_id: UUID | str) -> list[Session]:
+    async def get_current_user_sessions(
+        self, user_id: UUID | str, limit: int, cursor: str | None = None, active: bool | None = None
+    ) -> SessionPage:
         raise NotImplementedError
 
 
@@ -61,11 +103,27 @@ class AbstractBlacklistService(ABC):
         raise NotImplementedError
 
     @abstractmethod
-    async def set_one_value(self, key: str, value: str, exp: timedelta) -> None:
+    async def is_token_revoked(self, token: Token) -> bool:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def are_revoked(self, jtis: list[str]) -> dict[str, bool]:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def are_tokens_revoked(self, tokens: list[Token]) -> list[bool]:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def revoke_user_tokens(self, user_id: str, keep_jti: str | None = None) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def revoke(self, expirations: dict[str, int]) -> None:
         raise NotImplementedError
 
     @abstractmethod
-    async def set_many_values(self, values: list[dict[str, str]], exp: timedelta) -> None:
+    async def revoke_tokens(self, tokens: list[Token]) -> None:
         raise NotImplementedError
 
 
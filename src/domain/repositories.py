@@ -1,8 +1,20 @@
 from abc import ABC, abstractmethod
-from datetime import timedelta
+from collections.abc import AsyncIterator
+from datetime import datetime, timedelta
 from uuid import UUID
 
-from src.domain.entities import Permission, Role, Session, User
+from src.domain.entities import (
+    NewUser,
+    Permission,
+    RevocationEpoch,
+    Role,
+    Session,
+    SessionCleanupBatch,
+    SessionCleanupCheckpoint,
+    SessionPartition,
+    SessionRotation,
+    User,
+)
 
 
 class AbstractUserRepository(ABC):
@@ -18,10 +30,22 @@ class AbstractUserRepository(ABC):
     async def get_by_id(self, user_id: str) -> User | None:
         raise NotImplementedError
 
+    @abstractmethod
+    async def exists_by_email(self, email: str) -> bool:
+        raise NotImplementedError
+
+    @abstractmethod
+    def iter_emails(self, batch_size: int) -> AsyncIterator[str]:
+        raise NotImplementedError
+
     @abstractmethod
     async def update(self, user: User) -> User:
         raise NotImplementedError
 
+    @abstractmethod
+    async def bulk_create(self, users: list[NewUser]) -> list[str]:
+        raise NotImplementedError
+
 
 class AbstractSessionRepository(ABC):
     @abstractmethod
@@ -29,11 +53,38 @@ class AbstractSessionRepository(ABC):
         raise NotImplementedError
 
     @abstractmethod
-    async def get_by_refresh_token(self, refresh_token: str) -> Session | None:
+    async def get_by_refresh_token(self, refresh_token: str, device_type: str | None = None) -> Session | None:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def rotate_refresh_token(
+        self,
+        old_refresh_token: str,
+        new_refresh_token: str,
+        new_jti: str | UUID,
+        session_id: str | UUID | None = None,
+        device_type: str | None = None,
+        created_at: datetime | None = None,
+    ) -> SessionRotation:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def deactivate_user_sessions(
+        self,
+        user_id: str | UUID,
+        keep_id: str | UUID | None = None,
+        keep_jti: str | UUID | None = None,
+    ) -> list[str]:
         raise NotImplementedError
 
     @abstractmethod
-    async def get_sessions_by_user_id(self, user_id: str | UUID) -> list[Session]:
+    def iter_user_sessions(
+        self,
+        user_id: str | UUID,
+        limit: int,
+        after: tuple[datetime, UUID] | None = None,
+        active: bool | None = None,
+    ) -> AsyncIterator[Session]:
         raise NotImplementedError
 
     @abstractmethod
@@ -41,6 +92,48 @@ class AbstractSessionRepository(ABC):
         raise NotImplementedError
 
 
+class AbstractSessionPartitionRepository(ABC):
+    @abstractmethod
+    async def get_device_partitions(self) -> list[str]:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def get_month_partitions(self) -> list[SessionPartition]:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def create_month_partition(self, parent: str, starts_at: datetime, ends_at: datetime) -> SessionPartition:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def count_default_rows(self, parent: str, starts_at: datetime, ends_at: datetime) -> int:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def has_live_sessions(self, partition: SessionPartition, updated_after: datetime) -> bool:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def drop_month_partition(self, partition: SessionPartition) -> None:
+        raise NotImplementedError
+
+
+class AbstractSessionCleanupRepository(ABC):
+    @abstractmethod
+    async def get_checkpoint(self, name: str) -> SessionCleanupCheckpoint | None:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def delete_expired_batch(
+        self, name: str, expired_before: datetime, after: SessionCleanupCheckpoint | None, limit: int
+    ) -> SessionCleanupBatch:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def get_replication_lag(self) -> float:
+        raise NotImplementedError
+
+
 class AbstractPermissionRepository(ABC):
     @abstractmethod
     async def create_permission(self, slug: str, description: str | None) -> Permission:
@@ -101,13 +194,29 @@ class AbstractRoleRepository(ABC):
 
 class AbstractBlacklistRepository(ABC):
     @abstractmethod
-    def get_value(self, key: str) -> str:
+    async def get_value(self, key: str) -> bytes | None:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def are_revoked(self, jtis: list[str]) -> list[bool]:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def get_user_epochs(self, user_ids: list[str]) -> list[RevocationEpoch | None]:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def set_value(self, key: str, exp: timedelta | int | None = None) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def set_many_values(self, values: dict[str, timedelta | int | None]) -> None:
         raise NotImplementedError
 
     @abstractmethod
-    def set_value(self, key: str, value: str, exp: timedelta) -> None:
+    async def get_revocation_state(self, jti: str, user_id: str) -> tuple[bool, RevocationEpoch | None]:
         raise NotImplementedError
 
     @abstractmethod
-    def set_many_values(self, values: list[dict[str, str]], exp: timedelta) -> None:
+    async def set_user_epoch(self, user_id: str, epoch: RevocationEpoch, ttl: int) -> None:
         raise NotImplementedError
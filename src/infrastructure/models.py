@@ -1,7 +1,20 @@
 import uuid
 from datetime import datetime
 
-from sqlalchemy import Boolean, Column, DateTime, ForeignKey, Index, String, Table, UniqueConstraint
+from sqlalchemy import (
+    Boolean,
+    Column,
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    LargeBinary,
+    PrimaryKeyConstraint,
+    Sequence,
+    String,
+    Table,
+    text,
+)
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import registry, relationship
 
@@ -12,13 +25,13 @@ mapper_registry = registry()
 
 def timestamp_columns():
     return [
-        Column("created_at", DateTime, nullable=False, default=datetime.now()),
+        Column("created_at", DateTime, nullable=False, default=datetime.now),
         Column(
             "updated_at",
             DateTime,
             nullable=False,
-            default=datetime.now(),
-            onupdate=datetime.now(),
+            default=datetime.now,
+            onupdate=datetime.now,
         ),
     ]
 
@@ -36,7 +49,7 @@ users_table = Table(
 sessions_table = Table(
     "sessions",
     mapper_registry.metadata,
-    Column("id", UUID(as_uuid=True), primary_key=True, default=uuid.uuid4),
+    Column("id", UUID(as_uuid=True), nullable=False, default=uuid.uuid4),
     Column(
         "user_id",
         UUID(as_uuid=True),
@@ -44,15 +57,31 @@ sessions_table = Table(
         nullable=False,
     ),
     Column("user_agent", String(255), nullable=False),
-    Column("jti", UUID(as_uuid=True), nullable=False, unique=True),
-    Column("refresh_token", String(1055), nullable=False, unique=True),
+    Column("jti", UUID(as_uuid=True), nullable=False),
+    # SHA-256 от refresh-токена (см. `refresh_token_digest`); сам токен в БД не хранится
+    Column("refresh_token_digest", LargeBinary(32), nullable=False),
     Column("user_ip", String(255), nullable=True),
     Column("is_active", Boolean(), nullable=False, default=True),
-    Column("device_type", String(55), primary_key=True),
+    Column("device_type", String(55), nullable=False),
     *timestamp_columns(),
-    Index("idx_session_user_id", "user_id"),
-    Index("idx_session_refresh_token", "refresh_token"),
-    UniqueConstraint("id", "device_type"),
+    # Таблица партиционирована по device_type и created_at: ключ партиционирования входит
+    # в первичный ключ и во все уникальные индексы (см. миграцию 9e3f5a7b2c41)
+    PrimaryKeyConstraint("id", "device_type", "created_at"),
+    Index("idx_sessions_jti", "jti", "device_type", "created_at", unique=True),
+    Index("idx_sessions_refresh_token_digest", "refresh_token_digest", "device_type", "created_at", unique=True),
+    Index("idx_sessions_user_id_created_at", "user_id", "created_at", "id"),
+    Index("idx_sessions_user_id_active", "user_id", "created_at", "id", postgresql_where=text("is_active")),
+    Index("idx_sessions_updated_at", "updated_at", "id"),
+)
+
+# Курсор очистки истекших сессий: последний удалённый ключ (updated_at, id) незавершённого прохода
+session_cleanup_checkpoints_table = Table(
+    "session_cleanup_checkpoints",
+    mapper_registry.metadata,
+    Column("name", String(55), primary_key=True),
+    Column("updated_at", DateTime, nullable=False),
+    Column("session_id", UUID(as_uuid=True), nullable=False),
+    Column("saved_at", DateTime, nullable=False, default=datetime.now, onupdate=datetime.now),
 )
 
 
@@ -61,6 +90,14 @@ permissions_table = Table(
     mapper_registry.metadata,
     Column("slug", String(255), primary_key=True),
     Column("description", String(255), nullable=True),
+    # Номер бита права в маске токена; выдаётся последовательностью и не переиспользуется
+    Column(
+        "bit_index",
+        Integer,
+        Sequence("permissions_bit_index_seq", start=0, minvalue=0),
+        nullable=False,
+        unique=True,
+    ),
 )
 
 
@@ -1,54 +1,259 @@
+import json
+import time
+import uuid
 from datetime import timedelta
 
 from fastapi import Depends
 from redis.asyncio import Redis
+from redis.crc import key_slot
 
+from src.core.config import settings
 from src.db.redis import get_redis
+from src.domain.entities import RevocationEpoch
 from src.domain.repositories import AbstractBlacklistRepository
+from src.services.redis_tracking import TrackedReadCache, get_tracked_read_cache
+
+# Ключи без hash tag распределяются по всем слотам Redis Cluster; MGET в этом режиме делится по слотам
+BLACKLIST_KEY_PREFIX = b"bl:"
+USER_EPOCH_KEY_PREFIX = "epoch:"
+# Записи, сделанные до перехода на `bl:`: ключ — текстовый jti, значение — id пользователя
+LEGACY_BLACKLIST_KEY_PATTERN = "????????-????-????-????-????????????"
+
+
+def blacklist_key(jti: str) -> bytes:
+    """
+    Ключ черного списка: префикс и 16 байт UUID вместо 36 символов его текстовой записи.
+    Идентификаторы не в формате UUID хранятся как есть.
+    :param jti: Идентификатор токена.
+    :return: Ключ Redis.
+    """
+    try:
+        return BLACKLIST_KEY_PREFIX + uuid.UUID(str(jti)).bytes
+    except ValueError:
+        return BLACKLIST_KEY_PREFIX + str(jti).encode()
+
+
+def jti_from_blacklist_key(key: bytes) -> str:
+    """
+    Восстанавливает jti из ключа черного списка.
+    :param key: Ключ Redis, полученный из `blacklist_key`.
+    :return: Идентификатор токена.
+    """
+    raw = key[len(BLACKLIST_KEY_PREFIX) :]
+    return str(uuid.UUID(bytes=raw)) if len(raw) == 16 else raw.decode()
+
+
+def legacy_blacklist_key(jti: str) -> str:
+    return str(jti)
+
+
+def user_epoch_key(user_id: str) -> str:
+    return f"{USER_EPOCH_KEY_PREFIX}{user_id}"
+
+
+def ttl_seconds(exp: timedelta | int | None) -> int | None:
+    if exp is None:
+        return None
+    return int(exp.total_seconds()) if isinstance(exp, timedelta) else int(exp)
 
 
 class RedisBlacklistRepository(AbstractBlacklistRepository):
-    def __init__(self, redis: Redis):
+    def __init__(
+        self,
+        redis: Redis,
+        channel: str | None = None,
+        chunk_size: int = 500,
+        tracked_read_cache: TrackedReadCache | None = None,
+        group_by_slot: bool = False,
+        legacy_keys: bool = False,
+    ):
+        """
+        :param redis: Клиент Redis.
+        :param channel: Канал, в который публикуются отозванные ключи (для локальных кешей отзыва).
+        :param chunk_size: Наибольшее число ключей в одной команде MGET.
+        :param tracked_read_cache: Клиентский кеш чтений с инвалидацией по CLIENT TRACKING.
+        :param group_by_slot: Делить MGET по слотам (Redis Cluster не принимает ключи разных слотов в одной команде).
+        :param legacy_keys: Проверять также ключи прежнего формата (текстовый jti), пока они не истекли.
+        """
         self._redis = redis
+        self._channel = channel
+        self._chunk_size = chunk_size
+        self._tracked_read_cache = tracked_read_cache
+        self._group_by_slot = group_by_slot
+        self._legacy_keys = legacy_keys
+
+    async def get_value(self, key: str) -> bytes | None:
+        """
+        Проверяет, есть ли ключ в черном списке.
+        :param key: Идентификатор токена.
+        :return: Значение по ключу (пустая строка), если ключ есть, иначе None
+        """
+        (value,), (legacy,) = await self._read_jtis([key])
+        return value if value is not None else legacy
 
-    async def get_value(self, key: str) -> str | None:
+    async def are_revoked(self, jtis: list[str]) -> list[bool]:
         """
-        Проверяет, есть ли значение в Redis.
-        :param key: Ключ в Redis
-        :return: Значение по ключу, если оно есть, иначе None
+        Проверяет несколько jti: MGET частями по `chunk_size` ключей в одном pipeline.
+        :param jtis: Идентификаторы токенов.
+        :return: Признаки наличия в черном списке в порядке `jtis`.
         """
-        value = await self._redis.get(name=key)
-        return value
+        values, legacy = await self._read_jtis(jtis)
+        return [value is not None or old is not None for value, old in zip(values, legacy)]
 
-    async def set_value(self, key: str, value: str, exp: timedelta | int | None = None) -> None:
+    async def get_user_epochs(self, user_ids: list[str]) -> list[RevocationEpoch | None]:
         """
-        Устанавливает одиночное значение в Redis с возможным временем жизни.
-        :param key: Ключ
-        :param value: Значение
-        :param exp: Время жизни (если передано)
+        Получает эпохи отзыва нескольких пользователей.
+        :param user_ids: Идентификаторы пользователей.
+        :return: Эпохи отзыва (или None) в порядке `user_ids`.
         """
+        values = await self._read([user_epoch_key(user_id) for user_id in user_ids])
+        return [self._load_epoch(value) for value in values]
 
-        if exp:
-            exp = timedelta(minutes=exp)
-            await self._redis.set(name=key, value=value, ex=int(exp.total_seconds()))
-        else:
-            await self._redis.set(name=key, value=value)
+    async def set_value(self, key: str, exp: timedelta | int | None = None) -> None:
+        """
+        Добавляет ключ без значения в черный список.
+        :param key: Идентификатор токена.
+        :param exp: Время жизни в секундах или timedelta (если передано)
+        """
+        await self.set_many_values({key: exp})
 
-    async def set_many_values(self, values: dict[str, str], exp: timedelta | None = None):
+    async def set_many_values(self, values: dict[str, timedelta | int | None]) -> None:
         """
-        Устанавливает несколько значений в Redis.
-        :param values: Словарь {ключ: значение}
-        :param exp: Время жизни (если передано, будет установлено для всех)
+        Добавляет несколько ключей одним pipeline из `SET key "" EX ttl`: у каждого ключа свой срок.
+        :param values: Словарь {идентификатор токена: время жизни в секундах или timedelta}
         """
-        async with self._redis.pipeline() as pipe:
-            await pipe.mset(values)
-            if exp:
-                exp = timedelta(minutes=exp)
-                for key in values.keys():
-                    await pipe.expire(name=key, time=int(exp.total_seconds()))
+        ttls = {key: ttl_seconds(exp) for key, exp in values.items()}
+        async with self._redis.pipeline(transaction=False) as pipe:
+            for key, ttl in ttls.items():
+                await pipe.set(name=blacklist_key(key), value=b"", ex=ttl)
+            self._publish(pipe, list(ttls), max((ttl for ttl in ttls.values() if ttl), default=None))
             await pipe.execute()
 
+    async def get_revocation_state(self, jti: str, user_id: str) -> tuple[bool, RevocationEpoch | None]:
+        """
+        Одним MGET получает запись черного списка для jti и эпоху отзыва пользователя.
+        :param jti: Идентификатор токена.
+        :param user_id: Идентификатор пользователя.
+        :return: Пара (jti в черном списке, эпоха отзыва или None).
+        """
+        (value, epoch), (legacy,) = await self._read_jtis([jti], [user_epoch_key(user_id)])
+        return value is not None or legacy is not None, self._load_epoch(epoch)
+
+    async def set_user_epoch(self, user_id: str, epoch: RevocationEpoch, ttl: int) -> None:
+        """
+        Записывает эпоху отзыва пользователя и публикует её в канал.
+        :param user_id: Идентификатор пользователя.
+        :param epoch: Эпоха отзыва.
+        :param ttl: Время жизни записи в секундах (не меньше времени жизни access-токена).
+        """
+        async with self._redis.pipeline(transaction=False) as pipe:
+            await pipe.set(
+                name=user_epoch_key(user_id), value=json.dumps([epoch.issued_before, epoch.keep_jti]), ex=ttl
+            )
+            if self._channel is not None:
+                message = {"epochs": {user_id: [epoch.issued_before, epoch.keep_jti]}, "ttl": ttl, "ts": time.time()}
+                pipe.publish(self._channel, json.dumps(message))
+            await pipe.execute()
+
+    async def _read_jtis(
+        self, jtis: list[str], extra_keys: list[str] | None = None
+    ) -> tuple[list[bytes | None], list[bytes | None]]:
+        """
+        Читает ключи черного списка для jti (и дополнительные ключи) одним запросом вместе с ключами прежнего формата.
+        :param jtis: Идентификаторы токенов.
+        :param extra_keys: Ключи, читаемые в том же запросе (например, эпоха пользователя).
+        :return: Значения ключей jti и `extra_keys` по порядку и значения ключей прежнего формата
+            (список None, если они не проверяются).
+        """
+        keys = [blacklist_key(jti) for jti in jtis] + (extra_keys or [])
+        legacy_keys = [legacy_blacklist_key(jti) for jti in jtis] if self._legacy_keys else []
+        values = await self._read(keys, legacy_keys)
+        legacy = values[len(keys) :] if self._legacy_keys else [None] * len(jtis)
+        return values[: len(keys)], legacy
+
+    async def _read(self, keys: list[bytes | str], uncached_keys: list[bytes | str] = ()) -> list[bytes | None]:
+        """
+        Читает ключи, отвечая из клиентского кеша всё, что в нём есть; остальное читается с сервера.
+        :param keys: Ключи Redis.
+        :param uncached_keys: Ключи, которые всегда читаются с сервера (их префиксы сервер не отслеживает).
+        :return: Значения в порядке `keys`, затем `uncached_keys`.
+        """
+        cache = self._tracked_read_cache
+        if cache is None or not cache.ready:
+            return await self._mget([*keys, *uncached_keys])
+        sequence = cache.sequence
+        cached = [cache.get(key) for key in keys]
+        missing = [key for key, (found, _) in zip(keys, cached) if not found]
+        values = await self._mget([*missing, *uncached_keys])
+        fetched = dict(zip(missing, values))
+        for key, value in fetched.items():
+            cache.put(key, value, sequence)
+        return [value if found else fetched[key] for key, (found, value) in zip(keys, cached)] + values[len(missing) :]
+
+    async def _mget(self, keys: list[bytes | str]) -> list[bytes | None]:
+        if not keys:
+            return []
+        groups = self._slot_groups(keys) if self._group_by_slot else [list(range(len(keys)))]
+        if len(groups) == 1 and len(keys) <= self._chunk_size:
+            return await self._redis.mget(keys)
+        chunks = [
+            group[start : start + self._chunk_size]
+            for group in groups
+            for start in range(0, len(group), self._chunk_size)
+        ]
+        # В режиме Cluster pipeline отправляет каждый MGET на узел его слота
+        async with self._redis.pipeline(transaction=False) as pipe:
+            for chunk in chunks:
+                await pipe.mget([keys[index] for index in chunk])
+            results = await pipe.execute()
+        values: list[bytes | None] = [None] * len(keys)
+        for chunk, result in zip(chunks, results):
+            for index, value in zip(chunk, result):
+                values[index] = value
+        return values
+
+    @staticmethod
+    def _slot_groups(keys: list[bytes | str]) -> list[list[int]]:
+        """
+        Группирует позиции ключей по слотам Redis Cluster.
+        :param keys: Ключи Redis.
+        :return: Списки позиций ключей одного слота.
+        """
+        groups: dict[int, list[int]] = {}
+        for index, key in enumerate(keys):
+            groups.setdefault(key_slot(key if isinstance(key, bytes) else key.encode()), []).append(index)
+        return list(groups.values())
+
+    @staticmethod
+    def _load_epoch(value: bytes | str | None) -> RevocationEpoch | None:
+        if value is None:
+            return None
+        issued_before, keep_jti = json.loads(value)
+        return RevocationEpoch(issued_before=issued_before, keep_jti=keep_jti)
+
+    def _publish(self, pipe, keys: list[str], ttl: int | None) -> None:
+        """
+        Добавляет в pipeline публикацию отозванных ключей в канал.
+        :param pipe: Pipeline Redis.
+        :param keys: Идентификаторы токенов.
+        :param ttl: Наибольшее время жизни ключей в секундах.
+        """
+        if self._channel is None:
+            return
+        message = {"jtis": keys, "ttl": ttl, "ts": time.time()}
+        pipe.publish(self._channel, json.dumps(message))
+
 
-def get_blacklist_repository(redis_client: Redis = Depends(get_redis)):
-    black_list_service = RedisBlacklistRepository(redis=redis_client)
+def get_blacklist_repository(
+    redis_client: Redis = Depends(get_redis),
+    tracked_read_cache: TrackedReadCache | None = Depends(get_tracked_read_cache),
+):
+    black_list_service = RedisBlacklistRepository(
+        redis=redis_client,
+        channel=settings.redis.revocation_channel,
+        chunk_size=settings.redis.revocation_mget_chunk_size,
+        tracked_read_cache=tracked_read_cache,
+        group_by_slot=settings.redis.redis_mode == "cluster",
+        legacy_keys=settings.redis.revocation_legacy_keys_enabled,
+    )
     return black_list_service
@@ -0,0 +1,84 @@
+from datetime import datetime
+
+from sqlalchemy import Result, delete, func, select, text, tuple_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.domain.entities import SessionCleanupBatch, SessionCleanupCheckpoint
+from src.domain.repositories import AbstractSessionCleanupRepository
+from src.infrastructure.models import session_cleanup_checkpoints_table, sessions_table
+
+checkpoints = session_cleanup_checkpoints_table.c
+sessions = sessions_table.c
+
+
+class SQLAlchemySessionCleanupRepository(AbstractSessionCleanupRepository):
+    """Удаление истекших сессий пачками по индексу (updated_at, id) с курсором в `session_cleanup_checkpoints`."""
+
+    def __init__(self, session: AsyncSession):
+        self._session = session
+
+    async def get_checkpoint(self, name: str) -> SessionCleanupCheckpoint | None:
+        result: Result = await self._session.execute(
+            select(checkpoints.updated_at, checkpoints.session_id).where(checkpoints.name == name)
+        )
+        row = result.one_or_none()
+        await self._session.commit()
+        if row is None:
+            return None
+        return SessionCleanupCheckpoint(updated_at=row.updated_at, session_id=row.session_id)
+
+    async def delete_expired_batch(
+        self, name: str, expired_before: datetime, after: SessionCleanupCheckpoint | None, limit: int
+    ) -> SessionCleanupBatch:
+        key = tuple_(sessions.updated_at, sessions.id)
+        conditions = [sessions.updated_at < expired_before]
+        if after is not None:
+            conditions.append(key > tuple_(after.updated_at, after.session_id))
+        # SKIP LOCKED: строки, которые сейчас ротируются или закрываются, пропускаются без ожидания;
+        # их updated_at сдвинется за пределы прохода, а оставшиеся подберёт следующий проход
+        batch = (
+            select(sessions.id, sessions.device_type, sessions.created_at)
+            .where(*conditions)
+            .order_by(sessions.updated_at, sessions.id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+            .cte("batch")
+        )
+        # Ключ партиционирования в условии соединения: удаление идёт сразу в нужную партицию
+        query = (
+            delete(sessions_table)
+            .where(
+                sessions.id == batch.c.id,
+                sessions.device_type == batch.c.device_type,
+                sessions.created_at == batch.c.created_at,
+            )
+            .returning(sessions.updated_at, sessions.id)
+        )
+        result: Result = await self._session.execute(query)
+        keys = result.all()
+
+        # Курсор сохраняется в той же транзакции, что и удаление: после сбоя проход продолжается ровно с него
+        if not keys:
+            await self._session.execute(session_cleanup_checkpoints_table.delete().where(checkpoints.name == name))
+            checkpoint = None
+        else:
+            updated_at, session_id = max(keys)
+            checkpoint = await self._save_checkpoint(name, SessionCleanupCheckpoint(updated_at, session_id))
+        await self._session.commit()
+        return SessionCleanupBatch(deleted=len(keys), checkpoint=checkpoint)
+
+    async def get_replication_lag(self) -> float:
+        # Без роли pg_monitor replay_lag недоступен и читается как NULL: тогда ограничение не действует
+        result: Result = await self._session.execute(
+            text("SELECT COALESCE(max(EXTRACT(EPOCH FROM replay_lag)), 0) FROM pg_stat_replication")
+        )
+        lag = result.scalar_one()
+        await self._session.commit()
+        return float(lag)
+
+    async def _save_checkpoint(self, name: str, checkpoint: SessionCleanupCheckpoint) -> SessionCleanupCheckpoint:
+        values = {"updated_at": checkpoint.updated_at, "session_id": checkpoint.session_id, "saved_at": func.now()}
+        query = insert(session_cleanup_checkpoints_table).values(name=name, **values)
+        await self._session.execute(query.on_conflict_do_update(index_elements=[checkpoints.name], set_=values))
+        return checkpoint
@@ -0,0 +1,138 @@
+import re
+from datetime import datetime
+
+from sqlalchemy import Result, text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.domain.entities import SessionPartition
+from src.domain.repositories import AbstractSessionPartitionRepository
+
+IDENTIFIER_PREPARER = postgresql.dialect().identifier_preparer
+RANGE_BOUND_PATTERN = re.compile(r"FOR VALUES FROM \('(?P<starts_at>[^']+)'\) TO \('(?P<ends_at>[^']+)'\)")
+
+CHILD_PARTITIONS_QUERY = """
+    SELECT child.relname AS name, parent.relname AS parent, pg_get_expr(child.relpartbound, child.oid) AS bound
+    FROM pg_inherits
+    JOIN pg_class AS parent ON parent.oid = pg_inherits.inhparent
+    JOIN pg_class AS child ON child.oid = pg_inherits.inhrelid
+    WHERE pg_inherits.inhparent = ANY(CAST(:parents AS regclass[]))
+"""
+
+
+def parse_range_bound(bound: str) -> tuple[datetime, datetime] | None:
+    """
+    Разбирает границы RANGE-партиции из `pg_get_expr(relpartbound)`.
+    :param bound: Выражение вида `FOR VALUES FROM ('...') TO ('...')`.
+    :return: Начало и конец диапазона или None для партиции DEFAULT.
+    """
+    match = RANGE_BOUND_PATTERN.fullmatch(bound)
+    if match is None:
+        return None
+    return datetime.fromisoformat(match["starts_at"]), datetime.fromisoformat(match["ends_at"])
+
+
+class SQLAlchemySessionPartitionRepository(AbstractSessionPartitionRepository):
+    """Месячные партиции `sessions`: каждая партиция типа устройства разбита по RANGE (created_at)."""
+
+    def __init__(self, session: AsyncSession, lock_timeout: float = 5.0):
+        """
+        Инициализатор класса.
+        :param session: Сессия БД.
+        :param lock_timeout: Сколько секунд DDL ждёт блокировку, прежде чем отступить до следующего запуска.
+        """
+        self._session = session
+        self._lock_timeout = lock_timeout
+
+    async def get_device_partitions(self) -> list[str]:
+        result: Result = await self._session.execute(
+            text(
+                "SELECT child.relname FROM pg_inherits JOIN pg_class AS child ON child.oid = pg_inherits.inhrelid "
+                "WHERE pg_inherits.inhparent = 'sessions'::regclass ORDER BY child.relname"
+            )
+        )
+        return list(result.scalars())
+
+    async def get_month_partitions(self) -> list[SessionPartition]:
+        parents = await self.get_device_partitions()
+        result: Result = await self._session.execute(text(CHILD_PARTITIONS_QUERY), {"parents": parents})
+        partitions = []
+        for name, parent, bound in result:
+            bounds = parse_range_bound(bound)
+            if bounds is not None:
+                partitions.append(SessionPartition(name=name, parent=parent, starts_at=bounds[0], ends_at=bounds[1]))
+        return sorted(partitions, key=lambda partition: (partition.parent, partition.starts_at))
+
+    async def create_month_partition(self, parent: str, starts_at: datetime, ends_at: datetime) -> SessionPartition:
+        partition = SessionPartition(
+            name=f"{parent}_{starts_at:%Y_%m}", parent=parent, starts_at=starts_at, ends_at=ends_at
+        )
+        create = (
+            f"CREATE TABLE IF NOT EXISTS {self._quote(partition.name)} PARTITION OF {self._quote(parent)} "
+            f"FOR VALUES FROM ('{starts_at.isoformat()}') TO ('{ends_at.isoformat()}')"
+        )
+        default = await self._get_default_partition(parent)
+        if default is None or not await self.count_default_rows(parent, starts_at, ends_at):
+            await self._execute_ddl(create)
+            return partition
+
+        # Пока в DEFAULT есть строки этого месяца, CREATE ... PARTITION OF падает: отсоединяем DEFAULT,
+        # создаём месяц, переносим в него строки и присоединяем DEFAULT обратно — всё в одной транзакции
+        in_range = f"created_at >= '{starts_at.isoformat()}' AND created_at < '{ends_at.isoformat()}'"
+        await self._execute_ddl(
+            f"ALTER TABLE {self._quote(parent)} DETACH PARTITION {self._quote(default)}",
+            create,
+            f"INSERT INTO {self._quote(partition.name)} SELECT * FROM {self._quote(default)} WHERE {in_range}",
+            f"DELETE FROM {self._quote(default)} WHERE {in_range}",
+            f"ALTER TABLE {self._quote(parent)} ATTACH PARTITION {self._quote(default)} DEFAULT",
+        )
+        return partition
+
+    async def count_default_rows(self, parent: str, starts_at: datetime, ends_at: datetime) -> int:
+        default = await self._get_default_partition(parent)
+        if default is None:
+            return 0
+        result: Result = await self._session.execute(
+            text(
+                f"SELECT count(*) FROM {self._quote(default)} "
+                "WHERE created_at >= :starts_at AND created_at < :ends_at"
+            ),
+            {"starts_at": starts_at, "ends_at": ends_at},
+        )
+        return result.scalar_one()
+
+    async def has_live_sessions(self, partition: SessionPartition, updated_after: datetime) -> bool:
+        result: Result = await self._session.execute(
+            text(
+                f"SELECT EXISTS (SELECT 1 FROM {self._quote(partition.name)} "
+                "WHERE is_active AND updated_at > :updated_after)"
+            ),
+            {"updated_after": updated_after},
+        )
+        return bool(result.scalar_one())
+
+    async def drop_month_partition(self, partition: SessionPartition) -> None:
+        await self._execute_ddl(
+            f"ALTER TABLE {self._quote(partition.parent)} DETACH PARTITION {self._quote(partition.name)}",
+            f"DROP TABLE {self._quote(partition.name)}",
+        )
+
+    async def _get_default_partition(self, parent: str) -> str | None:
+        result: Result = await self._session.execute(text(CHILD_PARTITIONS_QUERY), {"parents": [parent]})
+        return next((name for name, _, bound in result if bound == "DEFAULT"), None)
+
+    async def _execute_ddl(self, *statements: str) -> None:
+        # ATTACH/DETACH берут блокировку родительской таблицы: не стоим в очереди за долгими транзакциями,
+        # иначе за DDL выстроятся все запросы к sessions
+        try:
+            await self._session.execute(text(f"SET LOCAL lock_timeout = '{int(self._lock_timeout * 1000)}ms'"))
+            for statement in statements:
+                await self._session.execute(text(statement))
+        except Exception:
+            await self._session.rollback()
+            raise
+        await self._session.commit()
+
+    @staticmethod
+    def _quote(name: str) -> str:
+        return IDENTIFIER_PREPARER.quote(name)
@@ -1,12 +1,16 @@
+from collections.abc import AsyncIterator
+from datetime import datetime
 from uuid import UUID
 
 from fastapi import Depends
-from sqlalchemy import Result, insert, select, update
+from sqlalchemy import Result, func, insert, select, tuple_, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.db.postgres import get_session
-from src.domain.entities import Session
+from src.domain.entities import Session, SessionRotation
+from src.domain.factories.session import refresh_token_digest
 from src.domain.repositories import AbstractSessionRepository
+from src.infrastructure.models import user_roles_table
 
 
 class SQLAlchemySessionRepository(AbstractSessionRepository):
@@ -16,26 +20,142 @@ class SQLAlchemySessionRepository(AbstractSessionRepository):
         self._session: AsyncSession = session
 
     async def create(self, session: Session) -> Session:
-        query = insert(Session).values(session.to_dict(self.exclude_fields)).returning(Session)
+        values = session.to_dict(self.exclude_fields)
+        if session.id is not None:
+            # id выдаётся заранее, чтобы попасть в claim `sid` refresh-токена
+            values["id"] = session.id
+        query = insert(Session).values(values).returning(Session)
         result: Result = await self._session.execute(query)
         await self._commit()
         return result.scalar_one()
 
     async def update(self, session: Session) -> Session | None:
-        query = update(Session).filter_by(id=session.id).values(session.to_dict(self.exclude_fields)).returning(Session)
+        # device_type и created_at — ключи партиций: без них UPDATE проверяет все партиции типов устройств и месяцев
+        query = update(Session).filter_by(id=session.id, device_type=session.device_type)
+        if session.created_at is not None:
+            query = query.filter_by(created_at=session.created_at)
+        query = query.values(session.to_dict(self.exclude_fields)).returning(Session)
         result: Result = await self._session.execute(query)
         await self._commit()
         return result.scalar_one()
 
-    async def get_by_refresh_token(self, refresh_token: str) -> Session | None:
-        query = select(Session).filter_by(refresh_token=refresh_token)
+    async def get_by_refresh_token(self, refresh_token: str, device_type: str | None = None) -> Session | None:
+        query = select(Session).filter_by(refresh_token_digest=refresh_token_digest(refresh_token))
+        if device_type is not None:
+            # Токены без claim `dvc` (выпущенные до его появления) ищутся по всем партициям
+            query = query.filter_by(device_type=device_type)
         result: Result = await self._session.execute(query)
         return result.scalar_one_or_none()
 
-    async def get_sessions_by_user_id(self, user_id: str | UUID) -> list[Session]:
-        query = select(Session).filter_by(user_id=user_id)
+    async def rotate_refresh_token(
+        self,
+        old_refresh_token: str,
+        new_refresh_token: str,
+        new_jti: str | UUID,
+        session_id: str | UUID | None = None,
+        device_type: str | None = None,
+        created_at: datetime | None = None,
+    ) -> SessionRotation:
+        old_digest = refresh_token_digest(old_refresh_token)
+        scope = []
+        if session_id is not None:
+            scope.append(Session.id == session_id)
+        if device_type is not None:
+            scope.append(Session.device_type == device_type)
+        if created_at is not None:
+            scope.append(Session.created_at == created_at)
+        # Сравнение дайджеста в WHERE делает замену атомарной: из конкурентных ротаций одного токена проходит одна
+        rotated = (
+            update(Session)
+            .where(*scope, Session.refresh_token_digest == old_digest, Session.is_active.is_(True))
+            .values(refresh_token_digest=refresh_token_digest(new_refresh_token), jti=new_jti, updated_at=func.now())
+            .returning(Session.id, Session.device_type, Session.user_id)
+            .cte("rotated")
+        )
+        rotated_user_id = select(rotated.c.user_id).scalar_subquery()
+        columns = [
+            select(rotated.c.id).scalar_subquery(),
+            select(rotated.c.device_type).scalar_subquery(),
+            rotated_user_id,
+            select(func.array_agg(user_roles_table.c.role_slug))
+            .where(user_roles_table.c.user_id == rotated_user_id)
+            .scalar_subquery(),
+        ]
+        if session_id is not None:
+            # Токен с `sid` активной сессии, но с чужим дайджестом уже был заменён: закрываем сессию.
+            # Оба CTE читают один снимок, поэтому вместе они не срабатывают. Но при READ COMMITTED может не
+            # сработать ни один: если конкурентная ротация зафиксирована после снимка, `rotated` перепроверяет
+            # строку после ожидания блокировки и видит новый дайджест, а `reused` по снимку видит старый.
+            # Проигравший гонку запрос получает SessionHasExpired, а сессия остаётся у победителя.
+            reused = (
+                update(Session)
+                .where(*scope, Session.refresh_token_digest != old_digest, Session.is_active.is_(True))
+                .values(is_active=False, updated_at=func.now())
+                .returning(Session.jti)
+                .cte("reused")
+            )
+            columns.append(select(reused.c.jti).scalar_subquery())
+        result: Result = await self._session.execute(select(*columns))
+        row = result.one()
+        await self._commit()
+        session_id, device_type, user_id, roles, *reused_jti = row
+        return SessionRotation(
+            session_id=session_id,
+            device_type=device_type,
+            user_id=user_id,
+            roles=list(roles or []),
+            reused_jti=str(reused_jti[0]) if reused_jti and reused_jti[0] is not None else None,
+        )
+
+    async def deactivate_user_sessions(
+        self,
+        user_id: str | UUID,
+        keep_id: str | UUID | None = None,
+        keep_jti: str | UUID | None = None,
+    ) -> list[str]:
+        query = (
+            update(Session)
+            .where(Session.user_id == user_id, Session.is_active.is_(True))
+            .values(is_active=False)
+            .returning(Session.jti)
+            .execution_options(synchronize_session=False)
+        )
+        if keep_id is not None:
+            query = query.where(Session.id != keep_id)
+        if keep_jti is not None:
+            query = query.where(Session.jti != keep_jti)
         result: Result = await self._session.execute(query)
-        return result.scalars().all()
+        jtis = [str(jti) for jti in result.scalars()]
+        await self._commit()
+        return jtis
+
+    async def iter_user_sessions(
+        self,
+        user_id: str | UUID,
+        limit: int,
+        after: tuple[datetime, UUID] | None = None,
+        active: bool | None = None,
+    ) -> AsyncIterator[Session]:
+        """
+        Потоково выдаёт сессии пользователя от новых к старым, начиная строго после ключа `after`.
+
+        :param user_id: ID пользователя.
+        :param limit: Наибольшее число сессий.
+        :param after: Ключ (created_at, id) последней сессии предыдущей страницы.
+        :param active: True — только активные (частичный индекс `WHERE is_active`), False — только закрытые.
+        :return: Асинхронный итератор сессий.
+        """
+        query = select(Session).where(Session.user_id == user_id)
+        if active is not None:
+            # Условие в том же виде, что и предикат частичного индекса `WHERE is_active`
+            query = query.where(Session.is_active if active else ~Session.is_active)
+        if after is not None:
+            query = query.where(tuple_(Session.created_at, Session.id) < tuple_(*after))
+        query = (
+            query.order_by(Session.created_at.desc(), Session.id.desc()).limit(limit).execution_options(yield_per=limit)
+        )
+        async for session in await self._session.stream_scalars(query):
+            yield session
 
     async def _commit(self):
         await self._session.commit()
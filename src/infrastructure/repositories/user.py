@@ -1,14 +1,17 @@
 import logging
+import uuid
+from collections.abc import AsyncIterator
 
 from fastapi import Depends
-from sqlalchemy import Result, insert, select, update
+from sqlalchemy import Result, exists, insert, select, update
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.db.postgres import get_session
-from src.domain.entities import User
+from src.domain.entities import NewUser, User
 from src.domain.exceptions import UserIsExists
 from src.domain.repositories import AbstractUserRepository
+from src.infrastructure.models import users_table
 
 logger = logging.getLogger(__name__)
 
@@ -47,6 +50,29 @@ class SQLAlchemyUserRepository(AbstractUserRepository):
         result: Result = await self._session.execute(query)
         return result.unique().scalar_one_or_none()
 
+    async def exists_by_email(self, email: str) -> bool:
+        """
+        Проверяет по индексу email, существует ли пользователь, не загружая саму запись.
+
+        :param email: Email пользователя.
+        :return: True, если пользователь существует.
+        """
+
+        result: Result = await self._session.execute(select(exists().where(users_table.c.email == email)))
+        return result.scalar()
+
+    async def iter_emails(self, batch_size: int = 10_000) -> AsyncIterator[str]:
+        """
+        Потоково выгружает email всех пользователей пачками, не загружая таблицу в память целиком.
+
+        :param batch_size: Размер пачки, получаемой из БД за один раз.
+        :return: Асинхронный итератор email.
+        """
+
+        query = select(users_table.c.email).execution_options(yield_per=batch_size)
+        async for email in await self._session.stream_scalars(query):
+            yield email
+
     async def update(self, user: User) -> User | None:
         """
         Обновляет запись в базе данных по ее идентификатору.
@@ -60,6 +86,55 @@ class SQLAlchemyUserRepository(AbstractUserRepository):
         await self._commit()
         return
 
+    async def bulk_create(self, users: list[NewUser]) -> list[str]:
+        """
+        Массово создаёт пользователей и их роли за одну транзакцию.
+
+        Строки загружаются через COPY во временные таблицы, после чего переносятся
+        в users и user_roles одним INSERT ... SELECT. Уже существующие email пропускаются.
+
+        :users: пачка новых пользователей с готовыми хешами паролей.
+        :return: список email фактически созданных пользователей.
+        """
+
+        connection = await self._session.connection()
+        raw_connection = await connection.get_raw_connection()
+        driver = raw_connection.driver_connection
+
+        async with driver.transaction():
+            await driver.execute(
+                "CREATE TEMP TABLE IF NOT EXISTS users_import "
+                "(id UUID, email VARCHAR(255), password VARCHAR(255)) ON COMMIT DELETE ROWS"
+            )
+            await driver.execute(
+                "CREATE TEMP TABLE IF NOT EXISTS user_roles_import "
+                "(email VARCHAR(255), role_slug VARCHAR(255)) ON COMMIT DELETE ROWS"
+            )
+            await driver.copy_records_to_table(
+                "users_import",
+                records=[(uuid.uuid4(), user.email, user.password) for user in users],
+                columns=["id", "email", "password"],
+            )
+            await driver.copy_records_to_table(
+                "user_roles_import",
+                records=[(user.email, role_slug) for user in users for role_slug in user.roles],
+                columns=["email", "role_slug"],
+            )
+            created = await driver.fetch(
+                "INSERT INTO users (id, email, password, is_active, created_at, updated_at) "
+                "SELECT id, email, password, false, now(), now() FROM users_import "
+                "ON CONFLICT (email) DO NOTHING RETURNING email"
+            )
+            await driver.execute(
+                "INSERT INTO user_roles (role_slug, user_id) "
+                "SELECT ri.role_slug, u.id FROM user_roles_import ri "
+                "JOIN users_import ui ON ui.email = ri.email "
+                "JOIN users u ON u.id = ui.id "
+                "ON CONFLICT DO NOTHING"
+            )
+        await self._commit()
+        return [row["email"] for row in created]
+
     async def _commit(self) -> None:
         await self._session.commit()
 
@@ -1,38 +1,129 @@
+import asyncio
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI, Request, status
 from fastapi.responses import ORJSONResponse
 from httpx import AsyncClient
-from opentelemetry import trace
+from opentelemetry import metrics, trace
 from opentelemetry.exporter.jaeger.thrift import JaegerExporter
+from opentelemetry.exporter.prometheus import PrometheusMetricReader
 from opentelemetry.instrumentation.fastapi import FastAPIInstrumentor
+from opentelemetry.sdk.metrics import MeterProvider
 from opentelemetry.sdk.trace import TracerProvider
 from opentelemetry.sdk.trace.export import BatchSpanProcessor, ConsoleSpanExporter
-from redis.asyncio import Redis
+from prometheus_client import make_asgi_app
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from starlette.middleware.sessions import SessionMiddleware
 
 from src.api.v1.auth import auth_router
+from src.api.v1.jwks import jwks_router
 from src.api.v1.me import me_router
 from src.api.v1.oauth import oauth_router
 from src.api.v1.permission import perm_router
 from src.api.v1.roles import roles_router
-from src.core import http_client
+from src.core import email_filter, http_client, password_hasher, permission_registry
+from src.core.bloom import BloomFilter
 from src.core.config import settings
 from src.core.exception_handlers import exception_handlers
 from src.db import postgres, redis
+from src.infrastructure.repositories.blacklist import BLACKLIST_KEY_PREFIX, USER_EPOCH_KEY_PREFIX
+from src.infrastructure.repositories.permisson import SQLAlchemyPermissionRepository
+from src.infrastructure.repositories.role import SQLAlchemyRoleRepository
+from src.infrastructure.repositories.user import SQLAlchemyUserRepository
+from src.services import redis_tracking, refresh_single_flight, revocation_cache, revocation_filter
+from src.services.hashing import HashingPolicy, ProcessPoolPasswordHasher
 
 
 @asynccontextmanager
 async def lifespan(_: FastAPI):
-    redis.redis = Redis(host=settings.redis.redis_host, port=settings.redis.redis_port)
+    redis.redis = redis.create_redis(settings.redis)
+    redis.pubsub_redis = redis.create_pubsub_redis(redis.redis, settings.redis)
     postgres.engine = create_async_engine(settings.db.db_url, echo=False)
     postgres.async_session_maker = async_sessionmaker(bind=postgres.engine, expire_on_commit=False, class_=AsyncSession)
     http_client.http_client = AsyncClient()
+    async with postgres.async_session_maker() as session:
+        email_filter.email_filter = await email_filter.fill_email_filter(
+            BloomFilter(
+                capacity=settings.service.email_filter_capacity,
+                error_rate=settings.service.email_filter_error_rate,
+            ),
+            SQLAlchemyUserRepository(session=session),
+        )
+        await permission_registry.refresh_permission_registry(
+            permission_registry.permission_registry,
+            SQLAlchemyPermissionRepository(session=session),
+            SQLAlchemyRoleRepository(session=session),
+        )
+    registry_refresh = asyncio.create_task(
+        permission_registry.keep_permission_registry_fresh(
+            permission_registry.permission_registry,
+            postgres.async_session_maker,
+            SQLAlchemyPermissionRepository,
+            SQLAlchemyRoleRepository,
+            settings.service.permission_registry_refresh_interval,
+        )
+    )
+    password_hasher.password_hasher = ProcessPoolPasswordHasher(
+        max_workers=settings.hashing.workers,
+        max_in_flight=settings.hashing.max_in_flight,
+        max_queue_size=settings.hashing.max_queue_size,
+        timeout=settings.hashing.timeout,
+        policy=HashingPolicy(
+            schemes=tuple(settings.hashing.schemes),
+            bcrypt_rounds=settings.hashing.bcrypt_rounds,
+            argon2_time_cost=settings.hashing.argon2_time_cost,
+            argon2_memory_cost=settings.hashing.argon2_memory_cost,
+            argon2_parallelism=settings.hashing.argon2_parallelism,
+        ),
+    )
+    if settings.service.refresh_single_flight_enabled:
+        refresh_single_flight.refresh_single_flight = refresh_single_flight.RefreshSingleFlight(
+            redis.redis,
+            grace_period=settings.service.refresh_grace_period,
+            lock_timeout=settings.service.refresh_lock_timeout,
+        )
+    background_tasks = [registry_refresh]
+    revocation_sinks = []
+    if settings.redis.revocation_cache_enabled:
+        revocation_cache.revocation_cache = revocation_cache.RevocationNearCache(
+            warmup=settings.service.access_token_expire * 60,
+            default_ttl=settings.service.access_token_expire * 60,
+        )
+        revocation_sinks.append(revocation_cache.revocation_cache)
+    if settings.redis.revocation_filter_enabled:
+        revocation_filter.revocation_filter = revocation_filter.RevocationFilter(
+            ttl=settings.service.access_token_expire * 60,
+            error_rate=settings.redis.revocation_filter_error_rate,
+            capacity=settings.redis.revocation_filter_capacity,
+            memory_budget=settings.redis.revocation_filter_memory_budget,
+            legacy_keys=settings.redis.revocation_legacy_keys_enabled,
+        )
+        revocation_sinks.append(revocation_filter.revocation_filter)
+    if settings.redis.redis_client_tracking_enabled and settings.redis.redis_mode != "cluster":
+        redis_tracking.tracked_read_cache = redis_tracking.TrackedReadCache(
+            max_entries=settings.redis.redis_client_tracking_max_entries,
+            prefixes=[BLACKLIST_KEY_PREFIX, USER_EPOCH_KEY_PREFIX],
+            ping_interval=settings.redis.revocation_ping_interval,
+        )
+        background_tasks.append(asyncio.create_task(redis_tracking.tracked_read_cache.run(redis.redis.connection_pool)))
+    if revocation_sinks:
+        subscriber = revocation_cache.RevocationSubscriber(
+            redis.redis,
+            channel=settings.redis.revocation_channel,
+            ping_interval=settings.redis.revocation_ping_interval,
+            sinks=revocation_sinks,
+            pubsub_redis=redis.pubsub_redis,
+        )
+        background_tasks.append(asyncio.create_task(subscriber.run()))
 
     yield
 
+    for task in background_tasks:
+        task.cancel()
+    password_hasher.password_hasher.shutdown()
     await http_client.http_client.close()
+    if redis.pubsub_redis is not redis.redis:
+        await redis.pubsub_redis.close()
     await redis.redis.close()
 
 
@@ -44,7 +135,12 @@ def configure_tracer() -> None:
     trace.get_tracer_provider().add_span_processor(BatchSpanProcessor(ConsoleSpanExporter()))
 
 
+def configure_meter() -> None:
+    metrics.set_meter_provider(MeterProvider(metric_readers=[PrometheusMetricReader()]))
+
+
 configure_tracer()
+configure_meter()
 app = FastAPI(
     title=settings.service.project_name,
     docs_url="/api/openapi/",
@@ -55,13 +151,14 @@ app = FastAPI(
 )
 
 app.add_middleware(SessionMiddleware, secret_key=settings.oauth.secret_key)
+app.mount("/metrics", make_asgi_app())
 
 
 @app.middleware("http")
 async def before_request(request: Request, call_next):
     response = await call_next(request)
     request_id = request.headers.get("X-Request-Id")
-    if request_id is None:
+    if request_id is None and not request.url.path.startswith(("/metrics", "/.well-known")):
         return ORJSONResponse(
             status_code=status.HTTP_400_BAD_REQUEST,
             content={"detail": "X-Request-Id is required"},
@@ -72,6 +169,7 @@ async def before_request(request: Request, call_next):
 FastAPIInstrumentor.instrument_app(app=app)
 
 
+app.include_router(jwks_router, tags=["jwks"])
 app.include_router(auth_router, prefix="/api/v1/auth", tags=["auth"])
 app.include_router(me_router, prefix="/api/v1/me", tags=["me"])
 app.include_router(roles_router, prefix="/api/v1/roles", tags=["roles"])
@@ -1,10 +1,13 @@
 import logging
 
 from fastapi import Depends
-from passlib.context import CryptContext
 
+from src.core.bloom import BloomFilter
+from src.core.email_filter import get_email_filter
+from src.core.password_hasher import get_password_hasher
 from src.domain.entities import User
-from src.domain.exceptions import WrongEmailOrPassword, WrongOldPassword
+from src.domain.exceptions import UserIsExists, WrongEmailOrPassword, WrongOldPassword
+from src.domain.interfaces import AbstractPasswordHasher
 from src.domain.repositories import AbstractUserRepository
 from src.infrastructure.repositories.user import get_user_repository
 
@@ -12,26 +15,40 @@ logger = logging.getLogger(__name__)
 
 
 class AuthService:
-    def __init__(self, user_repository: AbstractUserRepository):
+    def __init__(
+        self,
+        user_repository: AbstractUserRepository,
+        password_hasher: AbstractPasswordHasher,
+        email_filter: BloomFilter | None = None,
+    ):
         self._user_repository: AbstractUserRepository = user_repository
-        self._context: CryptContext = CryptContext(schemes=["bcrypt"])
+        self._password_hasher: AbstractPasswordHasher = password_hasher
+        self._email_filter: BloomFilter | None = email_filter
 
     async def registration_new_user(self, email: str, password: str) -> User:
         """
         Регистрирует нового пользователя, хешируя его пароль перед сохранением.
+        Занятый email отклоняется до хеширования пароля.
 
         :param email: Email пользователя.
         :param password: Открытый пароль пользователя.
         :return: Созданный объект User.
+        :raises UserIsExists: Если пользователь с таким email уже существует.
         """
 
-        hashed_password = self._get_password_hash(password)
+        if await self._is_email_taken(email):
+            logger.error("Пользователь с email %s уже существует.", email)
+            raise UserIsExists
+        hashed_password = await self._get_password_hash(password)
         new_user = await self._user_repository.create(email=email, password=hashed_password)
+        if self._email_filter is not None:
+            self._email_filter.add(email)
         return new_user
 
     async def login_user(self, email: str, password: str) -> User | None:
         """
         Проверяет учетные данные пользователя при входе.
+        Если хеш пароля создан по устаревшей политике, сохраняет новый хеш.
 
         :param email: Email пользователя.
         :param password: Открытый пароль пользователя.
@@ -40,9 +57,17 @@ class AuthService:
         """
 
         user = await self._user_repository.get_by_email(email=email)
-        if user is None or not self._verify_password(password, user.password):
+        if user is None:
             logger.error("Неверный логин для пользователя %s", email)
             raise WrongEmailOrPassword
+        is_valid, new_hash = await self._password_hasher.verify_and_update(password, user.password)
+        if not is_valid:
+            logger.error("Неверный логин для пользователя %s", email)
+            raise WrongEmailOrPassword
+        if new_hash is not None:
+            logger.info("Хеш пароля пользователя %s перехеширован по текущей политике", str(user.id))
+            user.password = new_hash
+            await self._user_repository.update(user=user)
         return user
 
     async def change_password(self, user_id: str, old_password: str, new_password: str) -> User:
@@ -57,25 +82,40 @@ class AuthService:
         """
 
         user = await self._user_repository.get_by_id(user_id=user_id)
-        if not self._verify_password(old_password, user.password):
+        if not await self._verify_password(old_password, user.password):
             logger.error("Неверный пароль для пользоавтеля %s.", str(user.id))
             raise WrongOldPassword
-        hashed_new_password = self._get_password_hash(new_password)
+        hashed_new_password = await self._get_password_hash(new_password)
         user.password = hashed_new_password
         updated_user = await self._user_repository.update(user=user)
         return updated_user
 
-    def _get_password_hash(self, password) -> str:
+    async def _is_email_taken(self, email: str) -> bool:
+        """
+        Быстрая проверка занятости email перед хешированием пароля.
+        Если фильтр email точно не содержит адрес, запрос в БД не выполняется.
+        Регистрации, прошедшие в других процессах, фильтру не видны: такие дубликаты
+        по-прежнему отсекаются уникальным индексом при вставке.
+
+        :param email: Email пользователя.
+        :return: True, если email уже зарегистрирован.
+        """
+
+        if self._email_filter is not None and email not in self._email_filter:
+            return False
+        return await self._user_repository.exists_by_email(email=email)
+
+    async def _get_password_hash(self, password) -> str:
         """
-        Генерирует хеш пароля с использованием bcrypt.
+        Генерирует хеш пароля по текущей политике в пуле процессов.
 
         :param password: Открытый пароль.
         :return: Захешированный пароль.
         """
 
-        return self._context.hash(password)
+        return await self._password_hasher.hash(password)
 
-    def _verify_password(self, password: str, hashed_password: str) -> bool:
+    async def _verify_password(self, password: str, hashed_password: str) -> bool:
         """
         Проверяет соответствие пароля и его хеша.
 
@@ -84,11 +124,15 @@ class AuthService:
         :return: True, если пароль корректен.
         """
 
-        return self._context.verify(password, hashed_password)
+        return await self._password_hasher.verify(password, hashed_password)
 
 
 def get_auth_service(
     user_repository: AbstractUserRepository = Depends(get_user_repository),
+    password_hasher: AbstractPasswordHasher = Depends(get_password_hasher),
+    email_filter: BloomFilter | None = Depends(get_email_filter),
 ) -> AuthService:
-    auth_service: AuthService = AuthService(user_repository=user_repository)
+    auth_service: AuthService = AuthService(
+        user_repository=user_repository, password_hasher=password_hasher, email_filter=email_filter
+    )
     return auth_service
@@ -1,21 +1,41 @@
-from datetime import timedelta
+import time
 
 from fastapi import Depends
 
+from src.core.config import settings
+from src.domain.entities import RevocationEpoch, Token
 from src.domain.interfaces import AbstractBlacklistService
 from src.domain.repositories import AbstractBlacklistRepository
-from src.infrastructure.repositories.blacklist import get_blacklist_repository
+from src.infrastructure.repositories.blacklist import get_blacklist_repository, user_epoch_key
+from src.services.revocation_cache import RevocationNearCache, get_revocation_cache
+from src.services.revocation_filter import RevocationFilter, get_revocation_filter
+from src.services.token_cache import TokenCache, get_token_cache
 
 
 class BlacklistService(AbstractBlacklistService):
     """Сервис для работы с черным списком токенов."""
 
-    def __init__(self, black_list_repository: AbstractBlacklistRepository):
+    def __init__(
+        self,
+        black_list_repository: AbstractBlacklistRepository,
+        token_cache: TokenCache | None = None,
+        revocation_cache: RevocationNearCache | None = None,
+        revocation_filter: RevocationFilter | None = None,
+        epoch_ttl: int = 30 * 60,
+    ):
         """
         Инициализация сервиса.
         :param black_list_repository: Репозиторий черного списка (реализация хранилища).
+        :param token_cache: Кеш проверенных токенов, из которого удаляются отозванные jti.
+        :param revocation_cache: Локальная копия черного списка; если она прогрета, Redis не опрашивается.
+        :param revocation_filter: Фильтр Блума по черному списку; в Redis уходят только возможные совпадения.
+        :param epoch_ttl: Время хранения эпохи отзыва в секундах (время жизни access-токена).
         """
         self._repository = black_list_repository
+        self._token_cache = token_cache
+        self._revocation_cache = revocation_cache
+        self._revocation_filter = revocation_filter
+        self._epoch_ttl = epoch_ttl
 
     async def is_exists(self, key: str) -> bool:
         """
@@ -24,37 +44,191 @@ class BlacklistService(AbstractBlacklistService):
         :return: True, если ключ существует, иначе False.
         """
 
+        revoked, might_be_revoked = self._lookup_jti(str(key))
+        if revoked is not None:
+            return revoked
         value = await self._repository.get_value(key=key)
+        self._remember_jti(str(key), value is not None, might_be_revoked)
         return value is not None
 
-    async def set_one_value(self, key: str, value: str, exp: timedelta | None = None):
+    async def are_revoked(self, jtis: list[str]) -> dict[str, bool]:
         """
-        Добавляет один ключ в черный список.
-        :param key: Ключ (например, идентификатор токена).
-        :param value: Значение, связанное с ключом.
-        :param exp: Время жизни ключа (если не указано, ключ будет без срока действия).
+        Проверяет несколько jti. На что не ответили локальные кеши, читается из Redis пакетно.
+        :param jtis: Идентификаторы токенов.
+        :return: Словарь {jti: отозван ли}.
+        """
+
+        result, unknown = {}, {}
+        for jti in map(str, jtis):
+            result[jti], might_be_revoked = self._lookup_jti(jti)
+            if result[jti] is None:
+                unknown[jti] = might_be_revoked
+        if unknown:
+            for jti, revoked in zip(unknown, await self._repository.are_revoked(list(unknown))):
+                result[jti] = revoked
+                self._remember_jti(jti, revoked, unknown[jti])
+        return result
+
+    async def is_token_revoked(self, token: Token) -> bool:
+        """
+        Проверяет, отозван ли токен: по jti в черном списке или по эпохе отзыва пользователя.
+        Если локальные кеши не могут ответить, оба признака читаются из Redis за один запрос.
+        :param token: Декодированный токен.
+        :return: True, если токен отозван.
+        """
+
+        jti, user_id = str(token.jti), str(token.user_uuid)
+        revoked, might_be_revoked = self._lookup_jti(jti)
+        if revoked:
+            return True
+        epoch_known, epoch = self._lookup_epoch(user_id)
+        if revoked is None or not epoch_known:
+            in_blacklist, stored_epoch = await self._repository.get_revocation_state(jti, user_id)
+            if revoked is None:
+                revoked = in_blacklist
+                self._remember_jti(jti, in_blacklist, might_be_revoked)
+            if not epoch_known:
+                epoch = stored_epoch
+                self._remember_epoch(user_id, epoch)
+        return revoked or (epoch is not None and epoch.revokes(token))
+
+    async def are_tokens_revoked(self, tokens: list[Token]) -> list[bool]:
+        """
+        Пакетный вариант `is_token_revoked`: jti и эпохи, неизвестные локально, читаются из Redis пакетно.
+        :param tokens: Декодированные токены.
+        :return: Признаки отзыва в порядке `tokens`.
+        """
+
+        revoked = await self.are_revoked([str(token.jti) for token in tokens])
+        epochs, unknown = {}, []
+        for user_id in dict.fromkeys(str(token.user_uuid) for token in tokens):
+            epoch_known, epochs[user_id] = self._lookup_epoch(user_id)
+            if not epoch_known:
+                unknown.append(user_id)
+        if unknown:
+            for user_id, epoch in zip(unknown, await self._repository.get_user_epochs(unknown)):
+                epochs[user_id] = epoch
+                self._remember_epoch(user_id, epoch)
+        return [
+            revoked[str(token.jti)]
+            or (epochs[str(token.user_uuid)] is not None and epochs[str(token.user_uuid)].revokes(token))
+            for token in tokens
+        ]
+
+    async def revoke_user_tokens(self, user_id: str, keep_jti: str | None = None) -> None:
+        """
+        Отзывает все выпущенные до текущего момента токены пользователя одной записью,
+        независимо от числа сессий.
+        Граница округляется вверх до секунды (`iat` хранится в секундах), поэтому токены,
+        выпущенные в ту же секунду после отзыва, тоже становятся недействительными.
+        :param user_id: Идентификатор пользователя.
+        :param keep_jti: jti текущей сессии, токены которой остаются действительными.
+        """
+
+        epoch = RevocationEpoch(issued_before=int(time.time()) + 1, keep_jti=str(keep_jti) if keep_jti else None)
+        await self._repository.set_user_epoch(str(user_id), epoch, self._epoch_ttl)
+        if self._revocation_cache is not None:
+            self._revocation_cache.add_epochs({str(user_id): epoch})
+        if self._revocation_filter is not None:
+            self._revocation_filter.add([user_epoch_key(str(user_id))])
+
+    async def revoke(self, expirations: dict[str, int]) -> None:
+        """
+        Добавляет jti в черный список до момента истечения соответствующих токенов.
+        Срок хранения каждого ключа — оставшееся время жизни токена; уже истёкшие токены не записываются.
+        :param expirations: Словарь {jti: время истечения токена (unix-время, с)}.
+        """
+
+        now = int(time.time())
+        ttls = {str(jti): int(exp) - now for jti, exp in expirations.items() if int(exp) > now}
+        if not ttls:
+            return
+        await self._repository.set_many_values(ttls)
+        self._invalidate(list(ttls))
+
+    async def revoke_tokens(self, tokens: list[Token]) -> None:
+        """
+        Отзывает токены до истечения их срока действия.
+        :param tokens: Декодированные токены.
         """
 
-        await self._repository.set_value(key=str(key), value=str(value), exp=exp)
+        await self.revoke({str(token.jti): int(token.exp) for token in tokens})
 
-    async def set_many_values(self, values: dict[str, str], exp: timedelta | None = None):
+    def _lookup_jti(self, jti: str) -> tuple[bool | None, bool | None]:
         """
-        Добавляет несколько значений в храниРепозиторий для управления данными слище.
-        :param values: Словарь {ключ: значение}.
-        :param exp: Время жизни ключей (если указано, будет установлено время истечения).
+        Проверяет jti по локальной копии черного списка и фильтру Блума.
+        :param jti: Идентификатор токена.
+        :return: Пара (отозван ли или None, если нужен Redis; ответ фильтра).
         """
+        if self._revocation_cache is not None and (revoked := self._revocation_cache.lookup(jti)) is not None:
+            return revoked, None
+        might_be_revoked = None
+        if self._revocation_filter is not None:
+            might_be_revoked = self._revocation_filter.might_contain(jti)
+            if might_be_revoked is False:
+                return False, False
+        return None, might_be_revoked
 
-        values = {str(k): str(v) for k, v in values.items()}
-        await self._repository.set_many_values(values=values, exp=exp)
+    def _lookup_epoch(self, user_id: str) -> tuple[bool, RevocationEpoch | None]:
+        """
+        Проверяет эпоху отзыва пользователя по локальной копии и фильтру Блума.
+        :param user_id: Идентификатор пользователя.
+        :return: Пара (известен ли ответ локально, эпоха отзыва).
+        """
+        if self._revocation_cache is not None:
+            epoch_known, epoch = self._revocation_cache.lookup_epoch(user_id)
+            if epoch_known:
+                return True, epoch
+        if (
+            self._revocation_filter is not None
+            and self._revocation_filter.might_contain(user_epoch_key(user_id)) is False
+        ):
+            return True, None
+        return False, None
+
+    def _remember_jti(self, jti: str, revoked: bool, might_be_revoked: bool | None) -> None:
+        if revoked and self._revocation_cache is not None:
+            self._revocation_cache.add([jti])
+        if not revoked and might_be_revoked:
+            self._revocation_filter.record_false_positive()
+
+    def _remember_epoch(self, user_id: str, epoch: RevocationEpoch | None) -> None:
+        if epoch is not None and self._revocation_cache is not None:
+            self._revocation_cache.add_epochs({user_id: epoch})
+
+    def _invalidate(self, keys: list[str]) -> None:
+        """
+        Применяет отзыв к локальным кешам процесса, не дожидаясь сообщения из канала.
+        :param keys: Отозванные ключи.
+        """
+        if self._token_cache is not None:
+            for key in keys:
+                self._token_cache.invalidate_jti(key)
+        if self._revocation_cache is not None:
+            self._revocation_cache.add(keys)
+        if self._revocation_filter is not None:
+            self._revocation_filter.add(keys)
 
 
 def get_blacklist_service(
     repository: AbstractBlacklistRepository = Depends(get_blacklist_repository),
+    token_cache: TokenCache | None = Depends(get_token_cache),
+    revocation_cache: RevocationNearCache | None = Depends(get_revocation_cache),
+    revocation_filter: RevocationFilter | None = Depends(get_revocation_filter),
 ) -> AbstractBlacklistService:
     """
     Фабричный метод для получения экземпляра BlackListService.
     :param repository: Репозиторий черного списка.
+    :param token_cache: Кеш проверенных токенов.
+    :param revocation_cache: Локальная копия черного списка.
+    :param revocation_filter: Фильтр Блума по черному списку.
     :return: Экземпляр сервиса черного списка.
     """
-    black_list_service = BlacklistService(repository)
+    black_list_service = BlacklistService(
+        repository,
+        token_cache=token_cache,
+        revocation_cache=revocation_cache,
+        revocation_filter=revocation_filter,
+        epoch_ttl=settings.service.access_token_expire * 60,
+    )
     return black_list_service
@@ -0,0 +1,159 @@
+import asyncio
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+
+from passlib.context import CryptContext
+
+from src.core.limiter import ConcurrencyLimiter, LimitExceeded
+from src.domain.exceptions import PasswordHasherIsBusy
+from src.domain.interfaces import AbstractPasswordHasher
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class HashingPolicy:
+    """
+    Политика хеширования паролей.
+
+    Первая схема используется для новых хешей, остальные считаются устаревшими:
+    хеши в них (как и хеши с другими параметрами стоимости) перехешируются при входе.
+    """
+
+    schemes: tuple[str, ...] = ("bcrypt",)
+    bcrypt_rounds: int = 12
+    argon2_time_cost: int = 3
+    argon2_memory_cost: int = 65536
+    argon2_parallelism: int = 4
+
+    def create_context(self) -> CryptContext:
+        """
+        Создаёт CryptContext по параметрам политики.
+        :return: Настроенный CryptContext.
+        """
+        options = {}
+        if "bcrypt" in self.schemes:
+            options["bcrypt__rounds"] = self.bcrypt_rounds
+        if "argon2" in self.schemes:
+            options["argon2__type"] = "ID"
+            options["argon2__time_cost"] = self.argon2_time_cost
+            options["argon2__memory_cost"] = self.argon2_memory_cost
+            options["argon2__parallelism"] = self.argon2_parallelism
+        return CryptContext(schemes=list(self.schemes), deprecated="auto", **options)
+
+
+# Контекст создаётся один раз в каждом процессе пула (см. _init_worker).
+_context: CryptContext | None = None
+
+
+def _init_worker(policy: HashingPolicy) -> None:
+    global _context
+    _context = policy.create_context()
+
+
+def _hash_password(password: str) -> str:
+    return _context.hash(password)
+
+
+def _verify_password(password: str, hashed_password: str) -> bool:
+    return _context.verify(password, hashed_password)
+
+
+def _verify_and_update_password(password: str, hashed_password: str) -> tuple[bool, str | None]:
+    return _context.verify_and_update(password, hashed_password)
+
+
+class ProcessPoolPasswordHasher(AbstractPasswordHasher):
+    """Хеширует и проверяет пароли в отдельном пуле процессов, не блокируя event loop."""
+
+    def __init__(
+        self,
+        max_workers: int,
+        max_in_flight: int,
+        max_queue_size: int,
+        timeout: float,
+        policy: HashingPolicy = HashingPolicy(),
+    ):
+        """
+        Инициализация пула.
+        :param max_workers: Количество процессов в пуле.
+        :param max_in_flight: Максимальное число операций, одновременно переданных в пул.
+        :param max_queue_size: Максимальное число операций, ожидающих свободного слота.
+        :param timeout: Время ожидания результата одной операции (с учётом очереди) в секундах.
+        :param policy: Политика хеширования (схемы и параметры стоимости).
+        """
+        self._executor = ProcessPoolExecutor(
+            max_workers=max_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(policy,),
+        )
+        self._limiter = ConcurrencyLimiter("password_hasher", max_concurrency=max_in_flight, max_waiting=max_queue_size)
+        self._timeout = timeout
+
+    async def hash(self, password: str) -> str:
+        """
+        Генерирует хеш пароля.
+        :param password: Открытый пароль.
+        :return: Захешированный пароль.
+        :raises PasswordHasherIsBusy: Если пул перегружен или не ответил вовремя.
+        """
+        return await self._submit(_hash_password, password)
+
+    async def verify(self, password: str, hashed_password: str) -> bool:
+        """
+        Проверяет соответствие пароля и его хеша.
+        :param password: Открытый пароль.
+        :param hashed_password: Захешированный пароль.
+        :return: True, если пароль корректен.
+        :raises PasswordHasherIsBusy: Если пул перегружен или не ответил вовремя.
+        """
+        return await self._submit(_verify_password, password, hashed_password)
+
+    async def verify_and_update(self, password: str, hashed_password: str) -> tuple[bool, str | None]:
+        """
+        Проверяет пароль и, если хеш создан по устаревшей политике, возвращает новый хеш.
+        :param password: Открытый пароль.
+        :param hashed_password: Захешированный пароль.
+        :return: Кортеж (пароль корректен, новый хеш или None).
+        :raises PasswordHasherIsBusy: Если пул перегружен или не ответил вовремя.
+        """
+        return await self._submit(_verify_and_update_password, password, hashed_password)
+
+    def shutdown(self) -> None:
+        """Останавливает процессы пула."""
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+    async def _submit(self, func, *args):
+        started = asyncio.Event()
+        task = asyncio.create_task(self._run(started, func, *args))
+        task.add_done_callback(_discard_result)
+        try:
+            async with asyncio.timeout(self._timeout):
+                # shield: по таймауту вызывающий перестаёт ждать, но начатая в пуле операция держит слот до конца
+                return await asyncio.shield(task)
+        except LimitExceeded:
+            logger.warning("Очередь хеширования переполнена (%s операций ожидают)", self._limiter.waiting)
+            raise PasswordHasherIsBusy
+        except TimeoutError:
+            logger.error("Хеширование пароля не завершилось за %s с", self._timeout)
+            raise PasswordHasherIsBusy
+        finally:
+            # Операцию, так и не дождавшуюся слота, снимаем из очереди: в пул она уже не нужна
+            if not started.is_set():
+                task.cancel()
+
+    async def _run(self, started: asyncio.Event, func, *args):
+        async with self._limiter.acquire():
+            started.set()
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, func, *args)
+
+
+def _discard_result(task: asyncio.Task) -> None:
+    # Результат операции, завершившейся после таймаута, никому не нужен; забираем исключение, чтобы не было
+    # предупреждения "Task exception was never retrieved"
+    if not task.cancelled():
+        task.exception()
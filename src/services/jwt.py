@@ -1,108 +1,282 @@
+import base64
 import logging
 import uuid
 from datetime import datetime, timedelta
+from functools import lru_cache
 
 import jwt
 
 from src.core.config import settings
-from src.domain.entities import Token, User
+from src.core.permission_registry import encode_permission_mask
+from src.domain.entities import Token, TokenPair, User
 from src.domain.exceptions import SessionHasExpired
 from src.domain.interfaces import AbstractJWTService
+from src.services.jwt_keys import KeySet, get_key_set
+from src.services.token_cache import TokenCache, get_token_cache
 
 logger = logging.getLogger(__name__)
 
 
+def _pack_uuid(value) -> str:
+    """
+    Упаковывает UUID в 22 символа base64url вместо 36 символов канонической записи.
+    Значения, не являющиеся UUID, передаются как есть.
+    """
+    try:
+        raw = uuid.UUID(str(value)).bytes
+    except ValueError:
+        return str(value)
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def _unpack_uuid(value: str) -> str:
+    if len(value) != 22:
+        return value
+    try:
+        return str(uuid.UUID(bytes=base64.urlsafe_b64decode(value + "==")))
+    except ValueError:
+        return value
+
+
 class JWTService(AbstractJWTService):
     def __init__(
         self,
-        secret_key: str,
+        secret_key: str | None = None,
         algorithm: str = "HS256",
         access_token_lifetime: timedelta = timedelta(minutes=15),
         refresh_token_lifetime: timedelta = timedelta(days=60),
+        key_set: KeySet | None = None,
+        token_cache: TokenCache | None = None,
+        permission_format: str = "mask",
+        token_profile: str = "standard",
     ) -> None:
         """
         Инициализирует JWT сервис с заданными параметрами.
 
-        :param secret_key: Секретный ключ для подписи токенов.
+        :param secret_key: Секретный ключ для подписи токенов (если не передан key_set).
         :param algorithm: Алгоритм шифрования (по умолчанию "H256").
         :param access_token_lifetime: Время жизни access токена.
         :param refresh_token_lifetime: Время жизни refresh токена.
+        :param key_set: Набор ключей подписи и проверки (для асимметричных алгоритмов и ротации ключей).
+        :param token_cache: Кеш уже проверенных токенов (если не передан, подпись проверяется всегда).
+        :param permission_format: Формат прав в токене: "mask" (битовая маска `pmask`) или "slugs" (список `scope`).
+        :param token_profile: Набор claim: "compact" (короткие имена, упакованные UUID, роли в `rol`)
+            или "standard" (`user_uuid` и права в формате `permission_format`).
         """
 
-        self._secret_key = secret_key
-        self._algorithm = algorithm
+        self._key_set = key_set or KeySet.symmetric(secret_key=secret_key, algorithm=algorithm)
+        self._token_cache = token_cache
+        self._permission_format = permission_format
+        self._token_profile = token_profile
         self._access_token_lifetime = access_token_lifetime
         self._refresh_token_lifetime = refresh_token_lifetime
-        self._jti = str(uuid.uuid4())
+        self._headers = {"kid": self._key_set.key_id} if self._key_set.key_id else None
+
+    def _user_claims(self, user: User) -> dict:
+        """
+        Формирует claim, не зависящие от времени жизни токена: пользователя и его права.
+
+        :param user: Объект пользователя, для которого создаётся токен.
+        :return: Словарь claim профиля `token_profile`.
+        """
+
+        if self._token_profile == "compact":
+            return {"sub": _pack_uuid(user.id), "rol": [role.slug for role in user.roles]}
+        return {"user_uuid": str(user.id), **self._permission_claims(user)}
+
+    def _token_claims(self, token: Token) -> dict:
+        """
+        Восстанавливает claim пользователя из проверенного токена, чтобы перевыпустить пару без загрузки
+        пользователя из БД.
+
+        :param token: Декодированный refresh-токен.
+        :return: Словарь claim профиля `token_profile`.
+        """
+
+        if self._token_profile == "compact":
+            return {"sub": _pack_uuid(token.user_uuid), "rol": list(token.roles or [])}
+        if token.pmask is not None:
+            return {"user_uuid": str(token.user_uuid), "pmask": token.pmask}
+        return {"user_uuid": str(token.user_uuid), "scope": list(token.scope)}
+
+    def _sign(self, claims: dict, jti: str, iat: int, token_lifetime: timedelta) -> str:
+        """
+        Подписывает токен с заданным временем жизни.
+
+        :param claims: Claim пользователя из `_user_claims`.
+        :param jti: Идентификатор токена.
+        :param iat: Время выпуска, секунды epoch.
+        :param token_lifetime: Время жизни токена.
+        :return: Сгенерированный JWT токен в виде строки.
+        """
 
-    def _generate_token(self, user: User, token_lifetime: timedelta) -> str:
+        packed_jti = _pack_uuid(jti) if self._token_profile == "compact" else jti
+        payload = {**claims, "iat": iat, "exp": iat + int(token_lifetime.total_seconds()), "jti": packed_jti}
+        return jwt.encode(
+            payload=payload, key=self._key_set.signing_key, algorithm=self._key_set.algorithm, headers=self._headers
+        )
+
+    def _generate_token(self, user: User, token_lifetime: timedelta, jti: str | None = None) -> str:
         """
         Генерирует JWT токен для указанного пользователя с заданным временем жизни.
 
         :param user: Объект пользователя, для которого создаётся токен.
         :param token_lifetime: Время жизни токена.
+        :param jti: Идентификатор токена (по умолчанию создаётся новый).
         :return: Сгенерированный JWT токен в виде строки.
         """
 
-        now = datetime.now()
-        payload = {
-            "user_uuid": str(user.id),
-            "iat": now.timestamp(),
-            "exp": (now + token_lifetime).timestamp(),
-            "jti": self._jti,
-            "scope": [perm.slug for role in user.roles for perm in role.permissions],
-        }
-        return jwt.encode(payload=payload, key=self._secret_key, algorithm=self._algorithm)
+        iat = int(datetime.now().timestamp())
+        return self._sign(self._user_claims(user), jti or str(uuid.uuid4()), iat, token_lifetime)
+
+    def _permission_claims(self, user: User) -> dict[str, str | list[str]]:
+        """
+        Формирует claim с правами пользователя.
+        Маска собирается по `bit_index` прав; если у какого-либо права бит ещё не назначен,
+        используется список slug.
+
+        :param user: Объект пользователя.
+        :return: Словарь с claim `pmask` или `scope`.
+        """
+
+        permissions = [perm for role in user.roles for perm in role.permissions]
+        if self._permission_format == "mask" and all(perm.bit_index is not None for perm in permissions):
+            mask = 0
+            for perm in permissions:
+                mask |= 1 << perm.bit_index
+            return {"pmask": encode_permission_mask(mask)}
+        return {"scope": [perm.slug for perm in permissions]}
 
-    def generate_access_token(self, user: User) -> str:
+    def generate_access_token(self, user: User, jti: str | None = None) -> str:
         """
         Генерирует access токен для указанного пользователя.
 
         :param user: Объект пользователя, для которого создаётся access токен.
+        :param jti: Идентификатор токена (по умолчанию создаётся новый).
         :return: Сгенерированный access JWT токен в виде строки.
         """
 
-        return self._generate_token(user=user, token_lifetime=self._access_token_lifetime)
+        return self._generate_token(user=user, token_lifetime=self._access_token_lifetime, jti=jti)
 
-    def generate_refresh_token(self, user: User) -> str:
+    def generate_refresh_token(self, user: User, jti: str | None = None) -> str:
         """
         Генерирует refresh токен для указанного пользователя.
 
         :param user: Объект пользователя, для которого создаётся refresh токен.
+        :param jti: Идентификатор токена (по умолчанию создаётся новый).
         :return: Сгенерированный refresh JWT токен в виде строки.
         """
 
-        return self._generate_token(user=user, token_lifetime=self._refresh_token_lifetime)
+        return self._generate_token(user=user, token_lifetime=self._refresh_token_lifetime, jti=jti)
+
+    def mint_token_pair(
+        self, user: User, device_type: str | None = None, session_id: str | uuid.UUID | None = None
+    ) -> TokenPair:
+        """
+        Выпускает access и refresh токены с общим jti.
+        Claim пользователя и права собираются один раз для обоих токенов.
+
+        :param user: Объект пользователя.
+        :param device_type: Тип устройства сессии; попадает в claim `dvc` refresh-токена, чтобы поиск
+            сессии обращался только к её партиции.
+        :param session_id: Идентификатор сессии; попадает в claim `sid` refresh-токена для обнаружения
+            повторного предъявления.
+        :return: Пара токенов и их jti.
+        """
+
+        return self._mint(self._user_claims(user), device_type, session_id)
+
+    def rotate_token_pair(self, token: Token) -> TokenPair:
+        """
+        Перевыпускает пару по предъявленному refresh-токену: claim пользователя, `dvc` и `sid` переносятся
+        из него, jti и время выпуска новые.
+
+        :param token: Декодированный refresh-токен.
+        :return: Пара токенов и их jti.
+        """
+
+        return self._mint(self._token_claims(token), token.device_type, token.session_id)
+
+    def _mint(self, claims: dict, device_type: str | None, session_id: str | uuid.UUID | None) -> TokenPair:
+        jti = str(uuid.uuid4())
+        iat = int(datetime.now().timestamp())
+        refresh_claims = dict(claims)
+        if device_type:
+            refresh_claims["dvc"] = device_type
+        if session_id:
+            refresh_claims["sid"] = _pack_uuid(session_id) if self._token_profile == "compact" else str(session_id)
+        return TokenPair(
+            access_token=self._sign(claims, jti, iat, self._access_token_lifetime),
+            refresh_token=self._sign(refresh_claims, jti, iat, self._refresh_token_lifetime),
+            jti=jti,
+        )
 
     def decode_token(self, jwt_token: str) -> Token:
         """
         Декодирует и валидирует JWT токен.
+        Повторно предъявленный токен берётся из кеша без проверки подписи.
 
         :param jwt_token: JWT токен в виде строки.
         :return: Объект Token с полезной нагрузкой из токена.
         :raises SessionHasExpired: Если токен просрочен.
         """
 
+        if self._token_cache is not None and (token := self._token_cache.get(jwt_token)) is not None:
+            return token
         try:
-            payload = jwt.decode(jwt=jwt_token, key=self._secret_key, algorithms=[self._algorithm])
-            token = Token(**payload)
+            key_id = jwt.get_unverified_header(jwt_token).get("kid")
+            key = self._key_set.get_verification_key(key_id)
+            if key is None:
+                logger.error("Неизвестный ключ подписи токена (kid=%s)", key_id)
+                raise SessionHasExpired
+            payload = jwt.decode(jwt=jwt_token, key=key, algorithms=[self._key_set.algorithm])
+            token = self._to_token(payload)
         except jwt.ExpiredSignatureError:
             logger.error("Токен %s просрочен.", jwt_token)
             raise SessionHasExpired
         except (jwt.PyJWTError, TypeError):
             logger.error("Ошибка декодирования токена %s", jwt_token)
             raise SessionHasExpired
+        if self._token_cache is not None:
+            self._token_cache.put(jwt_token, token)
         return token
 
-    @property
-    def jti(self):
-        return self._jti
+    @staticmethod
+    def _to_token(payload: dict) -> Token:
+        """
+        Собирает Token из полезной нагрузки любого из профилей.
+        В компактном профиле права не передаются: они раскрываются из claim `rol` по реестру прав.
+
+        :param payload: Проверенная полезная нагрузка JWT.
+        :return: Объект Token.
+        """
+
+        device_type = payload.pop("dvc", None)
+        session_id = _unpack_uuid(payload.pop("sid")) if "sid" in payload else None
+        if "sub" not in payload:
+            return Token(**payload, device_type=device_type, session_id=session_id)
+        return Token(
+            user_uuid=_unpack_uuid(payload["sub"]),
+            iat=payload["iat"],
+            exp=payload["exp"],
+            jti=_unpack_uuid(payload["jti"]),
+            roles=payload.get("rol", []),
+            device_type=device_type,
+            session_id=session_id,
+        )
 
 
+@lru_cache
 def get_jwt_service() -> JWTService:
+    """
+    Возвращает общий для процесса JWT сервис: ключи разбираются один раз при первом обращении.
+    Сервис не хранит состояния запроса, jti выдаётся на каждую пару токенов.
+    """
     jwt_service = JWTService(
-        secret_key=settings.service.secret_key.get_secret_value(),
-        algorithm=settings.service.jwt_algorithm,
+        key_set=get_key_set(),
+        token_cache=get_token_cache(),
+        permission_format=settings.service.jwt_permission_format,
+        token_profile=settings.service.jwt_token_profile,
         access_token_lifetime=timedelta(minutes=30),
         refresh_token_lifetime=timedelta(days=30),
     )
@@ -0,0 +1,120 @@
+import logging
+from dataclasses import dataclass, field
+from functools import cached_property, lru_cache
+from pathlib import Path
+from typing import Any
+
+from cryptography.hazmat.primitives.serialization import load_pem_private_key, load_pem_public_key
+from jwt.algorithms import get_default_algorithms, has_crypto
+from jwt.exceptions import InvalidKeyError
+
+from src.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+SYMMETRIC_ALGORITHMS = {"HS256", "HS384", "HS512"}
+
+
+def check_key_type(algorithm: str, key: Any, path: Path | None = None) -> Any:
+    """
+    Проверяет, что тип ключа подходит алгоритму подписи: иначе ключ не опубликовать в JWKS
+    и им не проверить подпись.
+    :param algorithm: Алгоритм подписи.
+    :param key: Загруженный ключ.
+    :param path: Файл ключа (для сообщения об ошибке).
+    :return: Тот же ключ.
+    :raises RuntimeError: Если тип ключа не соответствует алгоритму.
+    """
+    try:
+        return get_default_algorithms()[algorithm].prepare_key(key)
+    except (InvalidKeyError, TypeError):
+        source = f" из {path}" if path is not None else ""
+        raise RuntimeError(f"Ключ {type(key).__name__}{source} не подходит для алгоритма JWT {algorithm}")
+
+
+@dataclass
+class KeySet:
+    """
+    Набор ключей для подписи и проверки JWT.
+
+    Подпись выполняется одним активным ключом (`signing_key`, идентификатор `key_id` попадает
+    в заголовок `kid`). Для проверки допускается несколько ключей: активный и ключи, выведенные
+    из ротации, пока не истекут подписанные ими токены.
+    """
+
+    algorithm: str
+    signing_key: Any
+    key_id: str | None = None
+    verification_keys: dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def is_symmetric(self) -> bool:
+        return self.algorithm in SYMMETRIC_ALGORITHMS
+
+    def get_verification_key(self, key_id: str | None) -> Any | None:
+        """
+        Возвращает ключ проверки подписи по `kid` из заголовка токена.
+        :param key_id: Идентификатор ключа (может отсутствовать у симметричных токенов).
+        :return: Ключ проверки или None, если ключ неизвестен.
+        """
+        if key_id is None:
+            return self.verification_keys.get(self.key_id) if not self.is_symmetric else self.signing_key
+        return self.verification_keys.get(key_id)
+
+    @cached_property
+    def jwks(self) -> dict[str, list[dict[str, Any]]]:
+        """
+        Публичные ключи проверки в формате JWK Set (RFC 7517).
+        Для симметричных алгоритмов список ключей пуст: секрет не публикуется.
+        """
+        if self.is_symmetric:
+            return {"keys": []}
+        algorithm = get_default_algorithms()[self.algorithm]
+        keys = []
+        for key_id, public_key in self.verification_keys.items():
+            jwk = algorithm.to_jwk(public_key, as_dict=True)
+            jwk.update({"kid": key_id, "alg": self.algorithm, "use": "sig"})
+            keys.append(jwk)
+        return {"keys": keys}
+
+    @classmethod
+    def symmetric(cls, secret_key: str, algorithm: str = "HS256") -> "KeySet":
+        return cls(algorithm=algorithm, signing_key=secret_key)
+
+    @classmethod
+    def from_files(cls, algorithm: str, private_key_path: Path, key_id: str, public_keys_dir: Path | None) -> "KeySet":
+        """
+        Загружает асимметричные ключи из PEM-файлов.
+        :param algorithm: Алгоритм подписи (RS256, EdDSA, ES256 и т. д.).
+        :param private_key_path: Путь к закрытому ключу активной пары.
+        :param key_id: Идентификатор активного ключа.
+        :param public_keys_dir: Каталог с открытыми ключами `<kid>.pem`, принимаемыми при проверке.
+        :return: Экземпляр KeySet.
+        """
+        if not has_crypto:
+            raise RuntimeError("Для асимметричных алгоритмов JWT требуется пакет cryptography")
+        signing_key = check_key_type(algorithm, load_pem_private_key(private_key_path.read_bytes(), password=None))
+        verification_keys = {}
+        if public_keys_dir is not None:
+            for path in sorted(public_keys_dir.glob("*.pem")):
+                verification_keys[path.stem] = check_key_type(algorithm, load_pem_public_key(path.read_bytes()), path)
+        verification_keys[key_id] = signing_key.public_key()
+        logger.info("Загружены ключи JWT: активный %s, для проверки %s", key_id, sorted(verification_keys))
+        return cls(algorithm=algorithm, signing_key=signing_key, key_id=key_id, verification_keys=verification_keys)
+
+
+@lru_cache
+def get_key_set() -> KeySet:
+    """
+    Возвращает общий для процесса набор ключей, собранный из настроек.
+    :return: Экземпляр KeySet.
+    """
+    service = settings.service
+    if service.jwt_algorithm in SYMMETRIC_ALGORITHMS:
+        return KeySet.symmetric(service.secret_key.get_secret_value(), service.jwt_algorithm)
+    return KeySet.from_files(
+        algorithm=service.jwt_algorithm,
+        private_key_path=service.jwt_private_key_path,
+        key_id=service.jwt_key_id,
+        public_keys_dir=service.jwt_public_keys_dir,
+    )
@@ -3,6 +3,7 @@ import logging
 from fastapi import Depends
 
 from src.api.v1.schemas.permissions import PermissionBase
+from src.core.permission_registry import PermissionRegistry, get_permission_registry
 from src.domain.entities import Permission
 from src.domain.exceptions import PermissionNotFound
 from src.domain.repositories import AbstractPermissionRepository
@@ -12,8 +13,9 @@ logger = logging.getLogger(__name__)
 
 
 class PermissionService:
-    def __init__(self, permission_repository: AbstractPermissionRepository):
+    def __init__(self, permission_repository: AbstractPermissionRepository, permission_registry: PermissionRegistry):
         self._permission_repository: AbstractPermissionRepository = permission_repository
+        self._permission_registry: PermissionRegistry = permission_registry
 
     async def create_or_update(self, data: PermissionBase, slug: str | None = None) -> Permission:
         """Создаёт новое разрешение или обновляет существующее"""
@@ -25,7 +27,9 @@ class PermissionService:
             return await self._permission_repository.update_permission(existing_permission)
         else:
             logger.info(f"Создание нового разрешения: {data.slug}")
-            return await self._permission_repository.create_permission(data.slug, data.description)
+            permission = await self._permission_repository.create_permission(data.slug, data.description)
+            self._permission_registry.register(permission)
+            return permission
 
     async def delete(self, slug: str) -> bool:
         """Удаляет разрешение"""
@@ -51,6 +55,7 @@ class PermissionService:
 
 def get_permission_service(
     permission_repository: AbstractPermissionRepository = Depends(get_permission_repository),
+    permission_registry: PermissionRegistry = Depends(get_permission_registry),
 ) -> PermissionService:
     """Фабричная функция для получения экземпляра сервиса разрешений"""
-    return PermissionService(permission_repository=permission_repository)
+    return PermissionService(permission_repository=permission_repository, permission_registry=permission_registry)
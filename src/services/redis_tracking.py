@@ -0,0 +1,167 @@
+import asyncio
+import logging
+from collections import OrderedDict
+from collections.abc import Iterable
+from typing import Any
+
+from opentelemetry.metrics import CallbackOptions, Observation
+from redis.asyncio import ConnectionPool
+from redis.utils import HIREDIS_AVAILABLE
+
+from src.core.metrics import meter
+
+logger = logging.getLogger(__name__)
+# redis-py по умолчанию пишет каждое push-сообщение RESP3 в лог на уровне INFO.
+logging.getLogger("push_response").setLevel(logging.WARNING)
+
+hits_counter = meter.create_counter("redis_tracking.hits", description="Чтения Redis, отвеченные клиентским кешем")
+misses_counter = meter.create_counter("redis_tracking.misses", description="Чтения Redis, ушедшие на сервер")
+invalidations_counter = meter.create_counter(
+    "redis_tracking.invalidations", description="Ключи, инвалидированные сервером через CLIENT TRACKING"
+)
+
+
+class TrackedReadCache:
+    """
+    Клиентский кеш чтений Redis с инвалидацией на стороне сервера (CLIENT TRACKING).
+
+    Отдельное соединение RESP3 включает `CLIENT TRACKING ON BCAST PREFIX ...`: сервер присылает
+    push-сообщение `invalidate` при любом изменении или истечении ключа с отслеживаемым префиксом,
+    кто бы его ни изменил. Кеш отвечает только пока это соединение живо; при разрыве или пропуске
+    PING он очищается и до переподключения все чтения идут на сервер.
+
+    Значение, прочитанное с сервера, кладётся в кеш, только если между началом чтения и записью
+    не пришло ни одной инвалидации: иначе ответ мог устареть, пока шёл по сети.
+    """
+
+    def __init__(
+        self,
+        max_entries: int,
+        prefixes: Iterable[bytes | str],
+        ping_interval: float,
+        reconnect_delay: float = 1.0,
+    ):
+        """
+        Инициализация кеша.
+        :param max_entries: Наибольшее число ключей в кеше (вытесняются давно не читанные).
+        :param prefixes: Префиксы ключей, за которыми следит сервер.
+        :param ping_interval: Интервал проверки соединения отслеживания в секундах.
+        :param reconnect_delay: Пауза перед переподключением в секундах.
+        """
+        self._max_entries = max_entries
+        self._prefixes = [self._as_bytes(prefix) for prefix in prefixes]
+        self._ping_interval = ping_interval
+        self._reconnect_delay = reconnect_delay
+        self._entries: OrderedDict[bytes, Any] = OrderedDict()
+        self.sequence = 0
+        self.ready = False
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: bytes | str) -> tuple[bool, Any]:
+        """
+        Возвращает значение ключа из кеша.
+        :param key: Ключ Redis.
+        :return: Пара (найден ли ключ, значение; None — ключа нет и на сервере).
+        """
+        key = self._as_bytes(key)
+        if self.ready and key in self._entries:
+            self._entries.move_to_end(key)
+            hits_counter.add(1)
+            return True, self._entries[key]
+        misses_counter.add(1)
+        return False, None
+
+    def put(self, key: bytes | str, value: Any, sequence: int) -> None:
+        """
+        Запоминает прочитанное с сервера значение.
+        :param key: Ключ Redis.
+        :param value: Значение (None, если ключа нет).
+        :param sequence: Значение `sequence`, снятое до отправки чтения.
+        """
+        if not self.ready or sequence != self.sequence:
+            return
+        key = self._as_bytes(key)
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, keys: Iterable[bytes | str] | None) -> None:
+        """
+        Удаляет ключи из кеша; None — сервер сбросил все ключи (FLUSHALL/FLUSHDB).
+        :param keys: Инвалидированные ключи.
+        """
+        self.sequence += 1
+        if keys is None:
+            invalidations_counter.add(len(self._entries))
+            self._entries.clear()
+            return
+        for key in keys:
+            self._entries.pop(self._as_bytes(key), None)
+            invalidations_counter.add(1)
+
+    async def run(self, pool: ConnectionPool) -> None:
+        """
+        Фоновая задача: держит соединение отслеживания и переподключается при ошибках.
+        :param pool: Пул основного клиента, параметры которого используются для соединения.
+        """
+        if HIREDIS_AVAILABLE:
+            logger.warning("Клиентский кеш Redis не поддерживает парсер hiredis и отключён")
+            return
+        while True:
+            connection = pool.connection_class(**{**pool.connection_kwargs, "protocol": 3, "health_check_interval": 0})
+            try:
+                await connection.connect()
+                prefixes = [argument for prefix in self._prefixes for argument in (b"PREFIX", prefix)]
+                await connection.send_command("CLIENT", "TRACKING", "ON", "BCAST", *prefixes)
+                await connection.read_response()
+                self.invalidate(None)
+                self.ready = True
+                logger.info("Клиентский кеш Redis включён")
+                await self._listen(connection)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Соединение отслеживания ключей Redis прервано, чтения идут на сервер")
+            finally:
+                self.ready = False
+                self.invalidate(None)
+                await connection.disconnect(nowait=True)
+            await asyncio.sleep(self._reconnect_delay)
+
+    async def _listen(self, connection) -> None:
+        awaiting_pong = False
+        while True:
+            response = await connection.read_response(timeout=self._ping_interval, push_request=True)
+            if response is None:
+                if awaiting_pong:
+                    raise ConnectionError("Redis не ответил на PING в соединении отслеживания ключей")
+                await connection.send_command("PING")
+                awaiting_pong = True
+            elif isinstance(response, list) and response and self._as_bytes(response[0]) == b"invalidate":
+                self.invalidate(response[1])
+            else:
+                awaiting_pong = False
+
+    @staticmethod
+    def _as_bytes(key: bytes | str) -> bytes:
+        return key.encode() if isinstance(key, str) else key
+
+
+tracked_read_cache: TrackedReadCache | None = None
+
+
+def get_tracked_read_cache() -> TrackedReadCache | None:
+    return tracked_read_cache
+
+
+def observe_entries(_: CallbackOptions) -> Iterable[Observation]:
+    if tracked_read_cache is not None:
+        yield Observation(len(tracked_read_cache))
+
+
+meter.create_observable_gauge(
+    "redis_tracking.entries", callbacks=[observe_entries], description="Ключи в клиентском кеше Redis"
+)
@@ -0,0 +1,156 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+from collections.abc import Awaitable, Callable
+
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+from redis.asyncio import Redis
+
+from src.core.metrics import meter
+from src.domain.entities import TokenPair
+
+logger = logging.getLogger(__name__)
+
+REFRESH_LOCK_KEY_PREFIX = "refresh:lock:"
+REFRESH_RESULT_KEY_PREFIX = "refresh:pair:"
+
+# Снимает блокировку, только если она всё ещё принадлежит этому запросу (могла истечь и достаться другому)
+RELEASE_LOCK_SCRIPT = """
+if redis.call("GET", KEYS[1]) == ARGV[1] then
+    return redis.call("DEL", KEYS[1])
+end
+return 0
+"""
+
+rotations_counter = meter.create_counter(
+    "refresh_single_flight.rotations", description="Ротации refresh-токена, выполненные этим процессом"
+)
+coalesced_counter = meter.create_counter(
+    "refresh_single_flight.coalesced", description="Запросы обновления, получившие результат чужой ротации"
+)
+
+
+class RefreshSingleFlight:
+    """
+    Объединяет параллельные обновления по одному refresh-токену.
+
+    В процессе одновременные запросы ждут одну задачу ротации. Между процессами ротацию выполняет
+    владелец короткой блокировки в Redis (`SET NX PX`), остальные ждут её результат. Выпущенная пара
+    хранится `grace_period` секунд: повторный запрос со старым токеном в этом окне получает ту же пару,
+    а не срабатывание обнаружения повторного использования.
+
+    В Redis пара лежит зашифрованной ключом, выведенным из старого refresh-токена, поэтому прочитать её
+    может только тот, кто этот токен предъявил.
+    """
+
+    def __init__(self, redis: Redis, grace_period: float, lock_timeout: float, poll_interval: float = 0.05):
+        """
+        Инициализация.
+        :param redis: Клиент Redis.
+        :param grace_period: Сколько секунд результат ротации выдаётся повторным запросам.
+        :param lock_timeout: Время жизни блокировки ротации и наибольшее время ожидания чужой ротации, с.
+        :param poll_interval: Интервал опроса результата чужой ротации, с.
+        """
+        self._redis = redis
+        self._grace_period = grace_period
+        self._lock_timeout = lock_timeout
+        self._poll_interval = poll_interval
+        self._in_flight: dict[bytes, asyncio.Future] = {}
+        self._results: dict[bytes, tuple[TokenPair, float]] = {}
+
+    async def run(self, refresh_token: str, rotate: Callable[[], Awaitable[TokenPair]]) -> TokenPair:
+        """
+        Выполняет ротацию не более одного раза на токен в окне `grace_period`.
+        :param refresh_token: Предъявленный refresh-токен.
+        :param rotate: Ротация: заменяет токен в БД и возвращает новую пару.
+        :return: Новая пара токенов (своя или полученная от параллельного запроса).
+        """
+        digest = hashlib.sha256(refresh_token.encode()).digest()
+        self._purge()
+        cached = self._results.get(digest)
+        if cached is not None:
+            coalesced_counter.add(1, {"scope": "process"})
+            return cached[0]
+        in_flight = self._in_flight.get(digest)
+        if in_flight is not None:
+            coalesced_counter.add(1, {"scope": "process"})
+            return await asyncio.shield(in_flight)
+
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[digest] = future
+        try:
+            token_pair = await self._run_across_workers(refresh_token, digest, rotate)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as error:
+            future.set_exception(error)
+            # Ожидающих может не быть: помечаем исключение полученным, чтобы asyncio не писал о нём в лог
+            future.exception()
+            raise
+        finally:
+            self._in_flight.pop(digest, None)
+        self._results[digest] = (token_pair, time.monotonic() + self._grace_period)
+        future.set_result(token_pair)
+        return token_pair
+
+    async def _run_across_workers(
+        self, refresh_token: str, digest: bytes, rotate: Callable[[], Awaitable[TokenPair]]
+    ) -> TokenPair:
+        lock_key = REFRESH_LOCK_KEY_PREFIX + digest.hex()
+        result_key = REFRESH_RESULT_KEY_PREFIX + digest.hex()
+        key = self._encryption_key(refresh_token)
+        deadline = time.monotonic() + self._lock_timeout
+        while True:
+            sealed = await self._redis.get(result_key)
+            if sealed is not None:
+                coalesced_counter.add(1, {"scope": "redis"})
+                return self._open(key, sealed)
+            owner = os.urandom(16).hex()
+            if await self._redis.set(lock_key, owner, nx=True, px=int(self._lock_timeout * 1000)):
+                break
+            if time.monotonic() >= deadline:
+                # Владелец блокировки не уложился в её срок: ротация выполняется без координации
+                logger.warning("Не дождались параллельной ротации refresh-токена, выполняем свою")
+                rotations_counter.add(1)
+                return await rotate()
+            await asyncio.sleep(self._poll_interval)
+
+        try:
+            token_pair = await rotate()
+            rotations_counter.add(1)
+            await self._redis.set(result_key, self._seal(key, token_pair), px=int(self._grace_period * 1000))
+            return token_pair
+        finally:
+            await self._redis.eval(RELEASE_LOCK_SCRIPT, 1, lock_key, owner)
+
+    def _purge(self) -> None:
+        now = time.monotonic()
+        for digest in [digest for digest, (_, expires_at) in self._results.items() if expires_at <= now]:
+            del self._results[digest]
+
+    @staticmethod
+    def _encryption_key(refresh_token: str) -> bytes:
+        # Ключ выводится иначе, чем имя ключа Redis, чтобы одно не раскрывало другое
+        return hashlib.sha256(b"refresh-single-flight:" + refresh_token.encode()).digest()
+
+    @staticmethod
+    def _seal(key: bytes, token_pair: TokenPair) -> bytes:
+        nonce = os.urandom(12)
+        payload = json.dumps([token_pair.access_token, token_pair.refresh_token, token_pair.jti]).encode()
+        return nonce + AESGCM(key).encrypt(nonce, payload, None)
+
+    @staticmethod
+    def _open(key: bytes, sealed: bytes) -> TokenPair:
+        access_token, refresh_token, jti = json.loads(AESGCM(key).decrypt(sealed[:12], sealed[12:], None))
+        return TokenPair(access_token=access_token, refresh_token=refresh_token, jti=jti)
+
+
+refresh_single_flight: RefreshSingleFlight | None = None
+
+
+def get_refresh_single_flight() -> RefreshSingleFlight | None:
+    return refresh_single_flight
@@ -0,0 +1,256 @@
+import asyncio
+import json
+import logging
+import time
+from collections.abc import Iterable
+
+from opentelemetry.metrics import CallbackOptions, Observation
+from redis.asyncio import Redis
+
+from src.core.metrics import meter
+from src.domain.entities import RevocationEpoch
+
+logger = logging.getLogger(__name__)
+
+local_hits_counter = meter.create_counter(
+    "revocation_cache.local_hits", description="Проверки отзыва токена, отвеченные из локального кеша"
+)
+fallbacks_counter = meter.create_counter(
+    "revocation_cache.fallbacks", description="Проверки отзыва токена, ушедшие в Redis"
+)
+staleness_histogram = meter.create_histogram(
+    "revocation_cache.staleness", unit="ms", description="Задержка доставки отзыва токена в локальный кеш"
+)
+
+
+class RevocationNearCache:
+    """
+    Локальная (в процессе) копия черного списка токенов.
+
+    Кеш получает от RevocationSubscriber отозванные jti, которые репозиторий черного списка
+    публикует в канал Redis. Пока подписка жива дольше окна `warmup` (время жизни access-токена), отсутствие jti в локальном
+    наборе означает, что токен не отозван, и Redis не опрашивается. До этого момента — при старте,
+    после переподключения или пропуска PING — кеш считается холодным, и проверки идут в Redis:
+    отзывы, опубликованные во время разрыва, могли не дойти.
+    """
+
+    def __init__(self, warmup: float, default_ttl: float):
+        """
+        Инициализация кеша.
+        :param warmup: Сколько секунд подписка должна быть непрерывной, чтобы отвечать локально.
+        :param default_ttl: Время хранения отзыва, если в сообщении не указан срок, в секундах.
+        """
+        self._warmup = warmup
+        self._default_ttl = default_ttl
+        self._revoked: dict[str, float] = {}
+        self._epochs: dict[str, tuple[RevocationEpoch, float]] = {}
+        self._subscribed_since: float | None = None
+        self._purged_at = time.monotonic()
+        self.hits = 0
+        self.fallbacks = 0
+
+    def __len__(self) -> int:
+        return len(self._revoked)
+
+    @property
+    def is_warm(self) -> bool:
+        return self._subscribed_since is not None and time.monotonic() - self._subscribed_since >= self._warmup
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.fallbacks
+        return self.hits / total if total else 0.0
+
+    def lookup(self, jti: str) -> bool | None:
+        """
+        Проверяет jti по локальному набору.
+        :param jti: Идентификатор токена.
+        :return: True — отозван, False — точно не отозван, None — ответ нужно получить из Redis.
+        """
+        expires_at = self._revoked.get(jti)
+        if expires_at is not None and expires_at > time.monotonic():
+            self._hit()
+            return True
+        if self.is_warm:
+            self._hit()
+            return False
+        self.fallbacks += 1
+        fallbacks_counter.add(1)
+        return None
+
+    def lookup_epoch(self, user_id: str) -> tuple[bool, RevocationEpoch | None]:
+        """
+        Проверяет эпоху отзыва пользователя по локальной копии.
+        :param user_id: Идентификатор пользователя.
+        :return: Пара (ответ получен локально, эпоха или None).
+        """
+        entry = self._epochs.get(user_id)
+        if entry is not None and entry[1] > time.monotonic():
+            return True, entry[0]
+        return self.is_warm, None
+
+    def add_epochs(self, epochs: dict[str, RevocationEpoch], ttl: float | None = None) -> None:
+        """
+        Запоминает эпохи отзыва пользователей.
+        :param epochs: Словарь {идентификатор пользователя: эпоха}.
+        :param ttl: Сколько секунд хранить эпоху (по умолчанию `default_ttl`).
+        """
+        expires_at = time.monotonic() + (ttl or self._default_ttl)
+        for user_id, epoch in epochs.items():
+            self._epochs[str(user_id)] = (epoch, expires_at)
+
+    def add(self, jtis: Iterable[str], ttl: float | None = None) -> None:
+        """
+        Запоминает отозванные jti.
+        :param jtis: Идентификаторы токенов.
+        :param ttl: Сколько секунд хранить отзыв (по умолчанию `default_ttl`).
+        """
+        expires_at = time.monotonic() + (ttl or self._default_ttl)
+        for jti in jtis:
+            self._revoked[str(jti)] = expires_at
+        self._purge_expired()
+
+    async def on_subscribed(self, redis: Redis) -> None:
+        self._subscribed_since = time.monotonic()
+
+    def on_revoked(self, jtis: list[str], ttl: float | None) -> None:
+        self.add(jtis, ttl)
+
+    def on_epochs(self, epochs: dict[str, RevocationEpoch], ttl: float | None) -> None:
+        self.add_epochs(epochs, ttl)
+
+    def on_gap(self) -> None:
+        self._subscribed_since = None
+
+    def _hit(self) -> None:
+        self.hits += 1
+        local_hits_counter.add(1)
+
+    def _purge_expired(self) -> None:
+        now = time.monotonic()
+        if now - self._purged_at < 1.0:
+            return
+        self._purged_at = now
+        self._revoked = {jti: expires_at for jti, expires_at in self._revoked.items() if expires_at > now}
+        self._epochs = {user_id: entry for user_id, entry in self._epochs.items() if entry[1] > now}
+
+
+class RevocationSubscriber:
+    """
+    Подписка на канал отзыва токенов, раздающая события локальным структурам процесса
+    (кешу отзывов, фильтру отзывов).
+
+    Каждый получатель реализует `on_subscribed(redis)` — подписка (пере)установлена,
+    `on_revoked(jtis, ttl)` — пришли отозванные jti, `on_epochs(epochs, ttl)` — пришли эпохи
+    отзыва пользователей и `on_gap()` — подписка прервана, сообщения могли быть потеряны.
+    """
+
+    def __init__(
+        self,
+        redis: Redis,
+        channel: str,
+        ping_interval: float,
+        sinks: list,
+        reconnect_delay: float = 1.0,
+        pubsub_redis: Redis | None = None,
+    ):
+        """
+        Инициализация подписки.
+        :param redis: Клиент Redis, передаваемый получателям (например, для пересборки фильтра).
+        :param channel: Имя канала.
+        :param ping_interval: Интервал проверки соединения в секундах.
+        :param sinks: Получатели событий.
+        :param reconnect_delay: Пауза перед повторной подпиской в секундах.
+        :param pubsub_redis: Клиент для подписки, если он отличается от `redis` (режим Cluster).
+        """
+        self._redis = redis
+        self._pubsub_redis = pubsub_redis or redis
+        self._channel = channel
+        self._ping_interval = ping_interval
+        self._sinks = sinks
+        self._reconnect_delay = reconnect_delay
+        self.max_staleness = 0.0
+
+    async def run(self) -> None:
+        """
+        Фоновая задача: держит подписку на канал и переподключается при ошибках.
+        Если на PING не пришёл ответ за `ping_interval`, подписка считается разорванной.
+        """
+        while True:
+            try:
+                async with self._pubsub_redis.pubsub() as pubsub:
+                    await pubsub.subscribe(self._channel)
+                    await self._listen(pubsub)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Подписка на канал отзыва токенов прервана, проверки идут в Redis")
+            finally:
+                for sink in self._sinks:
+                    sink.on_gap()
+            await asyncio.sleep(self._reconnect_delay)
+
+    async def _listen(self, pubsub) -> None:
+        awaiting_pong = False
+        while True:
+            message = await pubsub.get_message(timeout=self._ping_interval)
+            if message is None:
+                if awaiting_pong:
+                    raise ConnectionError("Redis не ответил на PING в подписке на канал отзыва")
+                await pubsub.ping()
+                awaiting_pong = True
+                continue
+            awaiting_pong = False
+            if message["type"] == "subscribe":
+                for sink in self._sinks:
+                    await sink.on_subscribed(self._redis)
+                logger.info("Подписка на канал отзыва токенов восстановлена")
+            elif message["type"] == "message":
+                self.apply_message(message["data"])
+
+    def apply_message(self, data: bytes | str) -> None:
+        """
+        Применяет сообщение канала отзыва:
+        `{"jtis": [...], "epochs": {user_id: [issued_before, keep_jti]}, "ttl": секунды, "ts": время публикации}`.
+        :param data: Тело сообщения.
+        """
+        try:
+            message = json.loads(data)
+            jtis = [str(jti) for jti in message.get("jtis", [])]
+            epochs = {
+                str(user_id): RevocationEpoch(issued_before=issued_before, keep_jti=keep_jti)
+                for user_id, (issued_before, keep_jti) in message.get("epochs", {}).items()
+            }
+            ttl = message.get("ttl")
+        except (ValueError, TypeError, AttributeError):
+            logger.error("Некорректное сообщение в канале отзыва токенов: %r", data)
+            return
+        for sink in self._sinks:
+            if jtis:
+                sink.on_revoked(jtis, ttl)
+            if epochs:
+                sink.on_epochs(epochs, ttl)
+        if (published_at := message.get("ts")) is not None:
+            staleness = max(0.0, time.time() - published_at)
+            self.max_staleness = max(self.max_staleness, staleness)
+            staleness_histogram.record(staleness * 1000)
+
+
+# Локальный кеш отзывов, создаётся при старте приложения (None — кеш отключён).
+revocation_cache: RevocationNearCache | None = None
+
+
+def get_revocation_cache() -> RevocationNearCache | None:
+    return revocation_cache
+
+
+def observe_warm(_: CallbackOptions) -> Iterable[Observation]:
+    if revocation_cache is not None:
+        yield Observation(int(revocation_cache.is_warm))
+
+
+meter.create_observable_gauge(
+    "revocation_cache.warm",
+    callbacks=[observe_warm],
+    description="1, если локальный кеш отзывов отвечает без Redis; 0 — холодный старт или разрыв подписки",
+)
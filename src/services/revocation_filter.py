@@ -0,0 +1,168 @@
+import logging
+import time
+from collections.abc import Iterable
+
+from opentelemetry.metrics import CallbackOptions, Observation
+from redis.asyncio import Redis
+
+from src.core.bloom import BloomFilter
+from src.core.metrics import meter
+from src.domain.entities import RevocationEpoch
+from src.infrastructure.repositories.blacklist import (
+    BLACKLIST_KEY_PREFIX,
+    LEGACY_BLACKLIST_KEY_PATTERN,
+    USER_EPOCH_KEY_PREFIX,
+    jti_from_blacklist_key,
+    user_epoch_key,
+)
+
+logger = logging.getLogger(__name__)
+
+negatives_counter = meter.create_counter(
+    "revocation_filter.negatives", description="Проверки отзыва, отсечённые фильтром без запроса в Redis"
+)
+positives_counter = meter.create_counter(
+    "revocation_filter.positives", description="Проверки отзыва, для которых фильтр ответил «возможно»"
+)
+false_positives_counter = meter.create_counter(
+    "revocation_filter.false_positives", description="Ответы «возможно», не подтверждённые Redis"
+)
+
+
+class RevocationFilter:
+    """
+    Фильтр Блума по ключам черного списка и эпох отзыва пользователей с ротацией поколений.
+
+    Из фильтра Блума нельзя удалять, поэтому истечение записей обрабатывается двумя поколениями:
+    новые jti добавляются в текущее, раз в `ttl` секунд предыдущее поколение отбрасывается,
+    а текущее становится предыдущим. Так каждый jti остаётся в фильтре не меньше `ttl`.
+
+    Фильтр заполняется сканированием Redis после каждой (пере)подписки на канал отзыва и дальше
+    пополняется из канала. Пока сканирование не завершено или подписка прервана, фильтр не
+    отвечает, и проверки идут в Redis.
+    """
+
+    def __init__(self, ttl: float, error_rate: float, capacity: int, memory_budget: int = 0, legacy_keys: bool = False):
+        """
+        Инициализация фильтра.
+        :param ttl: Время жизни записи черного списка в секундах (период ротации поколений).
+        :param error_rate: Допустимая доля ложноположительных ответов.
+        :param capacity: Ожидаемое число отозванных jti в одном поколении.
+        :param memory_budget: Объём памяти на оба поколения в байтах (0 — размер по capacity).
+        :param legacy_keys: Добавлять при сборке и ключи черного списка прежнего формата (текстовый jti).
+        """
+        self._ttl = ttl
+        # Ответ «возможно» даёт любое из двух поколений, поэтому каждому достаётся половина ошибки.
+        self._error_rate = error_rate / 2
+        self._capacity = capacity
+        self._memory_budget = memory_budget
+        self._legacy_keys = legacy_keys
+        self._current = self._new_generation()
+        self._previous = self._new_generation()
+        self._rotated_at = time.monotonic()
+        self.ready = False
+
+    @property
+    def memory_bytes(self) -> int:
+        return self._current.memory_bytes + self._previous.memory_bytes
+
+    @property
+    def count(self) -> int:
+        return self._current.count + self._previous.count
+
+    def add(self, jtis: Iterable[str]) -> None:
+        """
+        Добавляет отозванные jti.
+        :param jtis: Идентификаторы токенов.
+        """
+        self._rotate_if_needed()
+        for jti in jtis:
+            self._current.add(str(jti))
+
+    def might_contain(self, jti: str) -> bool | None:
+        """
+        Проверяет jti по фильтру.
+        :param jti: Идентификатор токена.
+        :return: False — точно не отозван, True — возможно отозван, None — фильтр не готов.
+        """
+        if not self.ready:
+            return None
+        self._rotate_if_needed()
+        if jti in self._current or jti in self._previous:
+            positives_counter.add(1)
+            return True
+        negatives_counter.add(1)
+        return False
+
+    async def rebuild(self, redis: Redis, batch_size: int = 1000) -> None:
+        """
+        Заполняет фильтр заново ключами черного списка из Redis.
+        :param redis: Клиент Redis.
+        :param batch_size: Подсказка COUNT для SCAN.
+        """
+        self.ready = False
+        self._current, self._previous = self._new_generation(), self._new_generation()
+        self._rotated_at = time.monotonic()
+        started = time.perf_counter()
+        async for key in redis.scan_iter(match=BLACKLIST_KEY_PREFIX + b"*", count=batch_size):
+            self._current.add(jti_from_blacklist_key(key))
+        async for key in redis.scan_iter(match=f"{USER_EPOCH_KEY_PREFIX}*", count=batch_size):
+            self._current.add(key.decode() if isinstance(key, bytes) else key)
+        if self._legacy_keys:
+            async for key in redis.scan_iter(match=LEGACY_BLACKLIST_KEY_PATTERN, count=batch_size):
+                self._current.add(key.decode() if isinstance(key, bytes) else key)
+        self.ready = True
+        logger.info(
+            "Фильтр отзыва собран: %s ключей, %s байт, %.2f с",
+            self._current.count,
+            self.memory_bytes,
+            time.perf_counter() - started,
+        )
+
+    @staticmethod
+    def record_false_positive() -> None:
+        false_positives_counter.add(1)
+
+    async def on_subscribed(self, redis: Redis) -> None:
+        await self.rebuild(redis)
+
+    def on_revoked(self, jtis: list[str], ttl: float | None) -> None:
+        self.add(jtis)
+
+    def on_epochs(self, epochs: dict[str, RevocationEpoch], ttl: float | None) -> None:
+        self.add(user_epoch_key(user_id) for user_id in epochs)
+
+    def on_gap(self) -> None:
+        self.ready = False
+
+    def _new_generation(self) -> BloomFilter:
+        if self._memory_budget:
+            return BloomFilter.with_memory_budget(self._memory_budget // 2, self._error_rate)
+        return BloomFilter(capacity=self._capacity, error_rate=self._error_rate)
+
+    def _rotate_if_needed(self) -> None:
+        now = time.monotonic()
+        if now - self._rotated_at < self._ttl:
+            return
+        # Если ротация пропущена больше чем на период, в предыдущем поколении уже нечего хранить.
+        self._previous = self._current if now - self._rotated_at < 2 * self._ttl else self._new_generation()
+        self._current = self._new_generation()
+        self._rotated_at = now
+
+
+# Фильтр отзыва, создаётся при старте приложения (None — фильтр отключён).
+revocation_filter: RevocationFilter | None = None
+
+
+def get_revocation_filter() -> RevocationFilter | None:
+    return revocation_filter
+
+
+def observe_memory(_: CallbackOptions) -> Iterable[Observation]:
+    if revocation_filter is not None:
+        yield Observation(revocation_filter.memory_bytes)
+
+
+meter.create_observable_gauge(
+    "revocation_filter.memory", unit="By", callbacks=[observe_memory], description="Память фильтра отзыва"
+)
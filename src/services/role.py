@@ -3,6 +3,7 @@ import logging
 from fastapi import Depends
 
 from src.api.v1.schemas.roles import AddOrDeleteRoleToUser, RoleCreateOrUpdate
+from src.core.permission_registry import PermissionRegistry, get_permission_registry
 from src.domain.entities import Role
 from src.domain.exceptions import RoleNotFound, UserNotFound
 from src.domain.repositories import AbstractPermissionRepository, AbstractRoleRepository, AbstractUserRepository
@@ -19,10 +20,12 @@ class RoleService:
         role_repository: AbstractRoleRepository,
         user_repository: AbstractUserRepository,
         permission_repository: AbstractPermissionRepository,
+        permission_registry: PermissionRegistry,
     ):
         self._role_repository: AbstractRoleRepository = role_repository
         self._user_repository: AbstractUserRepository = user_repository
         self._permission_repository: AbstractPermissionRepository = permission_repository
+        self._permission_registry: PermissionRegistry = permission_registry
 
     async def create_or_update(self, data: RoleCreateOrUpdate, slug: str | None = None) -> Role:
         """Создаёт новую роль или обновляет существующую, связывая с разрешениями"""
@@ -41,10 +44,13 @@ class RoleService:
             existing_role.title = data.title
             existing_role.description = data.description
             existing_role.permissions = permissions
-            return await self._role_repository.update_role(existing_role)
+            role = await self._role_repository.update_role(existing_role)
         else:
             logger.info(f"Создание новой роли: {data.slug}")
-            return await self._role_repository.create_role(data.slug, data.title, permissions, data.description)
+            role = await self._role_repository.create_role(data.slug, data.title, permissions, data.description)
+        if role is not None:
+            self._permission_registry.register_role(role)
+        return role
 
     async def delete(self, slug: str) -> bool:
         """Удаляет роль"""
@@ -106,8 +112,12 @@ def get_role_service(
     role_repository: AbstractRoleRepository = Depends(get_role_repository),
     user_repository: AbstractUserRepository = Depends(get_user_repository),
     permission_repository: AbstractPermissionRepository = Depends(get_permission_repository),
+    permission_registry: PermissionRegistry = Depends(get_permission_registry),
 ) -> RoleService:
     """Фабричная функция для получения экземпляра сервиса ролей"""
     return RoleService(
-        role_repository=role_repository, user_repository=user_repository, permission_repository=permission_repository
+        role_repository=role_repository,
+        user_repository=user_repository,
+        permission_repository=permission_repository,
+        permission_registry=permission_registry,
     )
@@ -0,0 +1,132 @@
+import asyncio
+import logging
+import time
+from collections.abc import Awaitable, Callable
+from datetime import datetime, timedelta
+
+from src.core.metrics import meter
+from src.domain.repositories import AbstractSessionCleanupRepository
+
+logger = logging.getLogger(__name__)
+
+deleted_counter = meter.create_counter("session_cleanup.deleted", description="Удалённые истекшие сессии")
+batches_counter = meter.create_counter("session_cleanup.batches", description="Выполненные пачки очистки сессий")
+passes_counter = meter.create_counter("session_cleanup.passes", description="Завершённые проходы очистки сессий")
+throttled_counter = meter.create_counter(
+    "session_cleanup.throttled_seconds",
+    unit="s",
+    description="Время паузы очистки по бюджету строк или отставанию реплик",
+)
+batch_duration = meter.create_histogram(
+    "session_cleanup.batch_duration", unit="s", description="Длительность одной пачки очистки сессий"
+)
+replication_lag_gauge = meter.create_gauge(
+    "session_cleanup.replication_lag", unit="s", description="Наибольшее отставание реплик перед пачкой"
+)
+cursor_lag_gauge = meter.create_gauge(
+    "session_cleanup.cursor_lag",
+    unit="s",
+    description="Сколько осталось пройти: от updated_at курсора до границы истечения",
+)
+
+
+class SessionCleanupService:
+    """
+    Удаление истекших сессий ограниченными пачками.
+
+    Сессия истекла, если не обновлялась дольше `retention` (активная — refresh-токен не ротировался,
+    закрытая — с момента закрытия). Проход идёт по возрастанию (updated_at, id) от сохранённого курсора,
+    поэтому после перезапуска продолжается с места остановки. Скорость ограничена бюджетом строк в секунду,
+    а при отставании реплик больше `max_replication_lag` очистка ждёт.
+    """
+
+    def __init__(
+        self,
+        repository: AbstractSessionCleanupRepository,
+        retention: timedelta,
+        batch_size: int,
+        rows_per_second: float,
+        max_replication_lag: float,
+        name: str = "default",
+        sleep: Callable[[float], Awaitable[None]] = asyncio.sleep,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Инициализатор класса.
+        :param repository: Репозиторий очистки.
+        :param retention: Через сколько после последнего обновления сессия считается истекшей.
+        :param batch_size: Наибольшее число строк, удаляемых одной транзакцией.
+        :param rows_per_second: Бюджет удаления, строк в секунду (0 — без ограничения).
+        :param max_replication_lag: Допустимое отставание реплик, с (0 — не проверять).
+        :param name: Имя курсора: у параллельных обработчиков должны быть разные имена.
+        :param sleep: Функция ожидания (подменяется в тестах).
+        :param clock: Монотонные часы (подменяются в тестах).
+        """
+        self._repository = repository
+        self._retention = retention
+        self._batch_size = batch_size
+        self._rows_per_second = rows_per_second
+        self._max_replication_lag = max_replication_lag
+        self._name = name
+        self._sleep = sleep
+        self._clock = clock
+
+    async def run_pass(self, now: datetime) -> int:
+        """
+        Удаляет пачками все сессии, истекшие к `now`, начиная с сохранённого курсора.
+        :param now: Текущее время (в часовом поясе столбца updated_at).
+        :return: Число удалённых за проход строк.
+        """
+        expired_before = now - self._retention
+        checkpoint = await self._repository.get_checkpoint(self._name)
+        if checkpoint is not None:
+            logger.info("Продолжаем очистку сессий с курсора %s", checkpoint)
+        total = 0
+        while True:
+            await self._wait_for_replicas()
+            started = self._clock()
+            batch = await self._repository.delete_expired_batch(
+                self._name, expired_before, checkpoint, self._batch_size
+            )
+            elapsed = self._clock() - started
+            batch_duration.record(elapsed)
+            batches_counter.add(1)
+            if batch.checkpoint is None:
+                passes_counter.add(1)
+                cursor_lag_gauge.set(0)
+                logger.info("Проход очистки сессий завершён, удалено %d", total)
+                return total
+            checkpoint = batch.checkpoint
+            total += batch.deleted
+            deleted_counter.add(batch.deleted)
+            cursor_lag_gauge.set(max((expired_before - checkpoint.updated_at).total_seconds(), 0))
+            await self._throttle(batch.deleted, elapsed)
+
+    async def run_forever(self, interval: float) -> None:
+        """
+        Повторяет проходы очистки каждые `interval` секунд.
+        :param interval: Пауза между проходами, с.
+        """
+        while True:
+            await self.run_pass(datetime.now())
+            await self._sleep(interval)
+
+    async def _throttle(self, deleted: int, elapsed: float) -> None:
+        if not self._rows_per_second:
+            return
+        pause = deleted / self._rows_per_second - elapsed
+        if pause > 0:
+            throttled_counter.add(pause, {"reason": "budget"})
+            await self._sleep(pause)
+
+    async def _wait_for_replicas(self) -> None:
+        if not self._max_replication_lag:
+            return
+        while (lag := await self._repository.get_replication_lag()) > self._max_replication_lag:
+            replication_lag_gauge.set(lag)
+            # Ждём, пока реплики догонят хотя бы до допустимого отставания
+            pause = lag - self._max_replication_lag
+            throttled_counter.add(pause, {"reason": "replication_lag"})
+            logger.info("Отставание реплик %.1f с, очистка сессий ждёт %.1f с", lag, pause)
+            await self._sleep(pause)
+        replication_lag_gauge.set(lag)
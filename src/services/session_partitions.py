@@ -0,0 +1,116 @@
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+
+from sqlalchemy.exc import DBAPIError
+
+from src.core.metrics import meter
+from src.domain.entities import SessionPartition
+from src.domain.repositories import AbstractSessionPartitionRepository
+
+logger = logging.getLogger(__name__)
+
+created_counter = meter.create_counter(
+    "session_partitions.created", description="Созданные месячные партиции таблицы sessions"
+)
+dropped_counter = meter.create_counter(
+    "session_partitions.dropped", description="Отсоединённые и удалённые месячные партиции таблицы sessions"
+)
+
+
+def month_start(moment: datetime) -> datetime:
+    return datetime(moment.year, moment.month, 1)
+
+
+def add_months(month: datetime, months: int) -> datetime:
+    index = month.year * 12 + month.month - 1 + months
+    return datetime(index // 12, index % 12 + 1, 1)
+
+
+@dataclass
+class PartitionMaintenanceReport:
+    created: list[str] = field(default_factory=list)
+    dropped: list[str] = field(default_factory=list)
+    kept: list[str] = field(default_factory=list)
+    failed: list[str] = field(default_factory=list)
+    # Строки, перенесённые из DEFAULT в созданную партицию месяца
+    moved: dict[str, int] = field(default_factory=dict)
+
+
+class SessionPartitionService:
+    """
+    Обслуживание месячных партиций `sessions`.
+
+    Заранее создаёт партиции на `months_ahead` месяцев вперёд, чтобы вставки не попадали в DEFAULT,
+    и удаляет партиции, все сессии которых истекли: вместо DELETE и VACUUM — DETACH и DROP целой таблицы.
+    Сессия живёт, пока её refresh-токен ротируется, поэтому партиция удаляется, только если в ней нет
+    активных сессий, обновлённых за последние `retention`.
+    """
+
+    def __init__(self, repository: AbstractSessionPartitionRepository, months_ahead: int, retention: timedelta):
+        """
+        Инициализатор класса.
+        :param repository: Репозиторий партиций.
+        :param months_ahead: На сколько месяцев вперёд держать готовые партиции.
+        :param retention: Время жизни refresh-токена: сессия, не обновлявшаяся дольше, истекла.
+        """
+        self._repository = repository
+        self._months_ahead = months_ahead
+        self._retention = retention
+
+    async def maintain(self, now: datetime) -> PartitionMaintenanceReport:
+        """
+        Создаёт недостающие будущие партиции и удаляет истекшие.
+        :param now: Текущее время (в часовом поясе столбца created_at).
+        :return: Отчёт о созданных, удалённых и оставленных партициях.
+        """
+        report = PartitionMaintenanceReport()
+        partitions = await self._repository.get_month_partitions()
+        existing = {(partition.parent, partition.starts_at) for partition in partitions}
+        current_month = month_start(now)
+        for parent in await self._repository.get_device_partitions():
+            for offset in range(self._months_ahead + 1):
+                starts_at = add_months(current_month, offset)
+                if (parent, starts_at) in existing:
+                    continue
+                await self._create(report, parent, starts_at)
+
+        expired_before = now - self._retention
+        for partition in partitions:
+            if partition.ends_at > expired_before:
+                continue
+            if await self._repository.has_live_sessions(partition, updated_after=expired_before):
+                report.kept.append(partition.name)
+                continue
+            if await self._drop(partition):
+                report.dropped.append(partition.name)
+        return report
+
+    async def _create(self, report: PartitionMaintenanceReport, parent: str, starts_at: datetime) -> None:
+        ends_at = add_months(starts_at, 1)
+        name = f"{parent}_{starts_at:%Y_%m}"
+        try:
+            # Строки месяца попадают в DEFAULT, если партицию не создали вовремя; репозиторий переносит их
+            moved = await self._repository.count_default_rows(parent, starts_at, ends_at)
+            partition = await self._repository.create_month_partition(parent, starts_at, ends_at)
+        except DBAPIError:
+            # Ошибка одной партиции не мешает создать остальные и удалить истекшие
+            logger.warning("Не удалось создать партицию %s, повторим при следующем запуске", name, exc_info=True)
+            report.failed.append(name)
+            return
+        created_counter.add(1)
+        report.created.append(partition.name)
+        if moved:
+            logger.warning("В партицию %s перенесено %d строк из DEFAULT", partition.name, moved)
+            report.moved[partition.name] = moved
+
+    async def _drop(self, partition: SessionPartition) -> bool:
+        try:
+            await self._repository.drop_month_partition(partition)
+        except DBAPIError:
+            # Обычно это lock_timeout из-за долгой транзакции; партиция будет удалена при следующем запуске
+            logger.warning("Не удалось отсоединить партицию %s, повторим при следующем запуске", partition.name)
+            return False
+        dropped_counter.add(1)
+        logger.info("Партиция %s отсоединена и удалена", partition.name)
+        return True
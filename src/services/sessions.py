@@ -1,11 +1,13 @@
+import base64
 import logging
+from datetime import datetime
 from uuid import UUID
 
 from fastapi import Depends
 from user_agents import parse
 
-from src.domain.entities import Session
-from src.domain.exceptions import SessionHasExpired
+from src.domain.entities import Session, SessionPage, SessionRotation
+from src.domain.exceptions import InvalidCursor, RefreshTokenReused, SessionHasExpired
 from src.domain.interfaces import AbstractSessionService
 from src.domain.repositories import AbstractSessionRepository
 from src.infrastructure.repositories.sessions import get_session_repository
@@ -13,6 +15,30 @@ from src.infrastructure.repositories.sessions import get_session_repository
 logger = logging.getLogger(__name__)
 
 
+def encode_session_cursor(created_at: datetime, session_id: UUID) -> str:
+    """
+    Упаковывает ключ (created_at, id) последней сессии страницы в непрозрачный курсор.
+    :param created_at: Время создания сессии.
+    :param session_id: ID сессии.
+    :return: Курсор в base64url без выравнивания.
+    """
+    raw = f"{created_at.isoformat()}|{session_id}".encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def decode_session_cursor(cursor: str) -> tuple[datetime, UUID]:
+    """
+    Разбирает курсор, выданный `encode_session_cursor`.
+    :param cursor: Курсор из `next_cursor`.
+    :return: Ключ (created_at, id).
+    """
+    try:
+        created_at, session_id = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode().split("|")
+        return datetime.fromisoformat(created_at), UUID(session_id)
+    except ValueError as error:
+        raise InvalidCursor from error
+
+
 class SessionService(AbstractSessionService):
     """Сервис для управления сессиями пользователей."""
 
@@ -34,14 +60,28 @@ class SessionService(AbstractSessionService):
         new_session = await self._session_repository.create(session)
         return new_session
 
-    async def deactivate_current_session(self, refresh_token: str) -> Session | None:
+    async def get_current_session(self, refresh_token: str, device_type: str | None = None) -> Session:
+        """
+        Находит сессию по её refresh-токену.
+        :param refresh_token: Refresh-токен пользователя
+        :param device_type: Тип устройства из claim `dvc` токена (партиция сессии)
+        :return: Сессия
+        :raises SessionHasExpired: Если сессия не активна или не найдена
+        """
+        current_session = await self._session_repository.get_by_refresh_token(refresh_token, device_type)
+        if current_session is None or not current_session.is_active:
+            raise SessionHasExpired
+        return current_session
+
+    async def deactivate_current_session(self, refresh_token: str, device_type: str | None = None) -> Session | None:
         """
         Деактивирует текущую сессию пользователя.
         :param refresh_token: Refresh-токен пользователя
+        :param device_type: Тип устройства из claim `dvc` токена (партиция сессии)
         :return: Обновлённая сессия (неактивная)
         :raises SessionHasExpired: Если сессия не найдена
         """
-        current_session = await self._session_repository.get_by_refresh_token(refresh_token)
+        current_session = await self._session_repository.get_by_refresh_token(refresh_token, device_type)
         if current_session is None:
             logger.error("Попытка деактивации несуществующей сессии (refresh_token=%s)", refresh_token)
             raise SessionHasExpired
@@ -49,57 +89,92 @@ class SessionService(AbstractSessionService):
         updated_session = await self._session_repository.update(current_session)
         return updated_session
 
-    async def deactivate_all_without_current(self, refresh_token: str) -> list[Session]:
+    async def deactivate_all_without_current(self, refresh_token: str, device_type: str | None = None) -> list[str]:
         """
-        Деактивирует все сессии пользователя, кроме текущей.
+        Деактивирует все сессии пользователя, кроме текущей, одним UPDATE в той же транзакции,
+        что и поиск текущей сессии.
         :param refresh_token: Refresh-токен текущей сессии
-        :return: Список деактивированных сессий
+        :param device_type: Тип устройства из claim `dvc` токена (партиция текущей сессии)
+        :return: JTI деактивированных сессий
         :raises SessionHasExpired: Если сессия не найдена
         """
-        current_session = await self._session_repository.get_by_refresh_token(refresh_token)
+        current_session = await self._session_repository.get_by_refresh_token(refresh_token, device_type)
         if current_session is None:
             logger.warning("Попытка деактивации всех сессий без существующей текущей (refresh_token=%s)", refresh_token)
             raise SessionHasExpired
-        user_sessions = await self._session_repository.get_sessions_by_user_id(current_session.user_id)
-        deactivate_sessions = []
-        for session in user_sessions:
-            if session.id != current_session.id:
-                session.is_active = False
-                await self._session_repository.update(session)
-                deactivate_sessions.append(session)
-        return deactivate_sessions
+        return await self._session_repository.deactivate_user_sessions(
+            current_session.user_id, keep_id=current_session.id
+        )
+
+    async def deactivate_user_sessions(self, user_id: UUID | str, keep_jti: str | None = None) -> list[str]:
+        """
+        Деактивирует все активные сессии пользователя одним запросом.
+        :param user_id: ID пользователя
+        :param keep_jti: JTI сессии, которая остаётся активной
+        :return: JTI деактивированных сессий
+        """
+        return await self._session_repository.deactivate_user_sessions(user_id, keep_jti=keep_jti)
 
     async def update_session_refresh_token(
-        self, old_refresh_token: str, new_refresh_token: str, new_jti: str
-    ) -> Session | None:
+        self,
+        old_refresh_token: str,
+        new_refresh_token: str,
+        new_jti: str,
+        device_type: str | None = None,
+        session_id: str | None = None,
+        created_at: datetime | None = None,
+    ) -> SessionRotation:
         """
-        Обновляет refresh-токен текущей сессии.
-        :param old_refresh_token: Старый refresh-токен
+        Заменяет refresh-токен сессии одним атомарным UPDATE и возвращает текущие роли пользователя.
+        :param old_refresh_token: Предъявленный refresh-токен
         :param new_refresh_token: Новый refresh-токен
         :param new_jti: Новый JTI
-        :return: Обновлённая сессия
+        :param device_type: Тип устройства из claim `dvc` старого токена (партиция сессии)
+        :param session_id: Идентификатор сессии из claim `sid` старого токена
+        :param created_at: Время создания сессии, если она уже загружена (месячная партиция)
+        :return: Результат ротации
+        :raises RefreshTokenReused: Если токен уже был заменён (сессия закрыта)
         :raises SessionHasExpired: Если сессия не активна или не найдена
         """
-        current_session = await self._session_repository.get_by_refresh_token(old_refresh_token)
-        if current_session is None:
-            logger.error("Попытка обновления несуществующей сессии (refresh_token=%s)", old_refresh_token)
+        rotation = await self._session_repository.rotate_refresh_token(
+            old_refresh_token,
+            new_refresh_token,
+            new_jti,
+            session_id=session_id,
+            device_type=device_type,
+            created_at=created_at,
+        )
+        if rotation.reused_jti is not None:
+            logger.warning("Повторное предъявление refresh-токена сессии %s, сессия закрыта", session_id)
+            raise RefreshTokenReused(rotation.reused_jti)
+        if rotation.session_id is None:
+            logger.warning("Ротация refresh-токена неактивной или несуществующей сессии (sid=%s)", session_id)
             raise SessionHasExpired
-        if not current_session.is_active:
-            logger.warning("Сессия с токеном %s истекла.", old_refresh_token)
-            raise SessionHasExpired
-        current_session.refresh_token = new_refresh_token
-        current_session.jti = new_jti
-        updated_session = await self._session_repository.update(session=current_session)
-        return updated_session
+        return rotation
 
-    async def get_current_user_sessions(self, user_id: UUID | str) -> list[Session]:
+    async def get_current_user_sessions(
+        self, user_id: UUID | str, limit: int, cursor: str | None = None, active: bool | None = None
+    ) -> SessionPage:
         """
-        Получает все сессии пользователя по user_id
+        Получает страницу сессий пользователя от новых к старым.
         :param user_id: ID пользователя
-        :return: Список сессий пользователя
+        :param limit: Размер страницы
+        :param cursor: Курсор из `next_cursor` предыдущей страницы
+        :param active: Фильтр по активности (None — все сессии)
+        :return: Страница сессий и курсор следующей страницы
         """
-        sessions = await self._session_repository.get_sessions_by_user_id(user_id=user_id)
-        return sessions
+        after = decode_session_cursor(cursor) if cursor is not None else None
+        # Лишняя строка показывает, есть ли следующая страница, без отдельного COUNT
+        sessions = [
+            session
+            async for session in self._session_repository.iter_user_sessions(
+                user_id=user_id, limit=limit + 1, after=after, active=active
+            )
+        ]
+        if len(sessions) <= limit:
+            return SessionPage(sessions=sessions, next_cursor=None)
+        last = sessions[limit - 1]
+        return SessionPage(sessions=sessions[:limit], next_cursor=encode_session_cursor(last.created_at, last.id))
 
     @staticmethod
     def get_user_device(user_agent: str) -> str:
@@ -0,0 +1,102 @@
+import hashlib
+import time
+from collections import OrderedDict
+from functools import lru_cache
+
+from src.core.config import settings
+from src.core.metrics import meter
+from src.domain.entities import Token
+
+cache_hits_counter = meter.create_counter("token_cache.hits", description="Попадания в кеш проверенных токенов")
+cache_misses_counter = meter.create_counter("token_cache.misses", description="Промахи кеша проверенных токенов")
+
+
+class TokenCache:
+    """
+    Ограниченный LRU/TTL кеш уже проверенных JWT.
+
+    Ключом служит SHA-256 от строки токена, поэтому в памяти не хранятся сами токены.
+    Запись живёт не дольше `ttl` и никогда не переживает `exp` токена; при отзыве jti
+    все записи с этим jti удаляются.
+    """
+
+    def __init__(self, max_size: int, ttl: float):
+        """
+        Инициализация кеша.
+        :param max_size: Максимальное число записей.
+        :param ttl: Максимальное время жизни записи в секундах.
+        """
+        self._max_size = max_size
+        self._ttl = ttl
+        self._entries: OrderedDict[bytes, tuple[Token, float]] = OrderedDict()
+        self._digests_by_jti: dict[str, set[bytes]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, jwt_token: str) -> Token | None:
+        """
+        Возвращает проверенные данные токена из кеша.
+        :param jwt_token: JWT токен в виде строки.
+        :return: Объект Token или None, если записи нет или она устарела.
+        """
+        digest = self._digest(jwt_token)
+        entry = self._entries.get(digest)
+        if entry is not None and entry[1] > time.time():
+            self._entries.move_to_end(digest)
+            self.hits += 1
+            cache_hits_counter.add(1)
+            return entry[0]
+        if entry is not None:
+            self._remove(digest)
+        self.misses += 1
+        cache_misses_counter.add(1)
+        return None
+
+    def put(self, jwt_token: str, token: Token) -> None:
+        """
+        Сохраняет проверенные данные токена.
+        :param jwt_token: JWT токен в виде строки.
+        :param token: Декодированный объект Token.
+        """
+        expires_at = min(float(token.exp), time.time() + self._ttl)
+        digest = self._digest(jwt_token)
+        if digest in self._entries:
+            self._remove(digest)
+        self._entries[digest] = (token, expires_at)
+        self._digests_by_jti.setdefault(str(token.jti), set()).add(digest)
+        while len(self._entries) > self._max_size:
+            self._remove(next(iter(self._entries)))
+
+    def invalidate_jti(self, jti: str) -> None:
+        """
+        Удаляет из кеша все токены с указанным jti (вызывается при отзыве).
+        :param jti: Идентификатор токена.
+        """
+        for digest in self._digests_by_jti.pop(str(jti), set()):
+            self._entries.pop(digest, None)
+
+    def _remove(self, digest: bytes) -> None:
+        token, _ = self._entries.pop(digest)
+        digests = self._digests_by_jti.get(str(token.jti))
+        if digests is not None:
+            digests.discard(digest)
+            if not digests:
+                del self._digests_by_jti[str(token.jti)]
+
+    @staticmethod
+    def _digest(jwt_token: str) -> bytes:
+        return hashlib.sha256(jwt_token.encode()).digest()
+
+
+@lru_cache
+def get_token_cache() -> TokenCache | None:
+    """
+    Возвращает общий для процесса кеш проверенных токенов или None, если кеш отключён.
+    :return: Экземпляр TokenCache или None.
+    """
+    if settings.service.token_cache_size <= 0:
+        return None
+    return TokenCache(max_size=settings.service.token_cache_size, ttl=settings.service.token_cache_ttl)
@@ -0,0 +1,167 @@
+import asyncio
+import logging
+import time
+from collections.abc import AsyncIterable, Iterable
+from dataclasses import dataclass, field
+from typing import Any
+
+from pydantic import EmailStr, TypeAdapter, ValidationError
+
+from src.domain.entities import NewUser
+from src.domain.interfaces import AbstractPasswordHasher
+from src.domain.repositories import AbstractRoleRepository, AbstractUserRepository
+from src.services.hashing import HashingPolicy
+
+logger = logging.getLogger(__name__)
+
+email_adapter = TypeAdapter(EmailStr)
+
+
+@dataclass
+class ImportRowError:
+    line: int
+    email: str | None
+    error: str
+
+
+@dataclass
+class ImportReport:
+    total: int = 0
+    imported: int = 0
+    errors: list[ImportRowError] = field(default_factory=list)
+    seconds: float = 0.0
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.total / self.seconds if self.seconds else 0.0
+
+
+class UserImportService:
+    """Сервис массового импорта пользователей из внешней системы."""
+
+    def __init__(
+        self,
+        user_repository: AbstractUserRepository,
+        role_repository: AbstractRoleRepository,
+        password_hasher: AbstractPasswordHasher,
+        policy: HashingPolicy,
+        batch_size: int = 1000,
+    ):
+        """
+        Инициализатор класса
+        :param user_repository: Репозиторий пользователей.
+        :param role_repository: Репозиторий ролей (для проверки slug ролей из файла).
+        :param password_hasher: Пул хеширования открытых паролей.
+        :param policy: Политика хеширования, по которой проверяется формат готовых хешей.
+        :param batch_size: Количество строк, записываемых в БД за одну операцию.
+        """
+        self._user_repository = user_repository
+        self._role_repository = role_repository
+        self._password_hasher = password_hasher
+        self._context = policy.create_context()
+        self._batch_size = batch_size
+
+    async def import_rows(self, rows: Iterable[tuple[int, dict[str, Any]]] | AsyncIterable) -> ImportReport:
+        """
+        Импортирует пользователей пачками.
+
+        Каждая строка содержит `email`, `password` (открытый пароль) или `password_hash`
+        (готовый хеш в формате, поддерживаемом текущей политикой) и необязательный список `roles`.
+        :param rows: Итератор пар (номер строки, данные строки).
+        :return: Отчёт об импорте с ошибками по строкам и пропускной способностью.
+        """
+        report = ImportReport()
+        known_roles = {role.slug for role in await self._role_repository.get_all_roles()}
+        started = time.perf_counter()
+
+        batch = []
+        async for line, row in self._iterate(rows):
+            report.total += 1
+            batch.append((line, row))
+            if len(batch) >= self._batch_size:
+                await self._import_batch(batch, known_roles, report)
+                batch = []
+        if batch:
+            await self._import_batch(batch, known_roles, report)
+
+        report.seconds = time.perf_counter() - started
+        logger.info(
+            "Импорт завершён: %s строк, %s создано, %s ошибок, %.1f строк/с",
+            report.total,
+            report.imported,
+            len(report.errors),
+            report.rows_per_second,
+        )
+        return report
+
+    async def _import_batch(
+        self, batch: list[tuple[int, dict[str, Any]]], known_roles: set[str], report: ImportReport
+    ) -> None:
+        """
+        Проверяет, хеширует и записывает одну пачку строк.
+        :param batch: Пачка пар (номер строки, данные строки).
+        :param known_roles: Множество существующих slug ролей.
+        :param report: Отчёт, в который добавляются ошибки и счётчики.
+        """
+        valid: dict[str, tuple[int, dict[str, Any]]] = {}
+        for line, row in batch:
+            error = self._validate(row, known_roles)
+            if error is None and row["email"] in valid:
+                error = "email повторяется в пачке"
+            if error is not None:
+                report.errors.append(ImportRowError(line=line, email=row.get("email"), error=error))
+                continue
+            valid[row["email"]] = (line, row)
+
+        hashes = await asyncio.gather(
+            *(self._get_password_hash(row) for _, row in valid.values()),
+            return_exceptions=True,
+        )
+        users = []
+        for (line, row), password_hash in zip(valid.values(), hashes):
+            if isinstance(password_hash, Exception):
+                report.errors.append(ImportRowError(line=line, email=row["email"], error="ошибка хеширования пароля"))
+                continue
+            users.append(NewUser(email=row["email"], password=password_hash, roles=list(row.get("roles") or [])))
+
+        if not users:
+            return
+        created = set(await self._user_repository.bulk_create(users))
+        report.imported += len(created)
+        for user in users:
+            if user.email not in created:
+                line, _ = valid[user.email]
+                report.errors.append(ImportRowError(line=line, email=user.email, error="пользователь уже существует"))
+
+    def _validate(self, row: dict[str, Any], known_roles: set[str]) -> str | None:
+        """
+        Проверяет строку импорта.
+        :param row: Данные строки.
+        :param known_roles: Множество существующих slug ролей.
+        :return: Текст ошибки или None, если строка корректна.
+        """
+        try:
+            email_adapter.validate_python(row.get("email"))
+        except ValidationError:
+            return "некорректный email"
+        if not row.get("password") and not row.get("password_hash"):
+            return "не указан password или password_hash"
+        if row.get("password_hash") and self._context.identify(row["password_hash"], required=False) is None:
+            return "неподдерживаемый формат password_hash"
+        if unknown_roles := set(row.get("roles") or []) - known_roles:
+            return f"неизвестные роли: {', '.join(sorted(unknown_roles))}"
+        return None
+
+    async def _get_password_hash(self, row: dict[str, Any]) -> str:
+        if row.get("password_hash"):
+            return row["password_hash"]
+        return await self._password_hasher.hash(row["password"])
+
+    @staticmethod
+    async def _iterate(rows):
+        if isinstance(rows, AsyncIterable):
+            async for item in rows:
+                yield item
+        else:
+            for item in rows:
+                yield item
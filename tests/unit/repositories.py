@@ -1,10 +1,29 @@
+from collections.abc import AsyncIterator
 from datetime import datetime, timedelta
 from typing import Any
 from uuid import UUID, uuid4
 
-from src.domain.entities import Session, User
+from sqlalchemy.exc import DBAPIError
+
+from src.domain.entities import (
+    NewUser,
+    RevocationEpoch,
+    Session,
+    SessionCleanupBatch,
+    SessionCleanupCheckpoint,
+    SessionPartition,
+    SessionRotation,
+    User,
+)
 from src.domain.exceptions import UserIsExists
-from src.domain.repositories import AbstractBlacklistRepository, AbstractSessionRepository, AbstractUserRepository
+from src.domain.factories.session import refresh_token_digest
+from src.domain.repositories import (
+    AbstractBlacklistRepository,
+    AbstractSessionCleanupRepository,
+    AbstractSessionPartitionRepository,
+    AbstractSessionRepository,
+    AbstractUserRepository,
+)
 
 
 class FakeUserRepository(AbstractUserRepository):
@@ -26,19 +45,40 @@ class FakeUserRepository(AbstractUserRepository):
     async def get_by_id(self, user_id) -> User | None:
         return next((user for user in self._users.values() if user.id == user_id), None)
 
+    async def exists_by_email(self, email: str) -> bool:
+        return email in self._users
+
+    async def iter_emails(self, batch_size: int = 10_000):
+        for email in list(self._users):
+            yield email
+
     async def update(self, user: User) -> User:
         self._users[user.email] = user
         return user
 
+    async def bulk_create(self, users: list[NewUser]) -> list[str]:
+        created = []
+        for new_user in users:
+            if new_user.email in self._users:
+                continue
+            self._users[new_user.email] = User(
+                id=uuid4(), email=new_user.email, password=new_user.password, is_active=False
+            )
+            created.append(new_user.email)
+        return created
+
 
 class FakeSessionRepository(AbstractSessionRepository):
     """Фейковый репозиторий для сессий"""
 
     def __init__(self):
         self._sessions: dict[str, Session] = {}
+        # Ротация (новый токен, новый JTI), зафиксированная другой транзакцией после снимка следующей ротации
+        self.concurrent_rotation: tuple[str, UUID] | None = None
 
     async def create(self, session: Session) -> Session:
         session.id = session.id or uuid4()
+        session.created_at = session.created_at or datetime.now()
         self._sessions[session.id] = session
         return session
 
@@ -49,22 +89,172 @@ class FakeSessionRepository(AbstractSessionRepository):
         self._sessions[session.id] = session
         return session
 
-    async def get_by_refresh_token(self, refresh_token: str) -> Session | None:
+    async def get_by_refresh_token(self, refresh_token: str, device_type: str | None = None) -> Session | None:
         return next(
-            (session for session in self._sessions.values() if session.refresh_token == refresh_token),
+            (
+                session
+                for session in self._sessions.values()
+                if session.refresh_token_digest == refresh_token_digest(refresh_token)
+                and device_type in (None, session.device_type)
+            ),
             None,
         )
 
-    async def get_sessions_by_user_id(self, user_id: str | UUID) -> list[Session]:
-        user_sessions = [session for session in self._sessions.values() if session.user_id == user_id]
-        return user_sessions
+    async def rotate_refresh_token(
+        self,
+        old_refresh_token: str,
+        new_refresh_token: str,
+        new_jti: str | UUID,
+        session_id: str | UUID | None = None,
+        device_type: str | None = None,
+        created_at: datetime | None = None,
+    ) -> SessionRotation:
+        old_digest = refresh_token_digest(old_refresh_token)
+        for session in self._sessions.values():
+            if session_id is not None and str(session.id) != str(session_id):
+                continue
+            if device_type is not None and session.device_type != device_type or not session.is_active:
+                continue
+            if created_at is not None and session.created_at != created_at:
+                continue
+            if session.refresh_token_digest == old_digest and self.concurrent_rotation is not None:
+                # `rotated` перепроверяет строку и видит чужой дайджест, `reused` видит в снимке старый
+                session.refresh_token_digest = refresh_token_digest(self.concurrent_rotation[0])
+                session.jti = self.concurrent_rotation[1]
+                self.concurrent_rotation = None
+                return SessionRotation()
+            if session.refresh_token_digest == old_digest:
+                session.refresh_token_digest = refresh_token_digest(new_refresh_token)
+                session.jti = new_jti
+                return SessionRotation(session_id=session.id, device_type=session.device_type, user_id=session.user_id)
+            if session_id is not None:
+                session.is_active = False
+                return SessionRotation(reused_jti=str(session.jti))
+        return SessionRotation()
+
+    async def deactivate_user_sessions(
+        self,
+        user_id: str | UUID,
+        keep_id: str | UUID | None = None,
+        keep_jti: str | UUID | None = None,
+    ) -> list[str]:
+        deactivated = []
+        for session in self._sessions.values():
+            if session.user_id != user_id or not session.is_active:
+                continue
+            if session.id == keep_id or str(session.jti) == str(keep_jti):
+                continue
+            session.is_active = False
+            deactivated.append(str(session.jti))
+        return deactivated
+
+    async def iter_user_sessions(
+        self,
+        user_id: str | UUID,
+        limit: int,
+        after: tuple[datetime, UUID] | None = None,
+        active: bool | None = None,
+    ) -> AsyncIterator[Session]:
+        user_sessions = sorted(
+            (
+                session
+                for session in self._sessions.values()
+                if session.user_id == user_id
+                and (active is None or session.is_active == active)
+                and (after is None or (session.created_at, session.id) < after)
+            ),
+            key=lambda session: (session.created_at, session.id),
+            reverse=True,
+        )
+        for session in user_sessions[:limit]:
+            yield session
+
+
+class FakeSessionPartitionRepository(AbstractSessionPartitionRepository):
+    def __init__(self, device_partitions: list[str]):
+        self._device_partitions = device_partitions
+        self.partitions: dict[str, SessionPartition] = {}
+        # Время последнего обновления активных сессий по партициям
+        self.live_sessions: dict[str, list[datetime]] = {}
+        self.locked: set[str] = set()
+        # created_at строк, попавших в DEFAULT-партицию, по типам устройств
+        self.default_rows: dict[str, list[datetime]] = {}
+
+    async def get_device_partitions(self) -> list[str]:
+        return list(self._device_partitions)
+
+    async def get_month_partitions(self) -> list[SessionPartition]:
+        return sorted(self.partitions.values(), key=lambda partition: (partition.parent, partition.starts_at))
+
+    async def create_month_partition(self, parent: str, starts_at: datetime, ends_at: datetime) -> SessionPartition:
+        partition = SessionPartition(
+            name=f"{parent}_{starts_at:%Y_%m}", parent=parent, starts_at=starts_at, ends_at=ends_at
+        )
+        if partition.name in self.locked:
+            raise DBAPIError("CREATE TABLE", None, Exception("canceling statement due to lock timeout"))
+        self.default_rows[parent] = [
+            created_at for created_at in self.default_rows.get(parent, []) if not starts_at <= created_at < ends_at
+        ]
+        self.partitions[partition.name] = partition
+        return partition
+
+    async def count_default_rows(self, parent: str, starts_at: datetime, ends_at: datetime) -> int:
+        return sum(starts_at <= created_at < ends_at for created_at in self.default_rows.get(parent, []))
+
+    async def has_live_sessions(self, partition: SessionPartition, updated_after: datetime) -> bool:
+        return any(updated_at > updated_after for updated_at in self.live_sessions.get(partition.name, []))
+
+    async def drop_month_partition(self, partition: SessionPartition) -> None:
+        if partition.name in self.locked:
+            raise DBAPIError("DETACH PARTITION", None, Exception("canceling statement due to lock timeout"))
+        del self.partitions[partition.name]
+
+
+class FakeSessionCleanupRepository(AbstractSessionCleanupRepository):
+    def __init__(self, sessions: dict[UUID, datetime]):
+        # id сессии -> updated_at
+        self.sessions = sessions
+        self.checkpoints: dict[str, SessionCleanupCheckpoint] = {}
+        self.locked: set[UUID] = set()
+        self.replication_lags: list[float] = []
+        # Сбой после указанного числа удачных пачек (имитация падения процесса)
+        self.fail_after_batches: int | None = None
+
+    async def get_checkpoint(self, name: str) -> SessionCleanupCheckpoint | None:
+        return self.checkpoints.get(name)
+
+    async def delete_expired_batch(
+        self, name: str, expired_before: datetime, after: SessionCleanupCheckpoint | None, limit: int
+    ) -> SessionCleanupBatch:
+        if self.fail_after_batches is not None:
+            if self.fail_after_batches == 0:
+                raise ConnectionError("connection lost")
+            self.fail_after_batches -= 1
+        keys = sorted(
+            (updated_at, session_id)
+            for session_id, updated_at in self.sessions.items()
+            if updated_at < expired_before
+            and session_id not in self.locked
+            and (after is None or (updated_at, session_id) > (after.updated_at, after.session_id))
+        )[:limit]
+        for _, session_id in keys:
+            del self.sessions[session_id]
+        if not keys:
+            self.checkpoints.pop(name, None)
+            return SessionCleanupBatch(deleted=0, checkpoint=None)
+        checkpoint = SessionCleanupCheckpoint(*keys[-1])
+        self.checkpoints[name] = checkpoint
+        return SessionCleanupBatch(deleted=len(keys), checkpoint=checkpoint)
+
+    async def get_replication_lag(self) -> float:
+        return self.replication_lags.pop(0) if self.replication_lags else 0.0
 
 
 class FakeBlacklistRepository(AbstractBlacklistRepository):
     def __init__(self):
         self._storage: dict[str, dict[str, Any]] = {}
 
-    async def get_value(self, key: str) -> str | None:
+    async def get_value(self, key: str) -> Any | None:
         if (value := self._storage.get(key)) is not None:
             if (expire_at := value.get("expire_at")) and datetime.now() > expire_at:
                 del self._storage[key]
@@ -72,11 +262,26 @@ class FakeBlacklistRepository(AbstractBlacklistRepository):
             return value["value"]
         return None
 
-    async def set_value(self, key: str, value: str, exp: timedelta | None = None):
-        expires_at = datetime.now() + exp if exp else None
-        self._storage[key] = {"value": value, "expire_at": expires_at}
+    async def are_revoked(self, jtis: list[str]) -> list[bool]:
+        return [await self.get_value(jti) is not None for jti in jtis]
+
+    async def get_user_epochs(self, user_ids: list[str]) -> list[RevocationEpoch | None]:
+        return [await self.get_value(f"epoch:{user_id}") for user_id in user_ids]
+
+    async def set_value(self, key: str, exp: timedelta | int | None = None):
+        await self.set_many_values({key: exp})
+
+    async def set_many_values(self, values: dict[str, timedelta | int | None]):
+        for key, exp in values.items():
+            self._put(key, b"", exp)
+
+    async def get_revocation_state(self, jti: str, user_id: str) -> tuple[bool, RevocationEpoch | None]:
+        return await self.get_value(jti) is not None, await self.get_value(f"epoch:{user_id}")
+
+    async def set_user_epoch(self, user_id: str, epoch: RevocationEpoch, ttl: int) -> None:
+        self._put(f"epoch:{user_id}", epoch, ttl)
 
-    async def set_many_values(self, values: dict[str, str], exp: timedelta):
-        expires_at = datetime.now() + exp if exp else None
-        for key, value in values.items():
-            self._storage[key] = {"value": value, "expire_at": expires_at}
+    def _put(self, key: str, value: Any, exp: timedelta | int | None) -> None:
+        if isinstance(exp, int):
+            exp = timedelta(seconds=exp)
+        self._storage[key] = {"value": value, "expire_at": datetime.now() + exp if exp else None}
@@ -1,19 +1,53 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
 import pytest
 
+from src.core.bloom import BloomFilter
 from src.domain.entities import User
-from src.domain.exceptions import UserIsExists, WrongEmailOrPassword, WrongOldPassword
+from src.domain.exceptions import PasswordHasherIsBusy, UserIsExists, WrongEmailOrPassword, WrongOldPassword
+from src.domain.interfaces import AbstractPasswordHasher
 from src.services.auth import AuthService
+from src.services.hashing import HashingPolicy, ProcessPoolPasswordHasher
 from tests.unit.repositories import FakeUserRepository
 
 
+class CountingPasswordHasher(AbstractPasswordHasher):
+    """Обёртка над хешером, считающая вызовы хеширования"""
+
+    def __init__(self, hasher: AbstractPasswordHasher):
+        self._hasher = hasher
+        self.hash_calls = 0
+
+    async def hash(self, password: str) -> str:
+        self.hash_calls += 1
+        return await self._hasher.hash(password)
+
+    async def verify(self, password: str, hashed_password: str) -> bool:
+        return await self._hasher.verify(password, hashed_password)
+
+    async def verify_and_update(self, password: str, hashed_password: str) -> tuple[bool, str | None]:
+        return await self._hasher.verify_and_update(password, hashed_password)
+
+
 @pytest.fixture
 def fake_user_repository() -> FakeUserRepository:
     return FakeUserRepository()
 
 
+@pytest.fixture(scope="module")
+def password_hasher() -> ProcessPoolPasswordHasher:
+    hasher = ProcessPoolPasswordHasher(
+        max_workers=1, max_in_flight=4, max_queue_size=8, timeout=10, policy=HashingPolicy(bcrypt_rounds=4)
+    )
+    yield hasher
+    hasher.shutdown()
+
+
 @pytest.fixture
-def auth_service(fake_user_repository) -> AuthService:
-    return AuthService(user_repository=fake_user_repository)
+def auth_service(fake_user_repository, password_hasher) -> AuthService:
+    return AuthService(user_repository=fake_user_repository, password_hasher=password_hasher)
 
 
 @pytest.fixture
@@ -82,7 +116,7 @@ async def test_change_password(auth_service):
         user_id=user.id, old_password=old_password, new_password=new_password
     )
 
-    assert auth_service._verify_password(new_password, updated_user.password)
+    assert await auth_service._verify_password(new_password, updated_user.password)
 
 
 @pytest.mark.asyncio
@@ -96,3 +130,81 @@ async def test_change_password_with_invalid_old_password(auth_service):
 
     with pytest.raises(WrongOldPassword):
         await auth_service.change_password(user_id=user.id, old_password=wrong_old_password, new_password=new_password)
+
+
+@pytest.mark.asyncio
+async def test_registration_when_hasher_is_busy(fake_user_repository):
+    hasher = ProcessPoolPasswordHasher(max_workers=1, max_in_flight=1, max_queue_size=0, timeout=10)
+    auth_service = AuthService(user_repository=fake_user_repository, password_hasher=hasher)
+    try:
+        results = await asyncio.gather(
+            auth_service.registration_new_user(email="first@example.com", password="password"),
+            auth_service.registration_new_user(email="second@example.com", password="password"),
+            return_exceptions=True,
+        )
+        assert isinstance(results[0], User)
+        assert isinstance(results[1], PasswordHasherIsBusy)
+    finally:
+        hasher.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_timed_out_hash_keeps_its_slot_until_it_finishes():
+    hasher = ProcessPoolPasswordHasher(max_workers=1, max_in_flight=1, max_queue_size=1, timeout=0.05)
+    hasher.shutdown()
+    release = threading.Event()
+    started = []
+
+    def slow_hash(password: str) -> str:
+        started.append(password)
+        release.wait(5)
+        return password
+
+    hasher._executor = ThreadPoolExecutor(max_workers=2)
+    try:
+        with pytest.raises(PasswordHasherIsBusy):
+            await hasher._submit(slow_hash, "first")
+        # Первая операция ещё выполняется в пуле: вторая не должна попасть в пул сверх max_in_flight
+        with pytest.raises(PasswordHasherIsBusy):
+            await hasher._submit(slow_hash, "second")
+        assert started == ["first"]
+    finally:
+        release.set()
+        hasher._executor.shutdown(wait=True)
+
+
+@pytest.mark.asyncio
+async def test_login_rehashes_password_with_outdated_policy(auth_service, fake_user_repository):
+    email = "test@example.com"
+    password = "password"
+    user = await auth_service.registration_new_user(email=email, password=password)
+    old_hash = user.password
+
+    hasher = ProcessPoolPasswordHasher(
+        max_workers=1, max_in_flight=1, max_queue_size=1, timeout=10, policy=HashingPolicy(bcrypt_rounds=5)
+    )
+    try:
+        new_auth_service = AuthService(user_repository=fake_user_repository, password_hasher=hasher)
+        logged_user = await new_auth_service.login_user(email=email, password=password)
+    finally:
+        hasher.shutdown()
+
+    stored_user = await fake_user_repository.get_by_email(email)
+    assert stored_user.password != old_hash
+    assert stored_user.password.startswith("$2b$05$")
+    assert logged_user.password == stored_user.password
+
+
+@pytest.mark.asyncio
+async def test_duplicate_registration_skips_hashing(fake_user_repository, password_hasher):
+    counting_hasher = CountingPasswordHasher(password_hasher)
+    auth_service = AuthService(
+        user_repository=fake_user_repository,
+        password_hasher=counting_hasher,
+        email_filter=BloomFilter(capacity=100, error_rate=0.01),
+    )
+    await auth_service.registration_new_user(email="test@example.com", password="password")
+
+    with pytest.raises(UserIsExists):
+        await auth_service.registration_new_user(email="test@example.com", password="password")
+    assert counting_hasher.hash_calls == 1
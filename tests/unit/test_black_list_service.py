@@ -1,9 +1,14 @@
 import asyncio
-from datetime import timedelta
+import time
+import uuid
 
 import pytest
+from redis.crc import key_slot
 
 from services.blacklist import BlacklistService
+from src.domain.entities import RevocationEpoch, Token
+from src.infrastructure.repositories.blacklist import RedisBlacklistRepository, blacklist_key, jti_from_blacklist_key
+from src.services.revocation_cache import RevocationNearCache
 from tests.unit.repositories import FakeBlacklistRepository
 
 
@@ -18,25 +23,154 @@ def black_list_service(fake_repository):
 
 
 @pytest.mark.asyncio
-async def test_blacklist_set_one(black_list_service):
+async def test_blacklist_revoke(black_list_service):
     key = "token:jti_123"
     assert not await black_list_service.is_exists(key)
-    await black_list_service.set_one_value(key, "blacklisted")
+    await black_list_service.revoke({key: int(time.time()) + 60})
     assert await black_list_service.is_exists(key)
 
 
 @pytest.mark.asyncio
-async def test_blacklist_set_many(black_list_service):
-    tokens = {
-        "token:jti_456": "blacklisted",
-        "token:jti_789": "blacklisted",
-    }
-    await black_list_service.set_many_values(tokens, exp=timedelta(seconds=1))
+async def test_blacklist_ttl_follows_token_expiry(black_list_service, fake_repository):
+    now = int(time.time())
+    await black_list_service.revoke({"token:jti_456": now + 1, "token:jti_789": now + 120, "token:expired": now - 1})
 
     assert await black_list_service.is_exists("token:jti_456")
     assert await black_list_service.is_exists("token:jti_789")
+    assert not await black_list_service.is_exists("token:expired")
 
     await asyncio.sleep(1.1)
 
     assert not await black_list_service.is_exists("token:jti_456")
-    assert not await black_list_service.is_exists("token:jti_789")
+    assert await black_list_service.is_exists("token:jti_789")
+
+
+def test_blacklist_key_encoding():
+    jti = str(uuid.uuid4())
+
+    assert blacklist_key(jti) == b"bl:" + uuid.UUID(jti).bytes
+    assert jti_from_blacklist_key(blacklist_key(jti)) == jti
+    assert jti_from_blacklist_key(blacklist_key("token:jti_123")) == "token:jti_123"
+
+
+def make_token(user_uuid: str, jti: str, iat: float) -> Token:
+    return Token(user_uuid=user_uuid, iat=str(int(iat)), exp=str(int(iat) + 900), jti=jti)
+
+
+@pytest.mark.asyncio
+async def test_revoke_user_tokens_keeps_current_session(black_list_service):
+    issued = time.time() - 60
+    current = make_token("user-1", "current", issued)
+    other = make_token("user-1", "other", issued)
+    stranger = make_token("user-2", "stranger", issued)
+
+    await black_list_service.revoke_user_tokens("user-1", keep_jti="current")
+
+    assert await black_list_service.is_token_revoked(other)
+    assert not await black_list_service.is_token_revoked(current)
+    assert not await black_list_service.is_token_revoked(stranger)
+    assert not await black_list_service.is_token_revoked(make_token("user-1", "new", time.time() + 2))
+
+
+@pytest.mark.asyncio
+async def test_epoch_is_applied_to_warm_near_cache(fake_repository):
+    revocation_cache = RevocationNearCache(warmup=0, default_ttl=60)
+    await revocation_cache.on_subscribed(None)
+    service = BlacklistService(fake_repository, revocation_cache=revocation_cache)
+
+    await service.revoke_user_tokens("user-1")
+    fake_repository.get_revocation_state = None
+
+    assert await service.is_token_revoked(make_token("user-1", "old", time.time() - 60))
+    assert not await service.is_token_revoked(make_token("user-2", "old", time.time() - 60))
+
+
+@pytest.mark.asyncio
+async def test_epoch_is_read_together_with_jti(black_list_service, fake_repository):
+    await fake_repository.set_user_epoch("user-1", RevocationEpoch(issued_before=int(time.time())), ttl=60)
+
+    assert await black_list_service.is_token_revoked(make_token("user-1", "old", time.time() - 60))
+    assert not await black_list_service.is_token_revoked(make_token("user-1", "new", time.time() + 1))
+
+
+@pytest.mark.asyncio
+async def test_are_tokens_revoked(black_list_service, fake_repository):
+    issued = time.time() - 60
+    tokens = [make_token("user-1", "a", issued), make_token("user-1", "b", issued), make_token("user-2", "c", issued)]
+    await black_list_service.revoke({"a": int(time.time()) + 60})
+    await fake_repository.set_user_epoch("user-2", RevocationEpoch(issued_before=int(time.time())), ttl=60)
+
+    assert await black_list_service.are_tokens_revoked(tokens) == [True, False, True]
+    assert await black_list_service.are_revoked(["a", "b"]) == {"a": True, "b": False}
+
+
+class FakePipeline:
+    def __init__(self, storage: dict[bytes, bytes]):
+        self._storage = storage
+        self.commands = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        return None
+
+    async def mget(self, keys: list[bytes]):
+        self.commands.append(keys)
+
+    async def execute(self):
+        return [[self._storage.get(key) for key in keys] for keys in self.commands]
+
+
+class FakeRedis:
+    def __init__(self):
+        self.storage: dict[bytes, bytes] = {}
+        self.pipe = FakePipeline(self.storage)
+
+    def pipeline(self, transaction: bool = True):
+        return self.pipe
+
+    async def mget(self, keys: list[bytes | str]):
+        self.pipe.commands.append(keys)
+        return [self.storage.get(key.encode() if isinstance(key, str) else key) for key in keys]
+
+
+@pytest.mark.asyncio
+async def test_redis_repository_chunks_mget():
+    redis = FakeRedis()
+    jtis = [str(uuid.uuid4()) for _ in range(5)]
+    redis.storage[blacklist_key(jtis[3])] = b""
+    repository = RedisBlacklistRepository(redis=redis, chunk_size=2)
+
+    assert await repository.are_revoked(jtis) == [False, False, False, True, False]
+    assert [len(keys) for keys in redis.pipe.commands] == [2, 2, 1]
+
+
+@pytest.mark.asyncio
+async def test_redis_repository_groups_mget_by_slot():
+    redis = FakeRedis()
+    jtis = [str(uuid.uuid4()) for _ in range(6)]
+    redis.storage[blacklist_key(jtis[4])] = b""
+    repository = RedisBlacklistRepository(redis=redis, chunk_size=100, group_by_slot=True)
+
+    assert await repository.are_revoked(jtis) == [False, False, False, False, True, False]
+    for keys in redis.pipe.commands:
+        assert len({key_slot(key) for key in keys}) == 1
+
+
+@pytest.mark.asyncio
+async def test_redis_repository_reads_legacy_keys():
+    redis = FakeRedis()
+    legacy, current, clean = (str(uuid.uuid4()) for _ in range(3))
+    redis.storage[legacy.encode()] = b"user-1"
+    redis.storage[blacklist_key(current)] = b""
+    repository = RedisBlacklistRepository(redis=redis, legacy_keys=True)
+
+    assert await repository.are_revoked([legacy, current, clean]) == [True, True, False]
+    assert await repository.get_value(legacy) == b"user-1"
+    assert await repository.get_revocation_state(legacy, "user-1") == (True, None)
+    # Одна команда на проверку: ключи прежнего формата читаются тем же MGET
+    assert len(redis.pipe.commands) == 3
+
+    repository = RedisBlacklistRepository(redis=redis)
+    assert await repository.are_revoked([legacy, current]) == [False, True]
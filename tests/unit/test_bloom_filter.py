@@ -0,0 +1,24 @@
+from src.core.bloom import BloomFilter
+
+
+def test_added_items_are_always_found():
+    bloom_filter = BloomFilter(capacity=1_000, error_rate=0.01)
+    items = [f"user-{i}@example.com" for i in range(1_000)]
+    for item in items:
+        bloom_filter.add(item)
+
+    assert all(item in bloom_filter for item in items)
+
+
+def test_false_positive_rate_is_bounded():
+    bloom_filter = BloomFilter(capacity=10_000, error_rate=0.01)
+    for i in range(10_000):
+        bloom_filter.add(f"user-{i}@example.com")
+
+    false_positives = sum(f"other-{i}@example.com" in bloom_filter for i in range(10_000))
+    assert false_positives / 10_000 < 0.02
+
+
+def test_memory_budget():
+    bloom_filter = BloomFilter.with_memory_budget(memory_bytes=1024, error_rate=0.01)
+    assert bloom_filter.memory_bytes <= 1024
@@ -1,11 +1,16 @@
 import asyncio
+import uuid
 from datetime import timedelta
 
 import jwt
 import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ed25519, rsa
 
 from src.domain.entities import User
+from src.domain.exceptions import SessionHasExpired
 from src.services.jwt import JWTService
+from src.services.jwt_keys import KeySet
 
 
 @pytest.fixture
@@ -68,9 +73,138 @@ def test_invalid_token(jwt_service):
 
 
 def test_access_and_refresh_tokens_have_same_jti(jwt_service, user):
-    access_token = jwt_service.generate_access_token(user=user)
-    refresh_token = jwt_service.generate_refresh_token(user=user)
-    access_token_obj = jwt_service.decode_token(access_token)
-    refresh_token_obj = jwt_service.decode_token(refresh_token)
+    token_pair = jwt_service.mint_token_pair(user=user)
+    access_token_obj = jwt_service.decode_token(token_pair.access_token)
+    refresh_token_obj = jwt_service.decode_token(token_pair.refresh_token)
+
+    assert access_token_obj.jti == refresh_token_obj.jti == token_pair.jti
+    assert refresh_token_obj.exp - access_token_obj.exp == 60 * 24 * 60 * 60 - 15 * 60
+
+
+def test_token_pairs_get_new_jti(jwt_service, user):
+    assert jwt_service.mint_token_pair(user).jti != jwt_service.mint_token_pair(user).jti
+
+
+def test_asymmetric_token_has_kid_and_survives_key_rotation(user):
+    old_key = ed25519.Ed25519PrivateKey.generate()
+    new_key = ed25519.Ed25519PrivateKey.generate()
+    old_service = JWTService(
+        key_set=KeySet(
+            algorithm="EdDSA", signing_key=old_key, key_id="old", verification_keys={"old": old_key.public_key()}
+        )
+    )
+    rotated_key_set = KeySet(
+        algorithm="EdDSA",
+        signing_key=new_key,
+        key_id="new",
+        verification_keys={"old": old_key.public_key(), "new": new_key.public_key()},
+    )
+    new_service = JWTService(key_set=rotated_key_set)
+
+    old_token = old_service.generate_access_token(user=user)
+    new_token = new_service.generate_access_token(user=user)
+
+    assert jwt.get_unverified_header(new_token)["kid"] == "new"
+    assert new_service.decode_token(old_token).user_uuid == user.id
+    assert new_service.decode_token(new_token).user_uuid == user.id
+    assert {key["kid"] for key in rotated_key_set.jwks["keys"]} == {"old", "new"}
+
+
+def write_key_files(tmp_path, public_keys: dict) -> tuple:
+    private_key_path = tmp_path / "private.pem"
+    private_key_path.write_bytes(
+        ed25519.Ed25519PrivateKey.generate().private_bytes(
+            serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+        )
+    )
+    public_keys_dir = tmp_path / "public"
+    public_keys_dir.mkdir()
+    for key_id, public_key in public_keys.items():
+        (public_keys_dir / f"{key_id}.pem").write_bytes(
+            public_key.public_bytes(serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo)
+        )
+    return private_key_path, public_keys_dir
+
+
+def test_key_set_from_files_publishes_retired_keys(tmp_path):
+    private_key_path, public_keys_dir = write_key_files(
+        tmp_path, {"old": ed25519.Ed25519PrivateKey.generate().public_key()}
+    )
+
+    key_set = KeySet.from_files("EdDSA", private_key_path, "new", public_keys_dir)
+
+    assert {key["kid"] for key in key_set.jwks["keys"]} == {"old", "new"}
+
 
-    assert access_token_obj.jti == refresh_token_obj.jti
+def test_key_set_from_files_rejects_key_of_other_algorithm(tmp_path):
+    rsa_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    private_key_path, public_keys_dir = write_key_files(tmp_path, {"rsa-old": rsa_key.public_key()})
+
+    with pytest.raises(RuntimeError, match="rsa-old.pem"):
+        KeySet.from_files("EdDSA", private_key_path, "new", public_keys_dir)
+
+
+def test_token_with_unknown_kid_is_rejected(user):
+    key = ed25519.Ed25519PrivateKey.generate()
+    other_key = ed25519.Ed25519PrivateKey.generate()
+    signer = JWTService(key_set=KeySet(algorithm="EdDSA", signing_key=key, key_id="unknown", verification_keys={}))
+    verifier = JWTService(
+        key_set=KeySet(
+            algorithm="EdDSA",
+            signing_key=other_key,
+            key_id="known",
+            verification_keys={"known": other_key.public_key()},
+        )
+    )
+
+    with pytest.raises(SessionHasExpired):
+        verifier.decode_token(signer.generate_access_token(user=user))
+
+
+def test_compact_profile_packs_uuids(secret_key):
+    user = User(id=uuid.uuid4(), email="test_email", password="test_password", is_active=True)
+    compact = JWTService(secret_key=secret_key, token_profile="compact")
+    standard = JWTService(secret_key=secret_key)
+
+    token_pair = compact.mint_token_pair(user)
+    compact_token = token_pair.refresh_token
+    payload = jwt.decode(compact_token, secret_key, algorithms=["HS256"])
+    token_obj = compact.decode_token(compact_token)
+
+    assert set(payload) == {"sub", "iat", "exp", "jti", "rol"}
+    assert isinstance(payload["exp"], int)
+    assert token_obj.user_uuid == str(user.id)
+    assert token_obj.jti == token_pair.jti
+    assert len(compact_token) < len(standard.generate_refresh_token(user))
+
+
+@pytest.mark.parametrize("token_profile", ["compact", "standard"])
+def test_refresh_token_carries_device_type(secret_key, user, token_profile):
+    service = JWTService(secret_key=secret_key, token_profile=token_profile)
+
+    token_pair = service.mint_token_pair(user, device_type="mobile")
+
+    assert service.decode_token(token_pair.refresh_token).device_type == "mobile"
+    assert service.decode_token(token_pair.access_token).device_type is None
+    assert service.decode_token(service.mint_token_pair(user).refresh_token).device_type is None
+
+
+@pytest.mark.parametrize("token_profile", ["compact", "standard"])
+def test_rotated_pair_keeps_user_and_session_claims(secret_key, user, token_profile):
+    service = JWTService(secret_key=secret_key, token_profile=token_profile)
+    session_id = str(uuid.uuid4())
+    token_pair = service.mint_token_pair(user, device_type="desktop", session_id=session_id)
+    refresh_token = service.decode_token(token_pair.refresh_token)
+
+    rotated_pair = service.rotate_token_pair(refresh_token)
+    rotated = service.decode_token(rotated_pair.refresh_token)
+
+    assert rotated.session_id == session_id
+    assert rotated.device_type == "desktop"
+    assert rotated.jti == rotated_pair.jti != token_pair.jti
+    assert (rotated.user_uuid, rotated.roles, rotated.pmask, rotated.scope) == (
+        refresh_token.user_uuid,
+        refresh_token.roles,
+        refresh_token.pmask,
+        refresh_token.scope,
+    )
@@ -0,0 +1,87 @@
+import pytest
+
+from src.core.permission_registry import (
+    PermissionCheck,
+    PermissionRegistry,
+    decode_permission_mask,
+    encode_permission_mask,
+)
+from src.domain.entities import Permission, Role, User
+from src.services.jwt import JWTService
+
+PERMISSIONS = [
+    Permission(slug="can_view_user", description="", bit_index=0),
+    Permission(slug="can_update_user", description="", bit_index=1),
+    Permission(slug="can_delete_user", description="", bit_index=70),
+]
+
+
+@pytest.fixture
+def registry() -> PermissionRegistry:
+    return PermissionRegistry(PERMISSIONS)
+
+
+@pytest.fixture
+def user(registry) -> User:
+    role = Role(
+        slug="moderator",
+        title="Модератор",
+        description="",
+        permissions=[
+            Permission(slug="can_view_user", description="", bit_index=0),
+            Permission(slug="can_delete_user", description="", bit_index=70),
+        ],
+    )
+    return User(id="user-1", email="test_email", password="test_password", is_active=True, roles=[role])
+
+
+@pytest.mark.parametrize("mask", [0, 1, 0b101, 1 << 70, (1 << 200) - 1])
+def test_mask_round_trip(mask):
+    assert decode_permission_mask(encode_permission_mask(mask)) == mask
+
+
+def test_mask_token_is_checked_by_bits(registry, user):
+    jwt_service = JWTService(secret_key="test_secret_key", token_profile="standard")
+    token = jwt_service.decode_token(jwt_service.generate_access_token(user))
+
+    assert token.scope == []
+    assert registry.slugs(decode_permission_mask(token.pmask)) == ["can_view_user", "can_delete_user"]
+    assert PermissionCheck(["can_view_user", "can_delete_user"]).is_satisfied(token, registry)
+    assert not PermissionCheck(["can_view_user", "can_update_user"]).is_satisfied(token, registry)
+    assert not PermissionCheck(["unknown"]).is_satisfied(token, registry)
+
+
+def test_slug_list_token_is_still_accepted(registry, user):
+    jwt_service = JWTService(secret_key="test_secret_key", permission_format="slugs", token_profile="standard")
+    token = jwt_service.decode_token(jwt_service.generate_access_token(user))
+
+    assert token.pmask is None
+    assert PermissionCheck(["can_delete_user"]).is_satisfied(token, registry)
+    assert not PermissionCheck(["can_update_user"]).is_satisfied(token, registry)
+
+
+def test_check_is_recompiled_when_registry_grows(registry, user):
+    jwt_service = JWTService(secret_key="test_secret_key", token_profile="standard")
+    user.roles[0].permissions.append(Permission(slug="can_export_user", description="", bit_index=71))
+    token = jwt_service.decode_token(jwt_service.generate_access_token(user))
+    check = PermissionCheck(["can_export_user"])
+
+    assert not check.is_satisfied(token, registry)
+    registry.register(Permission(slug="can_export_user", description="", bit_index=71))
+    assert check.is_satisfied(token, registry)
+
+
+def test_compact_token_permissions_come_from_roles(registry, user):
+    jwt_service = JWTService(secret_key="test_secret_key", token_profile="compact")
+    token = jwt_service.decode_token(jwt_service.generate_access_token(user))
+    check = PermissionCheck(["can_delete_user"])
+
+    assert token.roles == ["moderator"]
+    assert not check.is_satisfied(token, registry)
+    registry.register_role(user.roles[0])
+    assert check.is_satisfied(token, registry)
+    assert not PermissionCheck(["can_update_user"]).is_satisfied(token, registry)
+
+    user.roles[0].permissions.pop()
+    registry.load(PERMISSIONS, user.roles)
+    assert not check.is_satisfied(token, registry)
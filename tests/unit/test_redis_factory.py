@@ -0,0 +1,43 @@
+from redis.asyncio import Redis
+from redis.asyncio.cluster import RedisCluster
+
+from src.core.config import RedisSettings
+from src.db.redis import (
+    InstrumentedBlockingConnectionPool,
+    InstrumentedSentinelConnectionPool,
+    create_pubsub_redis,
+    create_redis,
+)
+
+
+def make_settings(**overrides) -> RedisSettings:
+    return RedisSettings(REDIS_HOST="127.0.0.1", REDIS_PORT="6379", **overrides)
+
+
+def test_standalone_client_uses_instrumented_pool():
+    config = make_settings(REDIS_MAX_CONNECTIONS=7, REDIS_PROTOCOL=3)
+    client = create_redis(config)
+
+    assert isinstance(client.connection_pool, InstrumentedBlockingConnectionPool)
+    assert client.connection_pool.max_connections == 7
+    assert client.connection_pool.connection_kwargs["protocol"] == 3
+    assert client.connection_pool.connection_kwargs["health_check_interval"] == config.redis_health_check_interval
+    assert create_pubsub_redis(client, config) is client
+
+
+def test_sentinel_client():
+    config = make_settings(REDIS_MODE="sentinel", REDIS_SENTINELS="s1:26379, s2:26380", REDIS_SENTINEL_MASTER="auth")
+    client = create_redis(config)
+
+    assert config.sentinel_addresses == [("s1", 26379), ("s2", 26380)]
+    assert isinstance(client.connection_pool, InstrumentedSentinelConnectionPool)
+    assert client.connection_pool.service_name == "auth"
+
+
+def test_cluster_client_subscribes_through_a_node():
+    config = make_settings(REDIS_MODE="cluster")
+    client = create_redis(config)
+    pubsub_client = create_pubsub_redis(client, config)
+
+    assert isinstance(client, RedisCluster)
+    assert isinstance(pubsub_client, Redis)
@@ -0,0 +1,81 @@
+import pytest
+
+from src.infrastructure.repositories.blacklist import RedisBlacklistRepository, blacklist_key
+from src.services.redis_tracking import TrackedReadCache
+
+
+class FakeTrackingConnection:
+    def __init__(self, responses: list):
+        self._responses = responses
+        self.commands = []
+
+    async def read_response(self, timeout: float, push_request: bool):
+        return self._responses.pop(0) if self._responses else None
+
+    async def send_command(self, *args):
+        self.commands.append(args)
+
+
+class CountingRedis:
+    def __init__(self, storage: dict[bytes, bytes]):
+        self.storage = storage
+        self.reads = 0
+
+    async def mget(self, keys: list[bytes]):
+        self.reads += 1
+        return [self.storage.get(key) for key in keys]
+
+
+@pytest.fixture
+def cache() -> TrackedReadCache:
+    cache = TrackedReadCache(max_entries=2, prefixes=["bl:"], ping_interval=1)
+    cache.ready = True
+    return cache
+
+
+def test_put_is_dropped_after_concurrent_invalidation(cache):
+    sequence = cache.sequence
+    cache.invalidate([b"a"])
+    cache.put(b"a", b"stale", sequence)
+    assert cache.get(b"a") == (False, None)
+
+    cache.put(b"a", None, cache.sequence)
+    assert cache.get(b"a") == (True, None)
+
+
+def test_cache_is_bounded_and_flushed(cache):
+    for key in (b"a", b"b", b"c"):
+        cache.put(key, b"", cache.sequence)
+    assert len(cache) == 2
+    assert cache.get(b"a") == (False, None)
+
+    cache.invalidate(None)
+    assert len(cache) == 0
+
+
+@pytest.mark.asyncio
+async def test_listen_applies_invalidations_and_detects_gap(cache):
+    cache.put(b"a", b"", cache.sequence)
+    connection = FakeTrackingConnection([[b"invalidate", [b"a"]], None])
+
+    with pytest.raises(ConnectionError):
+        await cache._listen(connection)
+
+    assert cache.get(b"a") == (False, None)
+    assert connection.commands == [("PING",)]
+
+
+@pytest.mark.asyncio
+async def test_repository_reads_through_cache(cache):
+    revoked = "d0c1b7a4-3f5e-4c62-9a8e-0b1f2c3d4e5f"
+    redis = CountingRedis({blacklist_key(revoked): b""})
+    repository = RedisBlacklistRepository(redis=redis, tracked_read_cache=cache)
+
+    assert await repository.get_value(revoked) == b""
+    assert await repository.get_value(revoked) == b""
+    assert redis.reads == 1
+
+    cache.invalidate([blacklist_key(revoked)])
+    del redis.storage[blacklist_key(revoked)]
+    assert await repository.get_value(revoked) is None
+    assert redis.reads == 2
@@ -0,0 +1,102 @@
+import asyncio
+
+import pytest
+
+from src.domain.entities import TokenPair
+from src.domain.exceptions import SessionHasExpired
+from src.services.refresh_single_flight import REFRESH_LOCK_KEY_PREFIX, RefreshSingleFlight
+
+
+class FakeRedis:
+    def __init__(self):
+        self.storage: dict[str, bytes | str] = {}
+
+    async def get(self, key: str):
+        return self.storage.get(key)
+
+    async def set(self, key: str, value, nx: bool = False, px: int | None = None):
+        if nx and key in self.storage:
+            return None
+        self.storage[key] = value
+        return True
+
+    async def eval(self, script: str, numkeys: int, key: str, owner: str):
+        if self.storage.get(key) == owner:
+            del self.storage[key]
+            return 1
+        return 0
+
+
+class CountingRotation:
+    def __init__(self, delay: float = 0.0, error: Exception | None = None):
+        self.calls = 0
+        self._delay = delay
+        self._error = error
+
+    async def __call__(self) -> TokenPair:
+        self.calls += 1
+        await asyncio.sleep(self._delay)
+        if self._error is not None:
+            raise self._error
+        return TokenPair(
+            access_token=f"access-{self.calls}", refresh_token=f"refresh-{self.calls}", jti=str(self.calls)
+        )
+
+
+@pytest.fixture
+def redis() -> FakeRedis:
+    return FakeRedis()
+
+
+def make_single_flight(redis: FakeRedis) -> RefreshSingleFlight:
+    return RefreshSingleFlight(redis, grace_period=10, lock_timeout=1, poll_interval=0.01)
+
+
+@pytest.mark.asyncio
+async def test_concurrent_refreshes_share_one_rotation(redis):
+    single_flight = make_single_flight(redis)
+    rotate = CountingRotation(delay=0.05)
+
+    pairs = await asyncio.gather(*(single_flight.run("refresh.token", rotate) for _ in range(5)))
+
+    assert rotate.calls == 1
+    assert len({pair.refresh_token for pair in pairs}) == 1
+    assert await single_flight.run("refresh.token", rotate) == pairs[0]
+    assert rotate.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_other_worker_gets_sealed_result_from_redis(redis):
+    rotate = CountingRotation()
+    token_pair = await make_single_flight(redis).run("refresh.token", rotate)
+
+    assert await make_single_flight(redis).run("refresh.token", rotate) == token_pair
+    assert rotate.calls == 1
+    assert all(b"refresh-1" not in value for value in redis.storage.values() if isinstance(value, bytes))
+
+
+@pytest.mark.asyncio
+async def test_worker_waits_for_lock_owner(redis):
+    owner, waiter = make_single_flight(redis), make_single_flight(redis)
+    owner_rotation, waiter_rotation = CountingRotation(delay=0.05), CountingRotation()
+
+    owned = asyncio.create_task(owner.run("refresh.token", owner_rotation))
+    await asyncio.sleep(0.01)
+    waited = await waiter.run("refresh.token", waiter_rotation)
+
+    assert waited == await owned
+    assert (owner_rotation.calls, waiter_rotation.calls) == (1, 0)
+
+
+@pytest.mark.asyncio
+async def test_failed_rotation_is_shared_and_releases_lock(redis):
+    single_flight = make_single_flight(redis)
+    rotate = CountingRotation(delay=0.02, error=SessionHasExpired())
+
+    results = await asyncio.gather(
+        *(single_flight.run("refresh.token", rotate) for _ in range(3)), return_exceptions=True
+    )
+
+    assert rotate.calls == 1
+    assert all(isinstance(result, SessionHasExpired) for result in results)
+    assert not any(key.startswith(REFRESH_LOCK_KEY_PREFIX) for key in redis.storage)
@@ -0,0 +1,78 @@
+import json
+import time
+
+import pytest
+
+from src.services.blacklist import BlacklistService
+from src.services.revocation_cache import RevocationNearCache, RevocationSubscriber
+from tests.unit.repositories import FakeBlacklistRepository
+
+
+class FakePubSub:
+    def __init__(self, messages: list[dict | None]):
+        self._messages = messages
+        self.pings = 0
+
+    async def get_message(self, timeout: float):
+        if not self._messages:
+            raise ConnectionError
+        return self._messages.pop(0)
+
+    async def ping(self):
+        self.pings += 1
+
+
+@pytest.fixture
+def fake_repository() -> FakeBlacklistRepository:
+    return FakeBlacklistRepository()
+
+
+@pytest.fixture
+def revocation_cache() -> RevocationNearCache:
+    return RevocationNearCache(warmup=0, default_ttl=60)
+
+
+@pytest.mark.asyncio
+async def test_cold_cache_falls_back_to_redis(fake_repository, revocation_cache):
+    await fake_repository.set_value("jti-1")
+    service = BlacklistService(fake_repository, revocation_cache=revocation_cache)
+
+    assert await service.is_exists("jti-1")
+    assert not await service.is_exists("jti-2")
+    assert revocation_cache.fallbacks == 2
+    assert revocation_cache.lookup("jti-1") is True
+
+
+@pytest.mark.asyncio
+async def test_warm_cache_answers_locally_and_drops_on_gap(fake_repository, revocation_cache):
+    published = {"jtis": ["jti-2"], "ttl": 60, "ts": time.time()}
+    pubsub = FakePubSub(
+        [
+            {"type": "subscribe", "data": 1},
+            {"type": "message", "data": json.dumps(published).encode()},
+            None,
+            {"type": "pong", "data": b""},
+        ]
+    )
+    subscriber = RevocationSubscriber(redis=None, channel="revocations", ping_interval=1, sinks=[revocation_cache])
+    with pytest.raises(ConnectionError):
+        await subscriber._listen(pubsub)
+
+    assert pubsub.pings == 1
+    assert revocation_cache.is_warm
+    assert revocation_cache.lookup("jti-2") is True
+    assert revocation_cache.lookup("jti-3") is False
+    assert revocation_cache.hit_rate == 1.0
+    assert subscriber.max_staleness < 1
+
+    revocation_cache.on_gap()
+    assert revocation_cache.lookup("jti-3") is None
+
+
+@pytest.mark.asyncio
+async def test_revocation_is_applied_locally(fake_repository, revocation_cache):
+    service = BlacklistService(fake_repository, revocation_cache=revocation_cache)
+    await service.revoke({"jti-4": time.time() + 60, "jti-5": time.time() + 60})
+
+    assert revocation_cache.lookup("jti-4") is True
+    assert revocation_cache.lookup("jti-5") is True
@@ -0,0 +1,96 @@
+import fnmatch
+import time
+import uuid
+
+import pytest
+
+from src.infrastructure.repositories.blacklist import blacklist_key, user_epoch_key
+from src.services.blacklist import BlacklistService
+from src.services.revocation_filter import RevocationFilter
+from tests.unit.repositories import FakeBlacklistRepository
+
+
+class CountingBlacklistRepository(FakeBlacklistRepository):
+    def __init__(self):
+        super().__init__()
+        self.gets = 0
+
+    async def get_value(self, key: str) -> str | None:
+        self.gets += 1
+        return await super().get_value(key)
+
+
+class FakeRedis:
+    def __init__(self, keys: list[bytes]):
+        self._keys = keys
+
+    async def scan_iter(self, match: bytes | str, count: int):
+        pattern = match if isinstance(match, bytes) else match.encode()
+        for key in self._keys:
+            if fnmatch.fnmatchcase(key, pattern):
+                yield key
+
+
+@pytest.fixture
+def repository() -> CountingBlacklistRepository:
+    return CountingBlacklistRepository()
+
+
+@pytest.fixture
+def revocation_filter() -> RevocationFilter:
+    return RevocationFilter(ttl=60, error_rate=0.001, capacity=1000)
+
+
+@pytest.mark.asyncio
+async def test_filter_skips_redis_for_unknown_jti(repository, revocation_filter):
+    revoked = str(uuid.uuid4())
+    await repository.set_value(revoked)
+    service = BlacklistService(repository, revocation_filter=revocation_filter)
+
+    assert not await service.is_exists(str(uuid.uuid4()))
+    assert repository.gets == 1
+
+    await revocation_filter.rebuild(FakeRedis([blacklist_key(revoked), user_epoch_key("user-1").encode()]))
+    assert revocation_filter.might_contain(user_epoch_key("user-1"))
+    assert await service.is_exists(revoked)
+    assert not any([await service.is_exists(str(uuid.uuid4())) for _ in range(100)])
+    assert repository.gets == 2
+
+
+@pytest.mark.asyncio
+async def test_filter_is_not_used_after_gap(repository, revocation_filter):
+    await revocation_filter.rebuild(FakeRedis([]))
+    revocation_filter.on_gap()
+
+    assert revocation_filter.might_contain(str(uuid.uuid4())) is None
+
+
+@pytest.mark.asyncio
+async def test_generations_rotate_after_ttl(revocation_filter):
+    await revocation_filter.rebuild(FakeRedis([]))
+    jti = str(uuid.uuid4())
+    revocation_filter.add([jti])
+
+    revocation_filter._rotated_at -= 61
+    assert revocation_filter.might_contain(jti)
+    revocation_filter._rotated_at -= 61
+    assert not revocation_filter.might_contain(jti)
+
+
+def test_memory_budget_is_respected():
+    revocation_filter = RevocationFilter(ttl=60, error_rate=0.001, capacity=10**6, memory_budget=64 * 1024)
+    assert revocation_filter.memory_bytes <= 64 * 1024
+
+
+@pytest.mark.asyncio
+async def test_filter_includes_legacy_keys():
+    legacy = str(uuid.uuid4())
+    redis = FakeRedis([legacy.encode()])
+    revocation_filter = RevocationFilter(ttl=60, error_rate=0.001, capacity=1000)
+
+    await revocation_filter.rebuild(redis)
+    assert not revocation_filter.might_contain(legacy)
+
+    revocation_filter = RevocationFilter(ttl=60, error_rate=0.001, capacity=1000, legacy_keys=True)
+    await revocation_filter.rebuild(redis)
+    assert revocation_filter.might_contain(legacy)
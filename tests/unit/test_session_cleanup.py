@@ -0,0 +1,99 @@
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+import pytest
+
+from src.services.session_cleanup import SessionCleanupService
+from tests.unit.repositories import FakeSessionCleanupRepository
+
+NOW = datetime(2026, 10, 17, 12, 0)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps: list[float] = []
+
+    def __call__(self) -> float:
+        return self.now
+
+    async def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock() -> FakeClock:
+    return FakeClock()
+
+
+@pytest.fixture
+def repository() -> FakeSessionCleanupRepository:
+    expired = {uuid4(): NOW - timedelta(days=40, minutes=minute) for minute in range(25)}
+    live = {uuid4(): NOW - timedelta(days=1) for _ in range(5)}
+    return FakeSessionCleanupRepository({**expired, **live})
+
+
+def make_service(repository, clock, rows_per_second=0.0, max_replication_lag=0.0) -> SessionCleanupService:
+    return SessionCleanupService(
+        repository,
+        retention=timedelta(days=30),
+        batch_size=10,
+        rows_per_second=rows_per_second,
+        max_replication_lag=max_replication_lag,
+        sleep=clock.sleep,
+        clock=clock,
+    )
+
+
+@pytest.mark.asyncio
+async def test_run_pass_deletes_only_expired_sessions(repository, clock):
+    deleted = await make_service(repository, clock).run_pass(NOW)
+
+    assert deleted == 25
+    assert len(repository.sessions) == 5
+    # Завершённый проход сбрасывает курсор, следующий начнётся с начала
+    assert repository.checkpoints == {}
+
+
+@pytest.mark.asyncio
+async def test_run_pass_resumes_from_checkpoint_after_crash(repository, clock):
+    repository.fail_after_batches = 2
+    service = make_service(repository, clock)
+
+    with pytest.raises(ConnectionError):
+        await service.run_pass(NOW)
+    assert len(repository.sessions) == 10
+    assert "default" in repository.checkpoints
+
+    repository.fail_after_batches = None
+    assert await service.run_pass(NOW) == 5
+    assert len(repository.sessions) == 5
+
+
+@pytest.mark.asyncio
+async def test_locked_sessions_are_picked_up_by_next_pass(repository, clock):
+    locked = min(repository.sessions, key=repository.sessions.get)
+    repository.locked.add(locked)
+    service = make_service(repository, clock)
+
+    assert await service.run_pass(NOW) == 24
+    repository.locked.clear()
+    assert await service.run_pass(NOW) == 1
+
+
+@pytest.mark.asyncio
+async def test_run_pass_respects_rows_per_second_budget(repository, clock):
+    await make_service(repository, clock, rows_per_second=20).run_pass(NOW)
+
+    # Пачки по 10, 10 и 5 строк при бюджете 20 строк/с
+    assert clock.sleeps == [0.5, 0.5, 0.25]
+
+
+@pytest.mark.asyncio
+async def test_run_pass_waits_for_replicas(repository, clock):
+    repository.replication_lags = [25.0, 12.0]
+
+    await make_service(repository, clock, max_replication_lag=10).run_pass(NOW)
+
+    assert clock.sleeps == [15.0, 2.0]
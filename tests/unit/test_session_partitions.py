@@ -0,0 +1,107 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from src.infrastructure.repositories.session_partitions import parse_range_bound
+from src.services.session_partitions import SessionPartitionService, add_months
+from tests.unit.repositories import FakeSessionPartitionRepository
+
+NOW = datetime(2026, 10, 17, 12, 0)
+
+
+@pytest.fixture
+def repository() -> FakeSessionPartitionRepository:
+    return FakeSessionPartitionRepository(["sessions_desktop", "sessions_mobile"])
+
+
+@pytest.fixture
+def service(repository) -> SessionPartitionService:
+    return SessionPartitionService(repository, months_ahead=2, retention=timedelta(days=30))
+
+
+async def create_months(repository: FakeSessionPartitionRepository, parent: str, first: datetime, count: int) -> None:
+    for offset in range(count):
+        starts_at = add_months(first, offset)
+        await repository.create_month_partition(parent, starts_at, add_months(starts_at, 1))
+
+
+def test_parse_range_bound():
+    bound = "FOR VALUES FROM ('2026-10-01 00:00:00') TO ('2026-11-01 00:00:00')"
+    assert parse_range_bound(bound) == (datetime(2026, 10, 1), datetime(2026, 11, 1))
+    assert parse_range_bound("DEFAULT") is None
+
+
+def test_add_months_crosses_year():
+    assert add_months(datetime(2026, 11, 1), 3) == datetime(2027, 2, 1)
+
+
+@pytest.mark.asyncio
+async def test_maintain_creates_current_and_future_months(service, repository):
+    report = await service.maintain(NOW)
+
+    assert sorted(report.created) == [
+        "sessions_desktop_2026_10",
+        "sessions_desktop_2026_11",
+        "sessions_desktop_2026_12",
+        "sessions_mobile_2026_10",
+        "sessions_mobile_2026_11",
+        "sessions_mobile_2026_12",
+    ]
+    assert (await service.maintain(NOW)).created == []
+
+
+@pytest.mark.asyncio
+async def test_maintain_drops_expired_months(service, repository):
+    await create_months(repository, "sessions_desktop", datetime(2026, 7, 1), 6)
+
+    report = await service.maintain(NOW)
+
+    # Сентябрь заканчивается 1 октября, позже чем NOW - 30 дней: в нём ещё могут быть живые сессии
+    assert report.dropped == ["sessions_desktop_2026_07", "sessions_desktop_2026_08"]
+    assert "sessions_desktop_2026_09" in repository.partitions
+
+
+@pytest.mark.asyncio
+async def test_maintain_keeps_month_with_rotated_sessions(service, repository):
+    await create_months(repository, "sessions_desktop", datetime(2026, 7, 1), 6)
+    repository.live_sessions["sessions_desktop_2026_07"] = [NOW - timedelta(days=1)]
+    repository.live_sessions["sessions_desktop_2026_08"] = [NOW - timedelta(days=45)]
+
+    report = await service.maintain(NOW)
+
+    assert report.kept == ["sessions_desktop_2026_07"]
+    assert report.dropped == ["sessions_desktop_2026_08"]
+
+
+@pytest.mark.asyncio
+async def test_maintain_retries_locked_partition_next_run(service, repository):
+    await create_months(repository, "sessions_desktop", datetime(2026, 8, 1), 5)
+    repository.locked.add("sessions_desktop_2026_08")
+
+    assert (await service.maintain(NOW)).dropped == []
+
+    repository.locked.clear()
+    assert (await service.maintain(NOW)).dropped == ["sessions_desktop_2026_08"]
+
+
+@pytest.mark.asyncio
+async def test_maintain_moves_default_rows_into_new_month(service, repository):
+    repository.default_rows["sessions_desktop"] = [datetime(2026, 11, 3), datetime(2026, 11, 20), datetime(2027, 3, 1)]
+
+    report = await service.maintain(NOW)
+
+    assert report.moved == {"sessions_desktop_2026_11": 2}
+    assert repository.default_rows["sessions_desktop"] == [datetime(2027, 3, 1)]
+
+
+@pytest.mark.asyncio
+async def test_maintain_continues_after_failed_create(service, repository):
+    await create_months(repository, "sessions_desktop", datetime(2026, 7, 1), 2)
+    repository.locked.add("sessions_desktop_2026_10")
+
+    report = await service.maintain(NOW)
+
+    assert report.failed == ["sessions_desktop_2026_10"]
+    assert "sessions_desktop_2026_11" in report.created
+    assert "sessions_mobile_2026_10" in report.created
+    assert report.dropped == ["sessions_desktop_2026_07", "sessions_desktop_2026_08"]
@@ -0,0 +1,129 @@
+from datetime import datetime
+from uuid import uuid4
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+import src.infrastructure.models  # noqa: F401 — регистрирует отображение сущностей на таблицы
+from src.domain.entities import Session
+from src.domain.factories.session import refresh_token_digest
+from src.infrastructure.repositories.sessions import SQLAlchemySessionRepository
+
+
+class FakeResult:
+    def __init__(self, rows: list):
+        self._rows = rows
+
+    def scalars(self):
+        return iter(self._rows)
+
+    def scalar_one_or_none(self):
+        return self._rows[0] if self._rows else None
+
+    def scalar_one(self):
+        return self._rows[0]
+
+    def one(self):
+        return tuple(self._rows)
+
+
+class RecordingSession:
+    def __init__(self, rows: list):
+        self._rows = rows
+        self.statements: list[str] = []
+        self.parameters: list[dict] = []
+        self.commits = 0
+
+    async def execute(self, statement):
+        compiled = statement.compile(dialect=postgresql.dialect())
+        self.statements.append(str(compiled))
+        self.parameters.append(compiled.params)
+        return FakeResult(self._rows)
+
+    async def commit(self):
+        self.commits += 1
+
+
+@pytest.mark.asyncio
+async def test_deactivate_user_sessions_is_a_single_update():
+    jtis = [uuid4() for _ in range(3)]
+    session = RecordingSession(jtis)
+    repository = SQLAlchemySessionRepository(session=session)
+
+    deactivated = await repository.deactivate_user_sessions(uuid4(), keep_id=uuid4())
+
+    assert deactivated == [str(jti) for jti in jtis]
+    assert session.commits == 1
+    (statement,) = session.statements
+    assert statement.startswith("UPDATE sessions SET is_active=")
+    assert "sessions.user_id = " in statement
+    assert "sessions.is_active IS true" in statement
+    assert "sessions.id != " in statement
+    assert statement.endswith("RETURNING sessions.jti")
+
+
+@pytest.mark.asyncio
+async def test_get_by_refresh_token_looks_up_digest():
+    session = RecordingSession([])
+    repository = SQLAlchemySessionRepository(session=session)
+
+    assert await repository.get_by_refresh_token("raw.refresh.token") is None
+
+    (statement,) = session.statements
+    assert "WHERE sessions.refresh_token_digest = " in statement
+    assert list(session.parameters[0].values()) == [refresh_token_digest("raw.refresh.token")]
+
+
+@pytest.mark.asyncio
+async def test_get_by_refresh_token_filters_by_partition_key():
+    session = RecordingSession([])
+    repository = SQLAlchemySessionRepository(session=session)
+
+    await repository.get_by_refresh_token("raw.refresh.token", device_type="mobile")
+
+    (statement,) = session.statements
+    assert "sessions.device_type = " in statement
+    assert "mobile" in session.parameters[0].values()
+
+
+@pytest.mark.asyncio
+async def test_rotate_refresh_token_is_a_single_statement():
+    session_id, user_id, jti = uuid4(), uuid4(), uuid4()
+    session = RecordingSession([session_id, "mobile", user_id, ["admin"], None])
+    repository = SQLAlchemySessionRepository(session=session)
+
+    rotation = await repository.rotate_refresh_token("old.token", "new.token", jti, session_id, "mobile")
+
+    assert (rotation.session_id, rotation.device_type, rotation.user_id) == (session_id, "mobile", user_id)
+    assert rotation.roles == ["admin"] and rotation.reused_jti is None
+    assert session.commits == 1
+    (statement,) = session.statements
+    assert statement.startswith("WITH rotated AS \n(UPDATE sessions SET")
+    assert "reused AS \n(UPDATE sessions SET is_active=" in statement
+    assert "array_agg(user_roles.role_slug)" in statement
+    assert refresh_token_digest("old.token") in session.parameters[0].values()
+    assert refresh_token_digest("new.token") in session.parameters[0].values()
+
+
+@pytest.mark.asyncio
+async def test_update_filters_by_month_partition_key():
+    created_at = datetime(2026, 10, 17, 12, 0)
+    session = RecordingSession([None])
+    repository = SQLAlchemySessionRepository(session=session)
+    current = Session(
+        id=uuid4(),
+        user_id=uuid4(),
+        user_agent="pytest_user_agent",
+        jti=uuid4(),
+        refresh_token_digest=refresh_token_digest("raw.refresh.token"),
+        user_ip=None,
+        is_active=False,
+        device_type="desktop",
+        created_at=created_at,
+    )
+
+    await repository.update(current)
+
+    (statement,) = session.statements
+    assert "sessions.device_type = " in statement and "sessions.created_at = " in statement
+    assert created_at in session.parameters[0].values()
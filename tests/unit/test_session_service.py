@@ -1,9 +1,12 @@
+from datetime import datetime, timedelta
 from uuid import uuid4
 
 import pytest
 
 from src.domain.entities import Session
-from src.services.sessions import SessionService
+from src.domain.exceptions import InvalidCursor, RefreshTokenReused, SessionHasExpired
+from src.domain.factories.session import refresh_token_digest
+from src.services.sessions import SessionService, decode_session_cursor, encode_session_cursor
 from tests.unit.repositories import FakeSessionRepository
 
 
@@ -24,7 +27,7 @@ def session() -> Session:
         user_id=uuid4(),
         user_agent="pytest_user_agent",
         jti=uuid4(),
-        refresh_token="test_refresh_token",
+        refresh_token_digest=refresh_token_digest("test_refresh_token"),
         user_ip="test_ip",
         is_active=True,
     )
@@ -38,7 +41,7 @@ def current_session() -> Session:
         user_id=uuid4(),
         user_agent="pytest_user_agent",
         jti=uuid4(),
-        refresh_token="current_test_refresh_token",
+        refresh_token_digest=refresh_token_digest("current_test_refresh_token"),
         user_ip="test_ip",
         is_active=True,
     )
@@ -55,9 +58,9 @@ async def test_create_new_session(session, session_service):
 @pytest.mark.asyncio
 async def test_deactivate_current_session(session_service, session):
     created_session = await session_service.create_new_session(session)
-    deactivate_session = await session_service.deactivate_current_session(created_session.refresh_token)
+    deactivate_session = await session_service.deactivate_current_session("test_refresh_token")
     assert created_session.jti == deactivate_session.jti
-    assert created_session.refresh_token == deactivate_session.refresh_token
+    assert created_session.refresh_token_digest == deactivate_session.refresh_token_digest
     assert not deactivate_session.is_active
 
 
@@ -66,10 +69,136 @@ async def test_deactivate_all_without_current(session, current_session, session_
     created_session = await session_service.create_new_session(session=session)
     current_session.user_id = session.user_id
     current_session = await session_service.create_new_session(session=current_session)
-    deactivate_sessions = await session_service.deactivate_all_without_current(current_session.refresh_token)
+    deactivated_jtis = await session_service.deactivate_all_without_current("current_test_refresh_token")
 
-    first_deactivated_session = deactivate_sessions[0] if deactivate_sessions else None
-    assert first_deactivated_session is not None
-    assert first_deactivated_session.jti == created_session.jti
-    assert not first_deactivated_session.is_active
-    assert current_session.jti not in [s.jti for s in deactivate_sessions]
+    assert deactivated_jtis == [str(created_session.jti)]
+    page = await session_service.get_current_user_sessions(session.user_id, limit=10)
+    user_sessions = {s.jti: s for s in page.sessions}
+    assert not user_sessions[created_session.jti].is_active
+    assert user_sessions[current_session.jti].is_active
+
+
+@pytest.mark.asyncio
+async def test_update_session_refresh_token_stores_new_digest(session, session_service):
+    created_session = await session_service.create_new_session(session)
+    new_jti = uuid4()
+
+    rotation = await session_service.update_session_refresh_token("test_refresh_token", "new_refresh_token", new_jti)
+
+    assert rotation.session_id == created_session.id
+    assert created_session.refresh_token_digest == refresh_token_digest("new_refresh_token")
+    assert created_session.jti == new_jti
+    with pytest.raises(SessionHasExpired):
+        await session_service.update_session_refresh_token("test_refresh_token", "other_refresh_token", uuid4())
+
+
+@pytest.mark.asyncio
+async def test_get_current_session_requires_active_session(session, session_service):
+    created_session = await session_service.create_new_session(session)
+
+    assert await session_service.get_current_session("test_refresh_token") is created_session
+
+    await session_service.deactivate_current_session("test_refresh_token")
+    with pytest.raises(SessionHasExpired):
+        await session_service.get_current_session("test_refresh_token")
+    with pytest.raises(SessionHasExpired):
+        await session_service.get_current_session("unknown_refresh_token")
+
+
+@pytest.mark.asyncio
+async def test_lost_concurrent_rotation_is_not_reuse(session, session_service, fake_session_repository):
+    created_session = await session_service.create_new_session(session)
+    winner_jti = uuid4()
+    fake_session_repository.concurrent_rotation = ("winner_refresh_token", winner_jti)
+
+    with pytest.raises(SessionHasExpired):
+        await session_service.update_session_refresh_token(
+            "test_refresh_token", "loser_refresh_token", uuid4(), created_session.device_type, str(created_session.id)
+        )
+
+    assert created_session.is_active
+    assert created_session.jti == winner_jti
+    rotation = await session_service.update_session_refresh_token(
+        "winner_refresh_token", "next_refresh_token", uuid4(), created_session.device_type, str(created_session.id)
+    )
+    assert rotation.session_id == created_session.id
+
+
+@pytest.mark.asyncio
+async def test_reused_refresh_token_closes_session(session, session_service):
+    created_session = await session_service.create_new_session(session)
+    session_id = str(created_session.id)
+    new_jti = uuid4()
+    await session_service.update_session_refresh_token(
+        "test_refresh_token", "new_refresh_token", new_jti, created_session.device_type, session_id
+    )
+
+    with pytest.raises(RefreshTokenReused) as error:
+        await session_service.update_session_refresh_token(
+            "test_refresh_token", "other_refresh_token", uuid4(), created_session.device_type, session_id
+        )
+
+    assert error.value.jti == str(new_jti)
+    assert not created_session.is_active
+    with pytest.raises(SessionHasExpired):
+        await session_service.update_session_refresh_token(
+            "new_refresh_token", "other_refresh_token", uuid4(), created_session.device_type, session_id
+        )
+
+
+async def create_user_sessions(session_service: SessionService, user_id, count: int) -> list[Session]:
+    started = datetime(2026, 1, 1)
+    sessions = []
+    for index in range(count):
+        session = Session(
+            id=None,
+            user_id=user_id,
+            user_agent="pytest_user_agent",
+            jti=uuid4(),
+            refresh_token_digest=refresh_token_digest(f"refresh_token_{index}"),
+            user_ip="test_ip",
+            is_active=index % 2 == 0,
+            created_at=started + timedelta(minutes=index),
+        )
+        sessions.append(await session_service.create_new_session(session))
+    return sessions
+
+
+@pytest.mark.asyncio
+async def test_get_current_user_sessions_pages_newest_first(session_service):
+    user_id = uuid4()
+    created = await create_user_sessions(session_service, user_id, 5)
+
+    first = await session_service.get_current_user_sessions(user_id, limit=2)
+    second = await session_service.get_current_user_sessions(user_id, limit=2, cursor=first.next_cursor)
+    last = await session_service.get_current_user_sessions(user_id, limit=2, cursor=second.next_cursor)
+
+    pages = [first.sessions, second.sessions, last.sessions]
+    assert [[session.jti for session in page] for page in pages] == [
+        [created[4].jti, created[3].jti],
+        [created[2].jti, created[1].jti],
+        [created[0].jti],
+    ]
+    assert last.next_cursor is None
+
+
+@pytest.mark.asyncio
+async def test_get_current_user_sessions_filters_active(session_service):
+    user_id = uuid4()
+    created = await create_user_sessions(session_service, user_id, 5)
+
+    page = await session_service.get_current_user_sessions(user_id, limit=10, active=True)
+
+    assert [session.jti for session in page.sessions] == [created[4].jti, created[2].jti, created[0].jti]
+    assert page.next_cursor is None
+
+
+def test_session_cursor_round_trip():
+    key = (datetime(2026, 10, 17, 12, 30, 15, 123456), uuid4())
+    assert decode_session_cursor(encode_session_cursor(*key)) == key
+
+
+@pytest.mark.parametrize("cursor", ["not-a-cursor", "", "bm90fGE"])
+def test_decode_session_cursor_rejects_garbage(cursor):
+    with pytest.raises(InvalidCursor):
+        decode_session_cursor(cursor)
@@ -0,0 +1,48 @@
+import time
+
+import pytest
+
+from src.domain.entities import Token
+from src.services.token_cache import TokenCache
+
+
+def make_token(jti: str, lifetime: float = 60) -> Token:
+    now = time.time()
+    return Token(user_uuid="user-1", iat=now, exp=now + lifetime, jti=jti, scope=[])
+
+
+@pytest.fixture
+def token_cache() -> TokenCache:
+    return TokenCache(max_size=2, ttl=60)
+
+
+def test_cached_token_is_returned(token_cache):
+    token = make_token("jti-1")
+    assert token_cache.get("token-1") is None
+    token_cache.put("token-1", token)
+
+    assert token_cache.get("token-1") is token
+    assert (token_cache.hits, token_cache.misses) == (1, 1)
+
+
+def test_entry_never_outlives_token_exp(token_cache):
+    token_cache.put("token-1", make_token("jti-1", lifetime=-1))
+    assert token_cache.get("token-1") is None
+    assert len(token_cache) == 0
+
+
+def test_revoked_jti_is_dropped(token_cache):
+    token_cache.put("token-1", make_token("jti-1"))
+    token_cache.invalidate_jti("jti-1")
+    assert token_cache.get("token-1") is None
+
+
+def test_least_recently_used_entry_is_evicted(token_cache):
+    token_cache.put("token-1", make_token("jti-1"))
+    token_cache.put("token-2", make_token("jti-2"))
+    token_cache.get("token-1")
+    token_cache.put("token-3", make_token("jti-3"))
+
+    assert token_cache.get("token-2") is None
+    assert token_cache.get("token-1") is not None
+    assert token_cache.get("token-3") is not None
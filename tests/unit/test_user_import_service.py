@@ -0,0 +1,73 @@
+import pytest
+
+from src.domain.entities import Role
+from src.services.hashing import HashingPolicy, ProcessPoolPasswordHasher
+from src.services.user_import import UserImportService
+from tests.unit.repositories import FakeUserRepository
+
+POLICY = HashingPolicy(bcrypt_rounds=4)
+
+
+class FakeRoleRepository:
+    async def get_all_roles(self) -> list[Role]:
+        return [Role(slug="user", title="Пользователь", description="")]
+
+
+@pytest.fixture
+def fake_user_repository() -> FakeUserRepository:
+    return FakeUserRepository()
+
+
+@pytest.fixture
+def password_hasher() -> ProcessPoolPasswordHasher:
+    hasher = ProcessPoolPasswordHasher(max_workers=1, max_in_flight=2, max_queue_size=100, timeout=30, policy=POLICY)
+    yield hasher
+    hasher.shutdown()
+
+
+@pytest.fixture
+def import_service(fake_user_repository, password_hasher) -> UserImportService:
+    return UserImportService(
+        user_repository=fake_user_repository,
+        role_repository=FakeRoleRepository(),
+        password_hasher=password_hasher,
+        policy=POLICY,
+        batch_size=2,
+    )
+
+
+@pytest.mark.asyncio
+async def test_import_rows(import_service, fake_user_repository):
+    prehashed = POLICY.create_context().hash("legacy-password")
+    rows = [
+        (1, {"email": "first@example.com", "password": "password", "roles": ["user"]}),
+        (2, {"email": "second@example.com", "password_hash": prehashed}),
+        (3, {"email": "third@example.com", "password": "password"}),
+    ]
+
+    report = await import_service.import_rows(rows)
+
+    assert report.total == 3
+    assert report.imported == 3
+    assert report.errors == []
+    assert (await fake_user_repository.get_by_email("second@example.com")).password == prehashed
+    assert (await fake_user_repository.get_by_email("first@example.com")).password != "password"
+
+
+@pytest.mark.asyncio
+async def test_import_reports_row_errors(import_service, fake_user_repository):
+    await fake_user_repository.create(email="exists@example.com", password="hash")
+    rows = [
+        (1, {"email": "not-an-email", "password": "password"}),
+        (2, {"email": "nopassword@example.com"}),
+        (3, {"email": "badhash@example.com", "password_hash": "plain-text"}),
+        (4, {"email": "role@example.com", "password": "password", "roles": ["unknown"]}),
+        (5, {"email": "exists@example.com", "password": "password"}),
+        (6, {"email": "ok@example.com", "password": "password"}),
+        (7, {"email": "ok@example.com", "password": "password"}),
+    ]
+
+    report = await import_service.import_rows(rows)
+
+    assert report.imported == 1
+    assert [error.line for error in report.errors] == [1, 2, 3, 4, 5, 7]